@@ -0,0 +1,13 @@
+import * as os from 'os'
+import * as path from 'path'
+
+export const PARSER_SCRIPT_PATH = path.join(process.cwd(), 'src', 'parser', 'python', 'main.py')
+export const PARSER_TIMEOUT_MS = Number(process.env.PARSER_TIMEOUT_MS) || 300000
+export const PARSER_MATCH_THRESHOLD = Number(process.env.PARSER_MATCH_THRESHOLD) || 0.85
+export const PARSER_MATCH_BATCH_SIZE = Number(process.env.PARSER_MATCH_BATCH_SIZE) || 1000
+export const PARSER_ENRICH = process.env.PARSER_ENRICH === 'true'
+export const PARSER_DAEMON_URL = process.env.PARSER_DAEMON_URL || ''
+export const PARSER_DAEMON_AUTOSTART = process.env.PARSER_DAEMON_AUTOSTART === 'true'
+export const PARSER_DAEMON_SOCKET =
+  process.env.PARSER_DAEMON_SOCKET ||
+  (PARSER_DAEMON_AUTOSTART ? path.join(os.tmpdir(), 'afisha-parser.sock') : '')
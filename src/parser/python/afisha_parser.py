@@ -1,36 +1,190 @@
-from typing import List, Dict
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterator, List, Optional
 
+from embedded_state import EmbeddedStateParser
 from file_manager import FileManager
 from html_parser import HtmlParser
-from web_driver_manager import WebDriverManager
+from metrics import Metrics
+from page_cache import PageCache
+from performance import Performance
 
 
 class AfishaParser:
-    def __init__(self):
-        self.web_driver = WebDriverManager()
+    def __init__(self, on_progress: Optional[Callable[[Dict], None]] = None,
+                 driver_pool=None, static_first: bool = True,
+                 page_cache: Optional[PageCache] = None, use_cache: bool = True,
+                 cancel_event: Optional[threading.Event] = None):
+        self.on_progress = on_progress
+        self.static_first = static_first
+        self.use_cache = use_cache
+        self._page_cache = page_cache
+        self.cancel_event = cancel_event
+        self.driver_pool = driver_pool
+        self._web_driver = None
+        self._static_fetcher = None
         self.html_parser = HtmlParser()
+        self.embedded_state_parser = EmbeddedStateParser()
         self.file_manager = FileManager()
+        self.metrics = Metrics.shared()
+        self.last_tier: Optional[str] = None
+        self.tier_counts = Counter()
 
-    def parse_performances_from_url(self, url: str) -> List[Dict[str, str]]:
+    @property
+    def page_cache(self) -> Optional[PageCache]:
+        if self.use_cache and self._page_cache is None:
+            self._page_cache = PageCache.shared()
+        return self._page_cache if self.use_cache else None
+
+    @property
+    def web_driver(self):
+        if self._web_driver is None:
+            from web_driver_manager import WebDriverManager
+
+            self._web_driver = WebDriverManager(driver_pool=self.driver_pool, on_progress=self.on_progress,
+                                                cancel_event=self.cancel_event)
+        return self._web_driver
+
+    @property
+    def static_fetcher(self):
+        if self._static_fetcher is None:
+            from static_fetcher import StaticFetcher
+
+            self._static_fetcher = StaticFetcher()
+        return self._static_fetcher
+
+    def parse_performances_from_url(self, url: str,
+                                    on_record: Optional[Callable[[Performance], None]] = None) -> List[Performance]:
+        with self.metrics.timer("phase_seconds", phase="listing"):
+            performances = self._parse_url(url, on_record)
+        if on_record and self.last_tier != "browser_clicks":
+            for performance in performances:
+                on_record(performance)
+        return performances
+
+    def _parse_url(self, url: str, on_record: Optional[Callable[[Performance], None]] = None) -> List[Performance]:
+        self.last_tier = None
         try:
-            events_with_details = self.web_driver.get_events_with_details(url)
+            cached_entry = None
+            if self.page_cache:
+                cached = self.page_cache.lookup_fresh(url)
+                if cached is not None:
+                    self._record_tier(url, "cache")
+                    return Performance.from_dicts(cached, url)
+                cached_entry = self.page_cache.get(url)
+
+            if self.static_first:
+                performances = self._parse_static(url, cached_entry)
+                if performances:
+                    return performances
+
+            if self._cancelled(url):
+                return []
+
+            events_with_details = self.web_driver.get_events_with_details(url, cached_entry, on_record)
+
+            if self._cancelled(url):
+                return []
+
+            if self.web_driver.last_unchanged:
+                self._record_tier(url, "cache_unchanged")
+                return Performance.from_dicts(self.page_cache.revalidated(url, cached_entry), url)
 
             if events_with_details:
-                events_with_urls = [event for event in events_with_details if event.get('detail_url')]
+                events_with_urls = [event for event in events_with_details if event.detail_url]
                 if events_with_urls:
+                    self._record_tier(url, "browser_clicks")
+                    self._store(url, self.web_driver.last_page_source, events_with_urls,
+                                fingerprint=self.web_driver.last_fingerprint)
                     return events_with_urls
 
+            self._record_fallback(url, "browser_no_detail_urls" if events_with_details else "browser_no_blocks")
+            self._report_progress("html_fallback", url=url)
+
             html_content = self.web_driver.get_page_content(url)
             if html_content:
-                return self.html_parser.parse_performances(html_content, url)
+                self._record_tier(url, "browser_html")
+                performances = self.html_parser.parse_performances(html_content, url)
+                self._store(url, html_content, performances)
+                return performances
             else:
+                self._record_fallback(url, "browser_no_content")
+                self._record_tier(url, "none")
                 return []
 
         except Exception as e:
+            self.metrics.inc("errors", component="afisha_parser")
             print(f"Error parsing URL {url}: {e}")
             return []
 
-    def parse_performances_from_file(self, filepath: str) -> List[Dict[str, str]]:
+    def _parse_static(self, url: str, cached_entry: Optional[Dict] = None) -> List[Performance]:
+        etag = cached_entry.get('etag') if cached_entry else None
+        last_modified = cached_entry.get('last_modified') if cached_entry else None
+
+        result = self.static_fetcher.fetch_conditional(url, etag, last_modified)
+        if not result:
+            self._record_fallback(url, "static_fetch_failed")
+            return []
+
+        if result.not_modified and cached_entry:
+            self._record_tier(url, "cache_revalidated")
+            return Performance.from_dicts(self.page_cache.revalidated(url, cached_entry), url)
+
+        html_content = result.text
+        if not html_content:
+            self._record_fallback(url, "static_empty")
+            return []
+
+        if self.page_cache:
+            unchanged = self.page_cache.unchanged_results(url, cached_entry, html_content)
+            if unchanged is not None:
+                self._record_tier(url, "cache_unchanged")
+                return Performance.from_dicts(unchanged, url)
+
+        for tier, parser in (("static_html", self.html_parser), ("embedded_state", self.embedded_state_parser)):
+            performances = [performance for performance in parser.parse_performances(html_content, url)
+                            if performance.title and performance.detail_url]
+            if performances:
+                self._record_tier(url, tier)
+                self._store(url, html_content, performances, result.etag, result.last_modified)
+                return performances
+
+        self._record_fallback(url, "static_no_blocks")
+        return []
+
+    def _store(self, url: str, html_content: Optional[str], performances: List[Performance],
+               etag: Optional[str] = None, last_modified: Optional[str] = None, fingerprint: Optional[str] = None):
+        if not self.page_cache or not performances:
+            return
+        try:
+            self.page_cache.put(url, html_content, [performance.to_dict() for performance in performances],
+                                etag, last_modified, fingerprint)
+        except OSError as e:
+            self.metrics.inc("errors", component="page_cache")
+            print(f"Error writing page cache for {url}: {e}")
+
+    def _record_tier(self, url: str, tier: str):
+        self.last_tier = tier
+        self.tier_counts[tier] += 1
+        self.metrics.inc("tiers", tier=tier)
+        self._report_progress("tier", url=url, tier=tier)
+
+    def _cancelled(self, url: str) -> bool:
+        if self.cancel_event is None or not self.cancel_event.is_set():
+            return False
+
+        self._record_tier(url, "cancelled")
+        return True
+
+    def _record_fallback(self, url: str, reason: str):
+        self.metrics.inc("fallbacks", reason=reason)
+        self._report_progress("fallback", url=url, reason=reason)
+
+    def _report_progress(self, stage: str, **details):
+        if self.on_progress:
+            self.on_progress({"stage": stage, **details})
+
+    def parse_performances_from_file(self, filepath: str) -> List[Performance]:
         try:
             html_content = self.file_manager.read_local_file(filepath)
             if html_content:
@@ -41,13 +195,19 @@ class AfishaParser:
             print(f"Error parsing file {filepath}: {e}")
             return []
 
-    def save_to_json(self, performances: List[Dict[str, str]], filename: str = "performances.json"):
+    def iter_performances_from_file(self, filepath: str) -> Iterator[Performance]:
+        try:
+            yield from self.html_parser.iter_performances_from_file(filepath)
+        except Exception as e:
+            print(f"Error streaming file {filepath}: {e}")
+
+    def save_to_json(self, performances: List[Performance], filename: str = "performances.json"):
         try:
             self.file_manager.save_to_json(performances, filename)
         except Exception as e:
             print(f"Error saving to JSON: {e}")
 
-    def print_performances(self, performances: List[Dict[str, str]]):
+    def print_performances(self, performances: List[Performance]):
         try:
             self.file_manager.print_performances(performances)
         except Exception as e:
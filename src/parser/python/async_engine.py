@@ -0,0 +1,151 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from afisha_parser import AfishaParser
+from batch_crawler import BatchCrawler, HostThrottle
+from driver_pool import DriverPool
+from performance import Performance
+
+
+class AsyncAfishaParser:
+
+    def __init__(self, concurrency: Optional[int] = None, task_timeout: Optional[float] = None,
+                 driver_pool: Optional[DriverPool] = None, use_cache: bool = True, per_host: int = 2,
+                 politeness_delay: float = 1.0, on_progress: Optional[Callable[[Dict], None]] = None):
+        self.driver_pool = driver_pool or DriverPool.shared()
+        self.concurrency = concurrency or int(os.environ.get('PARSER_ASYNC_CONCURRENCY', '0')) or self.driver_pool.size
+        self.task_timeout = task_timeout or float(os.environ.get('PARSER_TASK_TIMEOUT', '300'))
+        self.use_cache = use_cache
+        self.on_progress = on_progress
+        self.driver_pool.resize(max(self.driver_pool.size, self.concurrency))
+        self.throttle = HostThrottle(per_host, politeness_delay)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="afisha-async")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._active: Set[threading.Event] = set()
+        self._active_lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    async def parse_performances_from_url(self, url: str, on_record: Optional[Callable[[Performance], None]] = None,
+                                          timeout: Optional[float] = None) -> List[Performance]:
+        performances, _ = await self._run(url, on_record, timeout)
+        return performances
+
+    async def parse_performances_from_file(self, filepath: str, timeout: Optional[float] = None) -> List[Performance]:
+        parser = AfishaParser(use_cache=False)
+
+        def parse(mark_started: Callable[[], None]) -> List[Performance]:
+            mark_started()
+            return parser.parse_performances_from_file(filepath)
+
+        return await self._in_slot(parse, threading.Event(), timeout)
+
+    async def crawl(self, urls: Iterable[str]) -> Dict:
+        unique_urls = list(dict.fromkeys(url.strip() for url in urls if url and url.strip()))
+        started = time.perf_counter()
+
+        outcomes = await asyncio.gather(*(self._crawl_one(url) for url in unique_urls))
+        results = {url: performances for url, (performances, _) in zip(unique_urls, outcomes)}
+
+        return {
+            "performances": BatchCrawler._merge([results[url] for url in unique_urls]),
+            "sources": [report for _, report in outcomes],
+            "by_source": results,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def cancel(self):
+        self._cancelled.set()
+        with self._active_lock:
+            for cancel_event in self._active:
+                cancel_event.set()
+
+    def close(self):
+        self.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _crawl_one(self, url: str):
+        report = {"url": url, "count": 0, "seconds": 0.0, "tier": None, "error": None}
+        started = time.perf_counter()
+        performances: List[Performance] = []
+
+        try:
+            performances, report["tier"] = await self._run(url)
+        except asyncio.TimeoutError:
+            report["error"] = f"Timed out after {self.task_timeout}s"
+        except Exception as e:
+            report["error"] = str(e)
+
+        if report["tier"] == "cancelled":
+            report["error"] = "Cancelled"
+
+        report["count"] = len(performances)
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        print(f"{url}: {report['count']} performances in {report['seconds']}s"
+              + (f" ({report['error']})" if report["error"] else ""))
+        return performances, report
+
+    async def _run(self, url: str, on_record: Optional[Callable[[Performance], None]] = None,
+                   timeout: Optional[float] = None):
+        if self._cancelled.is_set():
+            return [], "cancelled"
+
+        cancel_event = threading.Event()
+        with self._active_lock:
+            self._active.add(cancel_event)
+
+        parser = AfishaParser(on_progress=self.on_progress, driver_pool=self.driver_pool,
+                              use_cache=self.use_cache, cancel_event=cancel_event)
+        try:
+            performances = await self._in_slot(
+                lambda mark_started: self._parse_blocking(parser, url, on_record, mark_started), cancel_event, timeout)
+            return performances, parser.last_tier
+        finally:
+            with self._active_lock:
+                self._active.discard(cancel_event)
+
+    async def _in_slot(self, function: Callable, cancel_event: threading.Event, timeout: Optional[float] = None):
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        await self._semaphore.acquire()
+        started = asyncio.Event()
+        try:
+            future = loop.run_in_executor(self._executor, self._call_in_thread, loop, started, function)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        future.add_done_callback(lambda _: self._semaphore.release())
+
+        try:
+            await started.wait()
+            return await asyncio.wait_for(asyncio.shield(future), timeout or self.task_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            cancel_event.set()
+            raise
+
+    @staticmethod
+    def _call_in_thread(loop: asyncio.AbstractEventLoop, started: asyncio.Event, function: Callable):
+        def mark_started():
+            try:
+                loop.call_soon_threadsafe(started.set)
+            except RuntimeError:
+                pass
+
+        try:
+            return function(mark_started)
+        finally:
+            mark_started()
+
+    def _parse_blocking(self, parser: AfishaParser, url: str, on_record: Optional[Callable[[Performance], None]],
+                        mark_started: Callable[[], None]) -> List[Performance]:
+        with self.throttle.slot(url):
+            mark_started()
+            if parser._cancelled(url):
+                return []
+            return parser.parse_performances_from_url(url, on_record)
@@ -0,0 +1,97 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from afisha_parser import AfishaParser
+from driver_pool import DriverPool
+from performance import Performance
+
+
+class HostThrottle:
+
+    def __init__(self, max_per_host: int = 2, delay: float = 1.0):
+        self.max_per_host = max_per_host
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._next_slot: Dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, url: str):
+        host = urlparse(url).netloc.lower()
+
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.Semaphore(self.max_per_host))
+
+        semaphore.acquire()
+        try:
+            with self._lock:
+                now = time.monotonic()
+                start_at = max(now, self._next_slot.get(host, now))
+                self._next_slot[host] = start_at + self.delay
+
+            if start_at > now:
+                time.sleep(start_at - now)
+            yield
+        finally:
+            semaphore.release()
+
+
+class BatchCrawler:
+
+    def __init__(self, workers: Optional[int] = None, per_host: int = 2, politeness_delay: float = 1.0,
+                 driver_pool: Optional[DriverPool] = None, use_cache: bool = True):
+        self.use_cache = use_cache
+        self.driver_pool = driver_pool or DriverPool.shared()
+        self.workers = workers or self.driver_pool.size
+        self.driver_pool.resize(max(self.driver_pool.size, self.workers))
+        self.throttle = HostThrottle(per_host, politeness_delay)
+
+    def crawl(self, urls: Iterable[str]) -> Dict:
+        unique_urls = list(dict.fromkeys(url.strip() for url in urls if url and url.strip()))
+        started = time.perf_counter()
+        reports: Dict[str, Dict] = {}
+        results: Dict[str, List[Performance]] = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self._crawl_one, url): url for url in unique_urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                performances, report = future.result()
+                results[url] = performances
+                reports[url] = report
+                print(f"[{len(reports)}/{len(unique_urls)}] {url}: {report['count']} performances "
+                      f"in {report['seconds']}s")
+
+        merged = self._merge([results[url] for url in unique_urls])
+
+        return {
+            "performances": merged,
+            "sources": [reports[url] for url in unique_urls],
+            "by_source": {url: results[url] for url in unique_urls},
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def _crawl_one(self, url: str):
+        report = {"url": url, "count": 0, "seconds": 0.0, "tier": None, "error": None}
+        started = time.perf_counter()
+        performances: List[Performance] = []
+
+        try:
+            with self.throttle.slot(url):
+                parser = AfishaParser(driver_pool=self.driver_pool, use_cache=self.use_cache)
+                performances = parser.parse_performances_from_url(url)
+                report["tier"] = parser.last_tier
+        except Exception as e:
+            report["error"] = str(e)
+
+        report["count"] = len(performances)
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        return performances, report
+
+    @staticmethod
+    def _merge(batches: List[List[Performance]]) -> List[Performance]:
+        return Performance.unique(performance for performances in batches for performance in performances)
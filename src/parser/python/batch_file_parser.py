@@ -0,0 +1,142 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from file_manager import FileManager
+from html_parser import HtmlParser
+from performance import Performance
+
+HTML_EXTENSIONS = (".html", ".htm")
+
+_worker_parser: Optional[HtmlParser] = None
+
+
+def _init_worker(engine: Optional[str]):
+    global _worker_parser
+    _worker_parser = HtmlParser(engine)
+
+
+def _parse_chunk(paths: List[str]) -> List[Tuple[str, List[Performance], float, Optional[str]]]:
+    if _worker_parser is None:
+        _init_worker(None)
+
+    results = []
+    for path in paths:
+        started = time.perf_counter()
+        performances: List[Performance] = []
+        error = None
+        try:
+            content = FileManager.read_local_file(path)
+            if content is None:
+                error = "unreadable"
+            else:
+                performances = _worker_parser.parse_performances(content)
+        except Exception as e:
+            error = str(e)
+        results.append((path, performances, round(time.perf_counter() - started, 4), error))
+    return results
+
+
+class BatchFileParser:
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: Optional[int] = None, engine: Optional[str] = None):
+        self.workers = workers or int(os.environ.get('PARSER_FILE_WORKERS', '0')) or os.cpu_count() or 1
+        self.chunk_size = chunk_size or int(os.environ.get('PARSER_FILE_CHUNK_SIZE', '0'))
+        self.engine = engine
+
+    @staticmethod
+    def expand(patterns: Iterable[str]) -> List[str]:
+        paths = []
+        for pattern in patterns:
+            if os.path.isdir(pattern):
+                for root, _, files in os.walk(pattern):
+                    paths.extend(os.path.join(root, name) for name in sorted(files)
+                                 if name.lower().endswith(HTML_EXTENSIONS))
+            elif glob.has_magic(pattern):
+                paths.extend(sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path)))
+            else:
+                paths.append(pattern)
+        return list(dict.fromkeys(paths))
+
+    def iter_results(self, paths: List[str]) -> Iterator[Dict]:
+        if self.workers <= 1 or len(paths) <= 1:
+            _init_worker(self.engine)
+            for path in paths:
+                yield self._result(*_parse_chunk([path])[0])
+            return
+
+        chunk_size = self.chunk_size or max(1, min(64, len(paths) // (self.workers * 4)))
+        chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks)), initializer=_init_worker,
+                                 initargs=(self.engine,)) as executor:
+            futures = {executor.submit(_parse_chunk, chunk): chunk for chunk in chunks}
+            failed = []
+            for future in as_completed(futures):
+                try:
+                    results = future.result()
+                except Exception:
+                    failed.append(futures[future])
+                    continue
+                for result in results:
+                    yield self._result(*result)
+
+        for result in self._retry_chunks(failed):
+            yield self._result(*result)
+
+    def _retry_chunks(self, chunks: List[List[str]]) -> Iterator[Tuple[str, List[Performance], float, Optional[str]]]:
+        executor = None
+        try:
+            for chunk in chunks:
+                if executor is None:
+                    executor = ProcessPoolExecutor(max_workers=1, initializer=_init_worker, initargs=(self.engine,))
+                try:
+                    yield from executor.submit(_parse_chunk, chunk).result()
+                except Exception as e:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = None
+                    for path in chunk:
+                        yield path, [], 0.0, f"worker failed: {e}"
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def parse(self, paths: List[str], on_record: Optional[Callable[[Performance], None]] = None,
+              on_file: Optional[Callable[[Dict], None]] = None, keep_by_source: bool = False) -> Dict:
+        started = time.perf_counter()
+        performances: List[Performance] = []
+        by_source: Dict[str, List[Performance]] = {}
+        files: List[Dict] = []
+        seen = set()
+
+        for result in self.iter_results(paths):
+            file_performances = result.pop("performances")
+            if keep_by_source:
+                by_source[result["file"]] = file_performances
+            files.append(result)
+            if on_file:
+                on_file(result)
+
+            for performance in file_performances:
+                if performance in seen:
+                    continue
+                seen.add(performance)
+                performances.append(performance)
+                if on_record:
+                    on_record(performance)
+
+        seconds = time.perf_counter() - started
+        return {
+            "performances": performances,
+            "files": files,
+            "by_source": by_source,
+            "seconds": round(seconds, 3),
+            "files_per_second": round(len(files) / seconds, 1) if seconds else None,
+        }
+
+    @staticmethod
+    def _result(path: str, performances: List[Performance], seconds: float, error: Optional[str]) -> Dict:
+        return {"file": path, "performances": performances, "count": len(performances), "seconds": seconds,
+                "error": error}
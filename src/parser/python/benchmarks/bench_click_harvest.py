@@ -0,0 +1,49 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixture_server import FixtureServer
+from web_driver_manager import WebDriverManager
+
+
+def run(blocks: int, harvest_mode: bool) -> dict:
+    server = FixtureServer().start()
+    try:
+        manager = WebDriverManager(harvest_mode=harvest_mode)
+        started = time.perf_counter()
+        events = manager.get_events_with_details(server.listing_url(blocks))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.stop()
+
+    return {
+        "mode": "harvest" if harvest_mode else "per_block",
+        "blocks": blocks,
+        "resolved": sum(1 for event in events if event.detail_url),
+        "listing_loads": server.hits["listing"],
+        "seconds": round(elapsed, 3),
+        "wait_seconds": manager.page_waiter.total_wait_seconds(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare page loads of click harvest vs per-block clicks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 60])
+    parser.add_argument("--per-block", action="store_true", help="also run the legacy per-block click path")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        results.append(run(size, harvest_mode=True))
+        if args.per_block:
+            results.append(run(size, harvest_mode=False))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from listing_generator import generate_listing
+
+
+def write_snapshots(directory: str, files: int, blocks: int):
+    for i in range(files):
+        with open(os.path.join(directory, f"snapshot_{i:05d}.html"), "w", encoding="utf-8") as f:
+            f.write(generate_listing(blocks, seed=i))
+
+
+def run(directory: str, workers: int, chunk_size: int) -> dict:
+    from batch_file_parser import BatchFileParser
+
+    parser = BatchFileParser(workers=workers, chunk_size=chunk_size or None)
+    started = time.perf_counter()
+    result = parser.parse(BatchFileParser.expand([directory]))
+    return {
+        "workers": workers,
+        "files": len(result["files"]),
+        "performances": len(result["performances"]),
+        "seconds": round(time.perf_counter() - started, 3),
+        "files_per_second": result["files_per_second"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel parsing of saved listing pages")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--blocks", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--chunk-size", type=int, default=0)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="afisha-snapshots-")
+    try:
+        write_snapshots(directory, args.files, args.blocks)
+        results = [run(directory, workers, args.chunk_size) for workers in args.workers]
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(json.dumps({"blocks": args.blocks, "results": results}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from html_parser import HtmlParser
+from listing_generator import generate_listing
+
+
+def load_content(args: argparse.Namespace) -> str:
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            return f.read()
+    return generate_listing(args.blocks)
+
+
+def run_single(args: argparse.Namespace):
+    content = load_content(args)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    parser = HtmlParser(engine=args.engine)
+
+    started = time.perf_counter()
+    performances = parser.parse_performances(content, "https://www.afisha.ru/msk/")
+    elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        "engine": args.engine,
+        "input_mb": round(len(content.encode("utf-8")) / (1024 * 1024), 2),
+        "performances": len(performances),
+        "seconds": round(elapsed, 3),
+        "peak_rss_growth_mb": round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_kb) / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HtmlParser engines on a large listing page")
+    parser.add_argument("--file", help="saved afisha page; a synthetic listing is generated otherwise")
+    parser.add_argument("--blocks", type=int, default=2000)
+    parser.add_argument("--engine", choices=["lxml", "bs4"])
+    args = parser.parse_args()
+
+    if args.engine:
+        run_single(args)
+        return
+
+    results = []
+    for engine in ("bs4", "lxml"):
+        command = [sys.executable, os.path.abspath(__file__), "--engine", engine, "--blocks", str(args.blocks)]
+        if args.file:
+            command += ["--file", args.file]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PARSER_DIR = os.path.dirname(BENCH_DIR)
+MAIN = os.path.join(PARSER_DIR, "main.py")
+sys.path.insert(0, PARSER_DIR)
+
+from listing_generator import generate_listing
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+HEAVY_MODULES = ("selenium", "bs4", "requests", "urllib3")
+BROWSER_FREE_CASES = ("help", "file", "stream", "files")
+
+
+def cases(directory: str) -> dict:
+    listing = os.path.join(directory, "listing.html")
+    with open(listing, "w", encoding="utf-8") as f:
+        f.write(generate_listing(60))
+
+    output = os.path.join(directory, "out.json")
+    return {
+        "help": ["--help"],
+        "file": [listing, "--output", output],
+        "stream": [listing, "--stream", "--output", output],
+        "files": ["--files", listing, "--workers", "1", "--output", output],
+    }
+
+
+def parse_importtime(stderr: str) -> dict:
+    modules = {}
+    total = 0
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules[name] = int(cumulative_us)
+        if not indent:
+            total += int(cumulative_us)
+    return {"modules": modules, "import_seconds": round(total / 1e6, 4)}
+
+
+def run_case(argv: list, repeat: int, env: dict) -> dict:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-X", "importtime", *argv], capture_output=True, text=True,
+                                   env=env)
+        elapsed = time.perf_counter() - started
+        parsed = parse_importtime(completed.stderr)
+        if best is None or elapsed < best["seconds"]:
+            best = {"seconds": round(elapsed, 4), "returncode": completed.returncode, **parsed}
+
+    modules = best.pop("modules")
+    best["modules_loaded"] = len(modules)
+    best["heavy_modules"] = sorted(name for name in HEAVY_MODULES if name in modules)
+    best["slowest_imports"] = dict(sorted(modules.items(), key=lambda item: -item[1])[:8])
+    return best
+
+
+def run_forwarded(argv: list, repeat: int, socket_path: str) -> dict:
+    env = dict(os.environ, PARSER_FORK_SERVER=socket_path)
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        completed = subprocess.run([sys.executable, MAIN, *argv], capture_output=True, text=True, env=env)
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best["seconds"]:
+            best = {"seconds": round(elapsed, 4), "returncode": completed.returncode}
+    return best
+
+
+def start_fork_server(socket_path: str) -> subprocess.Popen:
+    process = subprocess.Popen([sys.executable, MAIN, "--fork-server", "--socket", socket_path],
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    process.stdout.readline()
+    return process
+
+
+def compare(results: dict, baseline_path: str, tolerance: float) -> list:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["cases"]
+
+    regressions = []
+    for name, case in results["cases"].items():
+        previous = baseline.get(name)
+        if not previous or not previous.get("import_seconds"):
+            continue
+        ratio = case["import_seconds"] / previous["import_seconds"]
+        print(f"{name:>8}: imports {previous['import_seconds']:.4f}s -> {case['import_seconds']:.4f}s "
+              f"({ratio:.2f}x), wall {previous['seconds']:.3f}s -> {case['seconds']:.3f}s", file=sys.stderr)
+        if ratio > 1 + tolerance:
+            regressions.append(f"{name}: import time grew {ratio:.2f}x")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI cold start with -X importtime and catch import regressions")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case, the fastest one is reported")
+    parser.add_argument("--fork-server", action="store_true", help="also time the same runs forwarded to a fork server")
+    parser.add_argument("--output", help="write results to this JSON file instead of stdout")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed import time growth over --compare before failing")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.pop("PARSER_FORK_SERVER", None)
+
+    with tempfile.TemporaryDirectory() as directory:
+        argv_by_case = cases(directory)
+        results = {
+            "python": sys.version.split()[0],
+            "interpreter": run_case(["-c", "pass"], args.repeat, env),
+            "cases": {name: run_case([MAIN, *argv], args.repeat, env) for name, argv in argv_by_case.items()},
+        }
+
+        if args.fork_server:
+            socket_path = os.path.join(directory, "fork.sock")
+            server = start_fork_server(socket_path)
+            try:
+                results["forwarded"] = {name: run_forwarded(argv, args.repeat, socket_path)
+                                        for name, argv in argv_by_case.items()}
+            finally:
+                server.terminate()
+                server.wait()
+
+    problems = [f"{name}: loads {', '.join(case['heavy_modules'])}" for name, case in results["cases"].items()
+                if name in BROWSER_FREE_CASES and case["heavy_modules"]]
+    if args.compare:
+        problems += compare(results, args.compare, args.tolerance)
+
+    report = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    else:
+        print(report)
+
+    for problem in problems:
+        print(f"Import regression: {problem}", file=sys.stderr)
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fixture_server import FixtureServer
+from web_driver_manager import WebDriverManager
+
+
+def run(blocks: int, variant: str, scroll_harvest: bool) -> dict:
+    server = FixtureServer().start()
+    try:
+        manager = WebDriverManager()
+        manager.scroll_harvest = scroll_harvest
+        started = time.perf_counter()
+        events = manager.get_events_with_details(server.listing_url(blocks, variant))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.stop()
+
+    return {
+        "mode": "scroll_harvest" if scroll_harvest else "single_snapshot",
+        "variant": variant,
+        "blocks": blocks,
+        "found": len(events),
+        "resolved": sum(1 for event in events if event.detail_url),
+        "scroll_steps": manager.scroll_harvester.last_steps if scroll_harvest else None,
+        "listing_loads": server.hits["listing"],
+        "seconds": round(elapsed, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare incremental scroll harvesting with a single block snapshot")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--variants", nargs="+", default=["infinite", "virtual"])
+    parser.add_argument("--single", action="store_true", help="also run the legacy single-snapshot path")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        for variant in args.variants:
+            results.append(run(size, variant, scroll_harvest=True))
+            if args.single:
+                results.append(run(size, variant, scroll_harvest=False))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from fixture_server import FixtureServer
+from listing_generator import generate_listing
+
+MODES = ("file", "url", "recorded")
+
+
+def count_round_trips() -> Counter:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+    round_trips = Counter()
+    execute = WebDriver.execute
+
+    def counted_execute(self, driver_command, params=None):
+        round_trips[driver_command] += 1
+        return execute(self, driver_command, params)
+
+    WebDriver.execute = counted_execute
+    return round_trips
+
+
+def phase_totals() -> dict:
+    from metrics import Metrics
+
+    histograms = Metrics.shared().snapshot()["histograms"]
+    return {
+        series["labels"].get("phase", name): round(series["sum"], 3)
+        for name in ("phase_seconds", "wait_seconds")
+        for series in histograms.get(name, [])
+    }
+
+
+def network_totals() -> dict:
+    from metrics import Metrics
+
+    counters = Metrics.shared().snapshot()["counters"]
+    return {
+        "requests": sum(series["value"] for series in counters.get("network_requests", [])),
+        "bytes_loaded": sum(series["value"] for series in counters.get("network_bytes", [])),
+        "requests_blocked": {series["labels"]["type"]: series["value"]
+                             for series in counters.get("requests_blocked", [])},
+    }
+
+
+def parse_url(args: argparse.Namespace, server: FixtureServer, url: str) -> dict:
+    from afisha_parser import AfishaParser
+    from driver_pool import DriverPool
+
+    pool = DriverPool(size=1)
+    try:
+        parser = AfishaParser(driver_pool=pool, use_cache=False, static_first=not args.browser_only)
+        performances = parser.parse_performances_from_url(url)
+        idle = list(pool._idle.queue)
+        browser_rss = pool._driver_rss_mb(idle[0].driver) if idle else None
+    finally:
+        pool.close()
+
+    return {
+        "performances": len(performances),
+        "tier": parser.last_tier,
+        "pages_loaded": sum(server.hits.values()),
+        "page_hits": dict(server.hits),
+        "browser_rss_mb": round(browser_rss, 1) if browser_rss is not None else None,
+    }
+
+
+def run_case(args: argparse.Namespace) -> dict:
+    output = sys.stdout
+    sys.stdout = sys.stderr
+
+    round_trips = count_round_trips()
+    before_self = resource.getrusage(resource.RUSAGE_SELF)
+    before_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+
+    if args.case == "file":
+        from afisha_parser import AfishaParser
+
+        with tempfile.NamedTemporaryFile("w", suffix=".html", encoding="utf-8", delete=False) as f:
+            f.write(generate_listing(args.blocks))
+        started = time.perf_counter()
+        try:
+            performances = AfishaParser(use_cache=False).parse_performances_from_file(f.name)
+        finally:
+            os.unlink(f.name)
+        result = {"performances": len(performances), "tier": "file", "pages_loaded": 0}
+    else:
+        server = FixtureServer(latency=args.latency, fixtures_dir=args.fixtures).start()
+        try:
+            url = server.recorded_url() if args.case == "recorded" else server.listing_url(args.blocks, args.variant)
+            result = parse_url(args, server, url)
+        finally:
+            server.stop()
+
+    elapsed = time.perf_counter() - started
+    after_self = resource.getrusage(resource.RUSAGE_SELF)
+    after_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    result.update({
+        "mode": args.case,
+        "blocks": args.blocks if args.case != "recorded" else None,
+        "latency": args.latency,
+        "seconds": round(elapsed, 3),
+        "cpu_seconds": round(after_self.ru_utime + after_self.ru_stime
+                             - before_self.ru_utime - before_self.ru_stime, 3),
+        "children_cpu_seconds": round(after_children.ru_utime + after_children.ru_stime
+                                      - before_children.ru_utime - before_children.ru_stime, 3),
+        "peak_rss_mb": round(after_self.ru_maxrss / 1024, 1),
+        "webdriver_round_trips": sum(round_trips.values()),
+        "webdriver_commands": dict(round_trips.most_common(10)),
+        "phases": phase_totals(),
+        "render_profile": os.environ.get("PARSER_RENDER_PROFILE", "lite"),
+        "network": network_totals(),
+    })
+    output.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return result
+
+
+def git_revision() -> dict:
+    try:
+        sha = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BENCH_DIR, check=True,
+                             capture_output=True, text=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--", "."], cwd=os.path.dirname(BENCH_DIR),
+                                    check=True, capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"sha": None, "dirty": None}
+    return {"sha": sha, "dirty": dirty}
+
+
+def run_in_subprocess(args: argparse.Namespace, mode: str, blocks: int) -> dict:
+    command = [sys.executable, os.path.abspath(__file__), "--case", mode, "--blocks", str(blocks),
+               "--latency", str(args.latency), "--variant", args.variant]
+    if args.fixtures:
+        command += ["--fixtures", args.fixtures]
+    if args.browser_only:
+        command.append("--browser-only")
+
+    env = dict(os.environ, PARSER_RENDER_PROFILE=args.render_profile)
+    completed = subprocess.run(command, capture_output=True, text=True, timeout=args.timeout, env=env)
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        return {"mode": mode, "blocks": blocks, "error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(lines[-1])
+
+
+def compare(results: list, baseline_path: str):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(case["mode"], case.get("blocks")): case for case in json.load(f)["results"]}
+
+    for case in results:
+        previous = baseline.get((case["mode"], case.get("blocks")))
+        if not previous or "seconds" not in case or not previous.get("seconds"):
+            continue
+        print(f"{case['mode']:>8} {str(case.get('blocks')):>6}: {previous['seconds']:.3f}s -> {case['seconds']:.3f}s "
+              f"({case['seconds'] / previous['seconds']:.2f}x), round trips "
+              f"{previous.get('webdriver_round_trips')} -> {case.get('webdriver_round_trips')}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end parser benchmarks against a local fake afisha")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=["file", "url"])
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every fixture response")
+    parser.add_argument("--variant", choices=["plain", "generated"], default="plain",
+                        help="plain blocks need clicks; generated blocks carry links in the static HTML")
+    parser.add_argument("--browser-only", action="store_true", help="skip the static HTML tier for URL runs")
+    parser.add_argument("--render-profile", choices=["full", "lite"], default="lite",
+                        help="browser render profile; compare runs of both to see bytes and requests saved")
+    parser.add_argument("--fixtures", help="directory written by record_fixtures.py, served for --modes recorded")
+    parser.add_argument("--timeout", type=float, default=900, help="seconds allowed per case")
+    parser.add_argument("--output", help="write results to this JSON file instead of stdout")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    parser.add_argument("--case", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--blocks", type=int, default=10, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        run_case(args)
+        return
+
+    results = []
+    for mode in args.modes:
+        for size in ([0] if mode == "recorded" else args.sizes):
+            results.append(run_in_subprocess(args, mode, size))
+
+    report = {
+        "revision": git_revision(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    else:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
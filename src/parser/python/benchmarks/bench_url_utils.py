@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from url_utils import UrlUtils
+
+BASE_URL = "https://www.afisha.ru/msk/theatre/"
+
+TYPICAL_URLS = (
+    "https://www.afisha.ru/https://www.afisha.ru/w/performance/{id}/https",
+    "/w/performance/{id}/",
+    "/w/event/{id}?utm_source=listing&utm_medium=card",
+    "https://www.afisha.ru/w/creations/{id}/https/",
+    "javascript:void(0)",
+    "#",
+)
+
+
+def legacy_clean_url(url: str) -> str:
+    url = re.sub(r'https?://.*?(https?://)', r'\1', url)
+    url = re.sub(r'(https?://[^/]+).*?\1', r'\1', url)
+    url = re.sub(r'/?https?/?$', '', url)
+    return url.strip()
+
+
+def legacy_first_performance_url(urls, base_url):
+    for url in urls:
+        if url:
+            clean = legacy_clean_url(url)
+            if any(keyword in clean.lower() for keyword in ('performance', 'event', 'creations')):
+                if not clean.startswith('#') and not clean.startswith('javascript:'):
+                    return clean if clean.startswith('http') else base_url + clean
+    return None
+
+
+def pathological_inputs(size: int):
+    return {
+        "no_slash_host": "https://" + "a" * size,
+        "repeated_host": "https://" + "a" * size + "https://" + "a" * (size - 1),
+        "query_of_schemes": "https://www.afisha.ru/w/event/1?" + "&".join(f"r{i}=http:" for i in range(size // 6)),
+        "suffix_noise": "/w/performance/1" + "/http" * (size // 5),
+    }
+
+
+def time_call(function, values, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for value in values:
+            function(value)
+    return time.perf_counter() - started
+
+
+def bench_typical(blocks: int, candidates: int) -> dict:
+    urls = [template.format(id=i) for i in range(blocks) for template in TYPICAL_URLS]
+    groups = [urls[i:i + candidates] for i in range(0, len(urls), candidates)]
+
+    legacy = time_call(lambda group: legacy_first_performance_url(group, BASE_URL), groups, 3)
+    current = time_call(lambda group: UrlUtils.first_performance_url(group, BASE_URL), groups, 3)
+    started = time.perf_counter()
+    UrlUtils.normalize_many(urls, BASE_URL)
+    batch = time.perf_counter() - started
+
+    return {
+        "urls": len(urls),
+        "legacy_seconds": round(legacy, 4),
+        "current_seconds": round(current, 4),
+        "normalize_many_seconds": round(batch, 4),
+        "cache": UrlUtils.cache_info()["clean_url"],
+    }
+
+
+def bench_pathological(sizes, legacy_limit: int, time_bound: float) -> list:
+    results = []
+    for size in sizes:
+        for name, value in pathological_inputs(size).items():
+            started = time.perf_counter()
+            UrlUtils.clean_url(value + " ")
+            current = time.perf_counter() - started
+
+            legacy = None
+            if size <= legacy_limit:
+                started = time.perf_counter()
+                legacy_clean_url(value)
+                legacy = round(time.perf_counter() - started, 4)
+
+            if current > time_bound:
+                raise AssertionError(f"clean_url took {current:.3f}s on {name} ({size} chars)")
+
+            results.append({"input": name, "size": size, "current_seconds": round(current, 5),
+                            "legacy_seconds": legacy})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare UrlUtils with the legacy regex pipeline")
+    parser.add_argument("--blocks", type=int, default=5000)
+    parser.add_argument("--candidates", type=int, default=4, help="candidate hrefs per block")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="pathological input lengths")
+    parser.add_argument("--legacy-limit", type=int, default=10000,
+                        help="largest pathological input also run through the legacy regexes")
+    parser.add_argument("--time-bound", type=float, default=0.5,
+                        help="fail if one pathological clean_url call exceeds this many seconds")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(json.dumps({
+        "typical": bench_typical(args.blocks, args.candidates),
+        "pathological": bench_pathological(sizes, args.legacy_limit, args.time_bound),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
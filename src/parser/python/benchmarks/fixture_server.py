@@ -0,0 +1,241 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlparse, parse_qs
+
+from listing_generator import generate_blocks
+
+LISTING_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Afisha fixture</title></head>
+<body>
+<div id="root">{blocks}</div>
+<script>
+document.querySelectorAll('div._3XrzE._5fgzK').forEach(function (block, index) {{
+    block.addEventListener('click', function () {{
+        history.pushState({{}}, '', '/w/performance/' + (block.dataset.id || index));
+        render();
+    }});
+}});
+
+function render() {{
+    var match = location.pathname.match(/^\/w\/performance\/(\d+)$/);
+    if (match) {{
+        document.getElementById('root').innerHTML = '<h1>Detail ' + match[1] + '</h1>';
+    }}
+}}
+</script>
+</body>
+</html>
+"""
+
+INFINITE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Afisha fixture</title>
+<style>div._3XrzE {{ height: 120px; }}</style></head>
+<body>
+<div id="root"><div id="spacer"></div></div>
+<div id="filler"></div>
+<script>
+var total = {total}, batch = {batch}, windowSize = {window_size};
+var root = document.getElementById('root');
+var spacer = document.getElementById('spacer');
+var filler = document.getElementById('filler');
+var rendered = 0, windowStart = -1, loading = false;
+
+function block(id) {{
+    var div = document.createElement('div');
+    div.className = '_3XrzE _5fgzK';
+    div.dataset.id = id;
+    if (windowSize) {{
+        div.innerHTML = '<div class="IlTNG">Performance ' + id + '</div>';
+        div.addEventListener('click', function () {{
+            history.pushState({{}}, '', '/w/performance/' + id);
+        }});
+    }} else {{
+        div.innerHTML = '<a href="/w/performance/' + id + '"><div class="IlTNG">Performance ' + id + '</div></a>';
+    }}
+    return div;
+}}
+
+function renderWindow(force) {{
+    var start = Math.max(0, Math.min(Math.floor(window.scrollY / 120) - batch, rendered - windowSize));
+    if (!force && start === windowStart) {{
+        return;
+    }}
+    windowStart = start;
+    while (spacer.nextSibling) {{
+        root.removeChild(spacer.nextSibling);
+    }}
+    var end = Math.min(rendered, start + windowSize);
+    for (var i = start; i < end; i++) {{
+        root.appendChild(block(i));
+    }}
+    spacer.style.height = (start * 120) + 'px';
+    filler.style.height = ((rendered - end) * 120) + 'px';
+}}
+
+function loadMore() {{
+    var end = Math.min(total, rendered + batch);
+    if (windowSize) {{
+        rendered = end;
+        renderWindow(true);
+    }} else {{
+        for (; rendered < end; rendered++) {{
+            root.appendChild(block(rendered));
+        }}
+    }}
+    loading = false;
+}}
+
+window.addEventListener('scroll', function () {{
+    if (windowSize) {{
+        renderWindow(false);
+    }}
+    if (!loading && rendered < total && window.innerHeight + window.scrollY >= document.body.scrollHeight - 240) {{
+        loading = true;
+        setTimeout(loadMore, 100);
+    }}
+}});
+
+loadMore();
+</script>
+</body>
+</html>
+"""
+
+BLOCK_TEMPLATE = '<div class="_3XrzE _5fgzK" data-id="{id}"><div class="IlTNG">Performance {id}</div></div>'
+
+DETAIL_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8">
+<script type="application/ld+json">{{"@context": "https://schema.org", "@type": "TheaterEvent", "name": "Performance {id}",
+"startDate": "2026-11-0{day}T19:00:00+03:00", "image": "/images/{id}.jpg",
+"location": {{"@type": "Place", "name": "Stage {id}", "address": "Test street, {id}"}},
+"offers": {{"@type": "AggregateOffer", "lowPrice": "1000", "highPrice": "{price}", "priceCurrency": "RUB"}}}}</script>
+</head><body><h1>Detail {id}</h1></body></html>
+"""
+
+
+class FixtureServer:
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 fixtures_dir: Optional[str] = None):
+        self.hits = Counter()
+        self.latency = latency
+        self.fixtures_dir = fixtures_dir
+        self.recorded_origin: Optional[str] = None
+        self.recorded_details: Dict[str, str] = {}
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+        if fixtures_dir:
+            self._load_manifest()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def listing_url(self, blocks: int, variant: str = "plain") -> str:
+        return f"{self.base_url}/listing?blocks={blocks}&variant={variant}"
+
+    def recorded_url(self, name: str = "listing.html") -> str:
+        return f"{self.base_url}/recorded/{name}"
+
+    def rewrite_links(self, body: str) -> str:
+        if not self.recorded_origin:
+            return body
+
+        netloc = urlparse(self.recorded_origin).netloc
+        for scheme in ("https://", "http://"):
+            body = body.replace(scheme + netloc, self.base_url)
+        return body.replace("//" + netloc, "//" + urlparse(self.base_url).netloc)
+
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.fixtures_dir, "manifest.json"), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        source = urlparse(manifest.get("source") or "")
+        if source.netloc:
+            self.recorded_origin = f"{source.scheme}://{source.netloc}"
+        for detail in manifest.get("details", []):
+            self.recorded_details[urlparse(detail["url"]).path.rstrip("/")] = detail["file"]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _make_handler(self):
+        fixture_server = self
+        hits = self.hits
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if fixture_server.latency:
+                    time.sleep(fixture_server.latency)
+
+                if parsed.path == "/listing":
+                    hits["listing"] += 1
+                    query = parse_qs(parsed.query)
+                    count = int(query.get("blocks", ["10"])[0])
+                    variant = query.get("variant", ["plain"])[0]
+                    if variant in ("infinite", "virtual"):
+                        batch = int(query.get("batch", ["20"])[0])
+                        self._respond(INFINITE_TEMPLATE.format(total=count, batch=batch,
+                                                               window_size=batch * 2 if variant == "virtual" else 0))
+                        return
+                    if variant == "generated":
+                        blocks = generate_blocks(count)
+                    else:
+                        blocks = "".join(BLOCK_TEMPLATE.format(id=i) for i in range(count))
+                    self._respond(LISTING_TEMPLATE.format(blocks=blocks))
+                elif parsed.path.startswith("/recorded/") and fixture_server.fixtures_dir:
+                    self._respond_recorded(parsed.path[len("/recorded/"):])
+                elif parsed.path.rstrip("/") in fixture_server.recorded_details:
+                    hits["detail"] += 1
+                    self._respond_recorded(fixture_server.recorded_details[parsed.path.rstrip("/")])
+                elif parsed.path.startswith(("/w/performance/", "/w/event/", "/w/creations/")):
+                    hits["detail"] += 1
+                    detail_id = parsed.path.rstrip("/").rsplit("/", 1)[-1]
+                    day = int(detail_id) % 9 + 1 if detail_id.isdigit() else 1
+                    self._respond(DETAIL_TEMPLATE.format(id=detail_id, day=day, price=1000 + day * 500))
+                else:
+                    hits["other"] += 1
+                    self.send_error(404)
+
+            def _respond_recorded(self, name: str):
+                root = os.path.realpath(fixture_server.fixtures_dir)
+                path = os.path.realpath(os.path.join(root, name))
+                if not path.startswith(root + os.sep) or not os.path.isfile(path):
+                    hits["other"] += 1
+                    self.send_error(404)
+                    return
+
+                hits["recorded"] += 1
+                with open(path, "r", encoding="utf-8") as f:
+                    self._respond(fixture_server.rewrite_links(f.read()))
+
+            def _respond(self, body: str):
+                payload = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
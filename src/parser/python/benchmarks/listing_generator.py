@@ -0,0 +1,28 @@
+import random
+
+BLOCK_VARIANTS = (
+    '<div class="_3XrzE _5fgzK" data-id="{id}"><a href="/w/performance/{id}/">'
+    '<div class="IlTNG">Спектакль {id}</div></a><div class="meta">12+ · Театр {id}</div>{filler}</div>',
+    '<div class="_3XrzE _5fgzK" data-href="/w/event/{id}"><h3>Концерт <b>{id}</b></h3>'
+    '<span class="event-name">Name {id}</span>{filler}</div>',
+    '<div class="_3XrzE _5fgzK"><div class="card-title">Выставка {id}</div>'
+    '<a href="/w/creations/{id}">Подробнее</a><a href="/w/performance/{id}">x</a>{filler}</div>',
+    '<div class="_3XrzE _5fgzK"><span>Без заголовка {id}</span><p>описание</p>{filler}</div>',
+)
+
+FILLER = '<div class="_2kU8B"><span>Сеанс</span><img src="/img/{id}.jpg"><svg><path d="M0 0L10 10"/></svg></div>'
+
+
+def generate_blocks(blocks: int, filler: int = 20, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    parts = []
+    for i in range(blocks):
+        template = BLOCK_VARIANTS[rng.randrange(len(BLOCK_VARIANTS))]
+        parts.append(template.format(id=i, filler=FILLER.format(id=i) * filler))
+    return "".join(parts)
+
+
+def generate_listing(blocks: int, filler: int = 20, seed: int = 1) -> str:
+    return ('<!DOCTYPE html><html><head><meta charset="utf-8"><title>Афиша</title>'
+            '<script>var tracking = {"a": 1};</script></head><body><div id="root"><main>'
+            + generate_blocks(blocks, filler, seed) + '</main></div></body></html>')
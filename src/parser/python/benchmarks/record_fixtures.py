@@ -0,0 +1,63 @@
+import argparse
+import json
+import os
+import sys
+from urllib.parse import urlparse
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from html_parser import HtmlParser
+from static_fetcher import StaticFetcher
+
+
+def fixture_name(url: str) -> str:
+    path = urlparse(url).path.strip("/").replace("/", "_") or "index"
+    return f"{path}.html"
+
+
+def record(url: str, directory: str, details: int, browser: bool) -> dict:
+    os.makedirs(directory, exist_ok=True)
+
+    if browser:
+        from web_driver_manager import WebDriverManager
+        listing = WebDriverManager().get_page_content(url)
+    else:
+        listing = StaticFetcher().fetch(url)
+    if not listing:
+        raise SystemExit(f"Could not fetch {url}")
+
+    with open(os.path.join(directory, "listing.html"), "w", encoding="utf-8") as f:
+        f.write(listing)
+
+    fetcher = StaticFetcher()
+    recorded = []
+    for performance in HtmlParser().parse_performances(listing, url)[:details]:
+        detail_url = performance.detail_url
+        content = fetcher.fetch(detail_url) if detail_url else None
+        if content:
+            name = fixture_name(detail_url)
+            with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+                f.write(content)
+            recorded.append({"url": detail_url, "file": name})
+
+    manifest = {"source": url, "listing": "listing.html", "details": recorded}
+    with open(os.path.join(directory, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record an afisha listing and its detail pages for offline benchmarks")
+    parser.add_argument("url")
+    parser.add_argument("--out", default=os.path.join(BENCH_DIR, "fixtures"))
+    parser.add_argument("--details", type=int, default=20, help="number of detail pages to record")
+    parser.add_argument("--browser", action="store_true", help="record the rendered listing instead of the raw HTML")
+    args = parser.parse_args()
+
+    manifest = record(args.url, args.out, args.details, args.browser)
+    print(f"Recorded listing and {len(manifest['details'])} detail pages into {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Iterable, Optional
+
+from performance import Performance
+from url_utils import UrlUtils
+
+
+class ChangeTracker:
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or os.environ.get('PARSER_STATE_DIR', '.parser_state')
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def fingerprint(record: Dict[str, str]) -> str:
+        payload = json.dumps(record, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+    def diff(self, source: str, performances: Iterable[Performance], save: bool = True) -> Dict:
+        with self._lock:
+            previous = self.load(source)
+            current = {}
+            added = []
+            changed = []
+
+            for performance in performances:
+                key = performance.key
+                if key in current:
+                    continue
+                record = performance.to_dict()
+                fingerprint = self.fingerprint(record)
+                current[key] = [record['title'], record['detail_url'], fingerprint]
+
+                if key not in previous:
+                    added.append(record)
+                elif previous[key][2] != fingerprint:
+                    changed.append(record)
+
+            removed = [{"title": title, "detail_url": detail_url}
+                       for key, (title, detail_url, _) in previous.items() if key not in current]
+
+            if save:
+                self.save(source, current)
+
+        return {
+            "source": source,
+            "added": added,
+            "changed": changed,
+            "removed": removed,
+            "unchanged": len(current) - len(added) - len(changed),
+        }
+
+    def load(self, source: str) -> Dict[str, list]:
+        try:
+            with open(self._snapshot_path(source), 'r', encoding='utf-8') as f:
+                return json.load(f).get('items', {})
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, source: str, items: Dict[str, list]):
+        path = self._snapshot_path(source)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"source": source, "items": items}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, path)
+
+    def _snapshot_path(self, source: str) -> str:
+        key = UrlUtils.cache_key(source) if UrlUtils.is_valid_url(source) else os.path.abspath(source)
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest() + ".json")
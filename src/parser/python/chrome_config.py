@@ -1,12 +1,58 @@
 import os
-from typing import Optional
+from typing import List, Optional
 
 from selenium.webdriver.chrome.options import Options
 
 
 class ChromeConfig:
+    USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/120.0.0.0 Safari/537.36")
+
+    RENDER_PROFILES = ("full", "lite")
+
+    BLOCKED_RESOURCE_PATTERNS = [
+        "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.ico", "*.bmp",
+        "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+        "*.mp4", "*.webm", "*.m3u8", "*.mp3", "*.ogg", "*.wav",
+    ]
+
+    BLOCKED_HOST_PATTERNS = [
+        "*google-analytics.com*", "*googletagmanager.com*", "*googlesyndication.com*", "*doubleclick.net*",
+        "*mc.yandex.ru*", "*an.yandex.ru*", "*yandex.ru/ads*", "*yastatic.net/pcode*", "*adfox.ru*",
+        "*adriver.ru*", "*top-fwz1.mail.ru*", "*ad.mail.ru*", "*vk.com/rtrg*", "*connect.facebook.net*",
+        "*criteo.*", "*hotjar.com*", "*mediator.media*", "*tns-counter.ru*", "*relap.io*", "*smi2.ru*",
+    ]
+
+    @staticmethod
+    def render_profile() -> str:
+        profile = os.environ.get('PARSER_RENDER_PROFILE', 'lite')
+        return profile if profile in ChromeConfig.RENDER_PROFILES else 'lite'
+
+    @staticmethod
+    def blocked_url_patterns(profile: Optional[str] = None) -> List[str]:
+        if (profile or ChromeConfig.render_profile()) == 'full':
+            return []
+
+        extra = [pattern.strip() for pattern in os.environ.get('PARSER_BLOCKED_URLS', '').split(',') if pattern.strip()]
+        return ChromeConfig.BLOCKED_RESOURCE_PATTERNS + ChromeConfig.BLOCKED_HOST_PATTERNS + extra
+
     @staticmethod
-    def get_chrome_options() -> Options:
+    def apply_render_profile(driver, profile: Optional[str] = None) -> bool:
+        patterns = ChromeConfig.blocked_url_patterns(profile)
+        if not patterns:
+            return False
+
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+            return True
+        except Exception as e:
+            print(f"Error applying render profile: {e}")
+            return False
+
+    @staticmethod
+    def get_chrome_options(profile: Optional[str] = None) -> Options:
+        profile = profile or ChromeConfig.render_profile()
         chrome_options = Options()
 
         chrome_options.add_argument("--headless")
@@ -29,8 +75,18 @@ class ChromeConfig:
         chrome_options.add_argument("--window-size=800, 600")
         chrome_options.add_argument("--disable-web-security")
         chrome_options.add_argument("--disable-features=VizDisplayCompositor")
-        chrome_options.add_argument(
-            "--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+        chrome_options.add_argument(f"--user-agent={ChromeConfig.USER_AGENT}")
+
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+        if profile == "lite":
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+            chrome_options.add_argument("--autoplay-policy=user-gesture-required")
+            chrome_options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.notifications": 2,
+                "profile.default_content_setting_values.geolocation": 2,
+            })
 
         chrome_bin = os.environ.get('CHROME_BIN', '/usr/bin/chromium-browser')
         if os.path.exists(chrome_bin):
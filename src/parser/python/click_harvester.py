@@ -0,0 +1,101 @@
+from typing import List, Optional
+
+from resilience import DriverFailure
+from url_utils import UrlUtils
+
+
+class ClickHarvester:
+    HARVEST_SCRIPT = """
+        var selector = arguments[0];
+        var done = arguments[arguments.length - 1];
+        var blocks = Array.prototype.slice.call(document.querySelectorAll(selector));
+        var results = [];
+        var captured = null;
+        var origin = location.href;
+
+        var originalPushState = history.pushState;
+        var originalReplaceState = history.replaceState;
+        var originalOpen = window.open;
+
+        function capture(url) {
+            if (captured !== null || url === undefined || url === null || url === '') {
+                return;
+            }
+            try {
+                captured = new URL(url, location.href).href;
+            } catch (e) {
+                captured = String(url);
+            }
+        }
+
+        function onClick(event) {
+            var anchor = event.target && event.target.closest ? event.target.closest('a[href]') : null;
+            if (anchor) {
+                capture(anchor.href);
+                event.preventDefault();
+            }
+        }
+
+        function clickTarget(block) {
+            var rect = block.getBoundingClientRect();
+            var target = document.elementFromPoint(rect.left + rect.width / 2, rect.top + rect.height / 2);
+            return target && block.contains(target) ? target : block;
+        }
+
+        history.pushState = function (state, title, url) { capture(url); };
+        history.replaceState = function (state, title, url) { capture(url); };
+        window.open = function (url) { capture(url); return null; };
+        document.addEventListener('click', onClick, true);
+
+        function restore() {
+            history.pushState = originalPushState;
+            history.replaceState = originalReplaceState;
+            window.open = originalOpen;
+            document.removeEventListener('click', onClick, true);
+        }
+
+        function next(index) {
+            if (index >= blocks.length) {
+                restore();
+                done(results);
+                return;
+            }
+            captured = null;
+            try {
+                var block = blocks[index];
+                block.scrollIntoView({block: 'center'});
+                clickTarget(block).click();
+            } catch (e) {
+                results.push(null);
+                setTimeout(function () { next(index + 1); }, 0);
+                return;
+            }
+            setTimeout(function () {
+                results.push(captured !== origin ? captured : null);
+                next(index + 1);
+            }, 0);
+        }
+
+        try {
+            next(0);
+        } catch (e) {
+            restore();
+            done(results);
+        }
+    """
+
+    def __init__(self, script_timeout: int = 60):
+        self.script_timeout = script_timeout
+        self.url_utils = UrlUtils()
+
+    def harvest(self, driver, selector: str = "div._3XrzE._5fgzK") -> List[Optional[str]]:
+        try:
+            driver.set_script_timeout(self.script_timeout)
+            urls = driver.execute_async_script(self.HARVEST_SCRIPT, selector)
+        except Exception as e:
+            if DriverFailure.is_fatal(e):
+                raise
+            print(f"Error in ClickHarvester.harvest: {e}")
+            return []
+
+        return [self.url_utils.clean_url(url) if url else None for url in urls or []]
@@ -0,0 +1,299 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
+
+from afisha_parser import AfishaParser
+from batch_crawler import HostThrottle
+from driver_pool import DriverPool
+from metrics import Metrics
+from performance import Performance
+from web_driver_manager import WebDriverManager
+
+
+class CrawlQueue:
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            url TEXT NOT NULL,
+            block_index INTEGER NOT NULL DEFAULT -1,
+            payload TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            lease_owner TEXT,
+            lease_expires REAL,
+            tier TEXT,
+            error TEXT,
+            updated_at REAL NOT NULL,
+            UNIQUE (kind, url, block_index)
+        );
+        CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, lease_expires);
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER NOT NULL REFERENCES jobs (id),
+            source TEXT NOT NULL,
+            record_key TEXT NOT NULL,
+            record TEXT NOT NULL,
+            UNIQUE (source, record_key)
+        );
+    """
+
+    def __init__(self, path: Optional[str] = None, lease_seconds: Optional[float] = None,
+                 max_attempts: Optional[int] = None, owner: Optional[str] = None):
+        self.path = path or os.environ.get('PARSER_QUEUE_PATH', 'crawl_queue.sqlite')
+        self.lease_seconds = lease_seconds or float(os.environ.get('PARSER_QUEUE_LEASE_SECONDS', '300'))
+        self.max_attempts = max_attempts or int(os.environ.get('PARSER_QUEUE_MAX_ATTEMPTS', '3'))
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+        self._connection().executescript(self.SCHEMA)
+
+    def enqueue_listings(self, urls: Iterable[str]) -> int:
+        return self._enqueue(("listing", url.strip(), -1, None) for url in urls if url and url.strip())
+
+    def enqueue_blocks(self, url: str, blocks: Iterable[Dict]) -> int:
+        return self._enqueue(("block", url, block["index"], json.dumps(block, ensure_ascii=False))
+                             for block in blocks)
+
+    def claim(self) -> Optional[Dict]:
+        now = time.time()
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT id, kind, url, block_index, payload, attempts FROM jobs "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY kind = 'listing', id LIMIT 1", (now,)).fetchone()
+            if row is None:
+                return None
+
+            connection.execute(
+                "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1, "
+                "updated_at = ? WHERE id = ?", (self.owner, now + self.lease_seconds, now, row[0]))
+
+        job = {"id": row[0], "kind": row[1], "url": row[2], "block_index": row[3], "attempt": row[5] + 1}
+        if row[4]:
+            job["payload"] = json.loads(row[4])
+        return job
+
+    def reclaim_orphans(self) -> int:
+        host = socket.gethostname()
+        orphaned = []
+        for job_id, owner in self._connection().execute(
+                "SELECT id, lease_owner FROM jobs WHERE status = 'leased' AND lease_owner LIKE ?", (f"{host}:%",)):
+            pid = int(owner.rsplit(":", 1)[1])
+            if pid != os.getpid() and not self._process_alive(pid):
+                orphaned.append((time.time(), job_id, owner))
+
+        with self._transaction() as connection:
+            connection.executemany("UPDATE jobs SET status = 'pending', lease_owner = NULL, lease_expires = NULL, "
+                                   "updated_at = ? WHERE id = ? AND lease_owner = ?", orphaned)
+        return len(orphaned)
+
+    def extend_leases(self):
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute("UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                               "WHERE status = 'leased' AND lease_owner = ?",
+                               (now + self.lease_seconds, now, self.owner))
+
+    def checkpoint(self, job: Dict, performance: Performance):
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT INTO results (job_id, source, record_key, record) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (source, record_key) DO UPDATE SET record = excluded.record",
+                (job["id"], job["url"], performance.key, performance.to_json()))
+
+    def complete(self, job: Dict, tier: Optional[str] = None):
+        self._finish(job, "done", tier=tier)
+
+    def fail(self, job: Dict, error: str):
+        status = "failed" if job["attempt"] >= self.max_attempts else "pending"
+        self._finish(job, status, error=error)
+
+    def counts(self) -> Dict[str, int]:
+        connection = self._connection()
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        for status, count in connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+            counts[status] = count
+        counts["results"] = connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return counts
+
+    def results_by_source(self) -> Dict[str, List[Performance]]:
+        by_source: Dict[str, List[Performance]] = {}
+        for url, in self._connection().execute("SELECT url FROM jobs WHERE kind = 'listing' ORDER BY id"):
+            by_source[url] = []
+        for source, record in self._connection().execute("SELECT source, record FROM results ORDER BY id"):
+            by_source.setdefault(source, []).append(Performance.from_dict(json.loads(record), source))
+        return by_source
+
+    def reports(self) -> List[Dict]:
+        rows = self._connection().execute(
+            "SELECT jobs.url, jobs.tier, jobs.status, jobs.attempts, jobs.error, COUNT(results.id) FROM jobs "
+            "LEFT JOIN results ON results.job_id = jobs.id WHERE jobs.kind = 'listing' GROUP BY jobs.id "
+            "ORDER BY jobs.id")
+        return [{"url": url, "tier": tier, "status": status, "attempts": attempts, "error": error, "count": count}
+                for url, tier, status, attempts, error, count in rows]
+
+    def close(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def _enqueue(self, jobs: Iterable) -> int:
+        now = time.time()
+        with self._transaction() as connection:
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO jobs (kind, url, block_index, payload, updated_at) VALUES (?, ?, ?, ?, ?)",
+                ((kind, url, index, payload, now) for kind, url, index, payload in jobs))
+            return connection.total_changes - before
+
+    def _finish(self, job: Dict, status: str, tier: Optional[str] = None, error: Optional[str] = None):
+        with self._transaction() as connection:
+            connection.execute(
+                "UPDATE jobs SET status = ?, tier = ?, error = ?, lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? WHERE id = ? AND lease_owner = ?",
+                (status, tier, error, time.time(), job["id"], self.owner))
+
+    @staticmethod
+    def _process_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+
+class QueueWorker:
+
+    def __init__(self, queue: CrawlQueue, workers: Optional[int] = None, driver_pool: Optional[DriverPool] = None,
+                 use_cache: bool = True, per_host: int = 2, politeness_delay: float = 1.0):
+        self.queue = queue
+        self.driver_pool = driver_pool or DriverPool.shared()
+        self.workers = workers or self.driver_pool.size
+        self.driver_pool.resize(max(self.driver_pool.size, self.workers))
+        self.use_cache = use_cache
+        self.throttle = HostThrottle(per_host, politeness_delay)
+        self.metrics = Metrics.shared()
+        self._stopped = threading.Event()
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+    def run(self) -> Dict[str, int]:
+        heartbeat = threading.Thread(target=self._heartbeat, name="queue-heartbeat", daemon=True)
+        heartbeat.start()
+
+        threads = [threading.Thread(target=self._work, name=f"queue-worker-{i}") for i in range(self.workers)]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            self._stopped.set()
+
+        return self.queue.counts()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _work(self):
+        while not self._stopped.is_set():
+            with self._in_flight_lock:
+                job = self.queue.claim()
+                if job is None and self._in_flight == 0:
+                    return
+                if job is not None:
+                    self._in_flight += 1
+
+            if job is None:
+                self._stopped.wait(0.5)
+                continue
+
+            try:
+                self._run(job)
+            finally:
+                with self._in_flight_lock:
+                    self._in_flight -= 1
+
+    def _run(self, job: Dict):
+        started = time.perf_counter()
+        try:
+            if job["kind"] == "listing":
+                tier = self._run_listing(job)
+            else:
+                tier = self._run_block(job)
+        except Exception as e:
+            self.metrics.inc("queue_jobs", kind=job["kind"], status="failed")
+            print(f"Error in queue job {job['kind']} {job['url']}: {e}")
+            self.queue.fail(job, str(e))
+            return
+
+        self.queue.complete(job, tier)
+        self.metrics.inc("queue_jobs", kind=job["kind"], status="done")
+        print(f"{job['kind']} {job['url']}"
+              + (f" #{job['block_index']}" if job["kind"] == "block" else "")
+              + f": {tier} in {round(time.perf_counter() - started, 3)}s")
+
+    def _run_listing(self, job: Dict) -> Optional[str]:
+        url = job["url"]
+        with self.throttle.slot(url):
+            parser = AfishaParser(driver_pool=self.driver_pool, use_cache=self.use_cache)
+            parser.parse_performances_from_url(url, on_record=lambda record: self.queue.checkpoint(job, record))
+
+        if parser.last_tier in (None, "none"):
+            raise RuntimeError(f"No performances parsed from {url}")
+        if parser.last_tier == "browser_clicks" and parser.web_driver.last_unresolved:
+            self.queue.enqueue_blocks(url, parser.web_driver.last_unresolved)
+        return parser.last_tier
+
+    def _run_block(self, job: Dict) -> Optional[str]:
+        url = job["url"]
+        with self.throttle.slot(url):
+            detail_url = WebDriverManager(driver_pool=self.driver_pool).resolve_block(url, job["block_index"])
+
+        if not detail_url:
+            return "unresolved"
+
+        title = job.get("payload", {}).get("title") or ""
+        self.queue.checkpoint(job, Performance.create(title, detail_url, url))
+        return "block_click"
+
+    def _heartbeat(self):
+        while not self._stopped.wait(self.queue.lease_seconds / 3):
+            try:
+                self.queue.extend_leases()
+            except sqlite3.Error as e:
+                print(f"Error extending queue leases: {e}")
@@ -0,0 +1,313 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urljoin
+
+from lxml import etree, html
+
+from metrics import Metrics
+from page_cache import PageCache
+from performance import Performance
+from static_fetcher import StaticFetcher
+from url_utils import UrlUtils
+
+
+class DetailExtractor:
+    EVENT_TYPES = frozenset((
+        "Event", "TheaterEvent", "MusicEvent", "ScreeningEvent", "ExhibitionEvent", "ComedyEvent",
+        "DanceEvent", "ChildrensEvent", "EducationEvent", "Festival", "LiteraryEvent", "SocialEvent",
+        "SportsEvent", "VisualArtsEvent",
+    ))
+
+    JSON_LD_XPATH = etree.XPath("//script[@type='application/ld+json']/text()")
+    EVENT_SCOPE_XPATH = etree.XPath("//*[@itemscope and @itemtype]")
+    MAIN_CONTENT_XPATH = etree.XPath("//main | //*[@role='main'] | //article")
+    DATETIME_XPATH = etree.XPath(".//time/@datetime | .//*[@itemprop='startDate']/@content")
+    MICRODATA_PRICE_XPATH = etree.XPath(
+        ".//*[@itemprop='price' or @itemprop='lowPrice' or @itemprop='highPrice']/@content")
+    MICRODATA_CURRENCY_XPATH = etree.XPath(".//*[@itemprop='priceCurrency']/@content")
+    OG_IMAGE_XPATH = etree.XPath("//meta[@property='og:image']/@content")
+    VENUE_XPATH = etree.XPath("//*[@itemprop='location']//*[@itemprop='name']")
+    ADDRESS_XPATH = etree.XPath("//*[@itemprop='address']")
+    PRICE_PATTERN = re.compile(r'(\d[\d\s  ]{0,9})\s*(?:₽|руб)', re.IGNORECASE)
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def extract(self, content: str, base_url: Optional[str] = None) -> Dict:
+        if not content:
+            return {}
+
+        try:
+            root = html.document_fromstring(content.encode("utf-8"), parser=self._parser())
+        except (etree.ParserError, ValueError):
+            return {}
+
+        details = self._from_json_ld(root)
+        for key, value in self._from_dom(root).items():
+            details.setdefault(key, value)
+
+        if base_url and details.get("images"):
+            details["images"] = [urljoin(base_url, image) for image in details["images"]]
+            details["image"] = details["images"][0]
+        return details
+
+    def _parser(self) -> html.HTMLParser:
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = self._local.parser = html.HTMLParser(encoding="utf-8", remove_comments=True, remove_pis=True)
+        return parser
+
+    def _from_json_ld(self, root) -> Dict:
+        events = []
+        for script in self.JSON_LD_XPATH(root):
+            try:
+                data = json.loads(script.strip())
+            except ValueError:
+                continue
+            events.extend(self._events(data))
+
+        if not events:
+            return {}
+
+        details: Dict = {}
+        dates = sorted({event["startDate"] for event in events if isinstance(event.get("startDate"), str)})
+        if dates:
+            details["dates"] = dates
+            details["start_date"] = dates[0]
+        end_dates = sorted(event["endDate"] for event in events if isinstance(event.get("endDate"), str))
+        if end_dates or dates:
+            details["end_date"] = (end_dates or dates)[-1]
+
+        for event in events:
+            venue, address = self._location(event.get("location"))
+            if venue and "venue" not in details:
+                details["venue"] = venue
+            if address and "address" not in details:
+                details["address"] = address
+
+        prices = []
+        for event in events:
+            for offer in self._as_list(event.get("offers")):
+                if not isinstance(offer, dict):
+                    continue
+                for key in ("lowPrice", "highPrice", "price"):
+                    price = self._price(offer.get(key))
+                    if price is not None:
+                        prices.append(price)
+                if offer.get("priceCurrency") and "currency" not in details:
+                    details["currency"] = offer["priceCurrency"]
+        if prices:
+            details["price_min"] = min(prices)
+            details["price_max"] = max(prices)
+
+        images = []
+        for event in events:
+            for image in self._as_list(event.get("image")):
+                url = image.get("url") if isinstance(image, dict) else image
+                if isinstance(url, str) and url not in images:
+                    images.append(url)
+        if images:
+            details["image"] = images[0]
+            details["images"] = images
+
+        return details
+
+    def _from_dom(self, root) -> Dict:
+        details: Dict = {}
+        scope = self._event_scope(root)
+
+        dates = sorted(set(self.DATETIME_XPATH(scope))) if scope is not None else []
+        if dates:
+            details["dates"] = dates
+            details["start_date"] = dates[0]
+            details["end_date"] = dates[-1]
+
+        venue = self.VENUE_XPATH(root)
+        if venue:
+            details["venue"] = venue[0].text_content().strip()
+        address = self.ADDRESS_XPATH(root)
+        if address:
+            details["address"] = " ".join(address[0].text_content().split())
+
+        images = self.OG_IMAGE_XPATH(root)
+        if images:
+            details["image"] = images[0]
+            details["images"] = list(dict.fromkeys(images))
+
+        if scope is None:
+            return details
+
+        currency = "RUB"
+        prices = [self._price(value) for value in self.MICRODATA_PRICE_XPATH(scope)]
+        if any(prices):
+            currency = next(iter(self.MICRODATA_CURRENCY_XPATH(scope)), currency)
+        else:
+            prices = [self._price(match) for match in self.PRICE_PATTERN.findall(scope.text_content())]
+        prices = [price for price in prices if price]
+        if prices:
+            details["price_min"] = min(prices)
+            details["price_max"] = max(prices)
+            details["currency"] = currency
+
+        return details
+
+    def _event_scope(self, root):
+        for element in self.EVENT_SCOPE_XPATH(root):
+            if element.get("itemtype").rstrip("/").rsplit("/", 1)[-1] in self.EVENT_TYPES:
+                return element
+
+        main = self.MAIN_CONTENT_XPATH(root)
+        return main[0] if main else None
+
+    def _events(self, data) -> List[Dict]:
+        events = []
+        for item in self._as_list(data):
+            if not isinstance(item, dict):
+                continue
+            if "@graph" in item:
+                events.extend(self._events(item["@graph"]))
+            types = set(self._as_list(item.get("@type")))
+            if types & self.EVENT_TYPES:
+                events.append(item)
+                events.extend(self._events(item.get("subEvent")))
+        return events
+
+    def _location(self, location):
+        for place in self._as_list(location):
+            if not isinstance(place, dict):
+                continue
+            address = place.get("address")
+            if isinstance(address, dict):
+                address = ", ".join(part for part in (address.get("streetAddress"), address.get("addressLocality"))
+                                    if isinstance(part, str) and part)
+            return place.get("name"), address if isinstance(address, str) and address else None
+        return None, None
+
+    @staticmethod
+    def _price(value) -> Optional[float]:
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, str):
+            digits = re.sub(r'[^\d.,]', '', value).replace(',', '.')
+            try:
+                return float(digits) if digits else None
+            except ValueError:
+                return None
+        return None
+
+    @staticmethod
+    def _as_list(value) -> list:
+        if value is None:
+            return []
+        return value if isinstance(value, list) else [value]
+
+
+class DetailEnricher:
+
+    def __init__(self, workers: Optional[int] = None, attempts: int = 3, backoff: float = 0.5,
+                 page_cache: Optional[PageCache] = None, use_cache: bool = True, browser_fallback: bool = True,
+                 driver_pool=None, fetcher: Optional[StaticFetcher] = None):
+        self.workers = workers or int(os.environ.get('PARSER_ENRICH_WORKERS', '16'))
+        self.attempts = attempts
+        self.backoff = backoff
+        self.page_cache = (page_cache or PageCache.shared()) if use_cache else None
+        self.browser_fallback = browser_fallback
+        self.driver_pool = driver_pool
+        self.fetcher = fetcher or StaticFetcher()
+        self.extractor = DetailExtractor()
+        self.metrics = Metrics.shared()
+
+    def enrich(self, performances: Iterable[Performance],
+               on_record: Optional[Callable[[Performance], None]] = None) -> List[Performance]:
+        performances = list(performances)
+        enriched = list(performances)
+        indices_by_key: Dict[str, List[int]] = {}
+
+        for index, performance in enumerate(performances):
+            if performance.detail_url:
+                indices_by_key.setdefault(performance.key, []).append(index)
+            else:
+                self._emit(performance, on_record)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.details_for, performances[indices[0]].detail_url): indices
+                       for indices in indices_by_key.values()}
+
+            for future in as_completed(futures):
+                try:
+                    details = future.result()
+                except Exception as e:
+                    self.metrics.inc("errors", component="detail_enricher")
+                    print(f"Error enriching {performances[futures[future][0]].detail_url}: {e}")
+                    details = {}
+                for index in futures[future]:
+                    enriched[index] = performances[index].with_details(details)
+                    self._emit(enriched[index], on_record)
+
+        return enriched
+
+    def details_for(self, detail_url: str) -> Dict:
+        url = UrlUtils.clean_url(detail_url)
+
+        with self.metrics.timer("phase_seconds", phase="enrich_detail"):
+            cached_entry = None
+            if self.page_cache:
+                cached = self.page_cache.lookup_fresh(url)
+                if cached is not None:
+                    self.metrics.inc("enrichment", source="cache")
+                    return cached[0] if cached else {}
+                cached_entry = self.page_cache.get(url)
+
+            result = self._fetch(url, cached_entry)
+            if result is not None and result.not_modified and cached_entry:
+                self.metrics.inc("enrichment", source="cache_revalidated")
+                cached = self.page_cache.revalidated(url, cached_entry)
+                return cached[0] if cached else {}
+
+            content = result.text if result is not None else None
+            details = self.extractor.extract(content, url) if content else {}
+            source = "static"
+
+            if not details and self.browser_fallback:
+                content = self._browser_content(url)
+                details = self.extractor.extract(content, url) if content else {}
+                source = "browser"
+
+            self.metrics.inc("enrichment", source=source if details else "empty")
+            if self.page_cache and details:
+                try:
+                    self.page_cache.put(url, content, [details], result.etag if result else None,
+                                        result.last_modified if result else None)
+                except OSError as e:
+                    print(f"Error writing page cache for {url}: {e}")
+            return details
+
+    def _fetch(self, url: str, cached_entry: Optional[Dict]):
+        etag = cached_entry.get('etag') if cached_entry else None
+        last_modified = cached_entry.get('last_modified') if cached_entry else None
+
+        result = None
+        for attempt in range(self.attempts):
+            result = self.fetcher.request(url, etag, last_modified)
+            if result.ok or not result.retryable:
+                break
+            self.metrics.inc("enrichment_retries")
+            time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+        return result if result is not None and result.ok else None
+
+    def _browser_content(self, url: str) -> Optional[str]:
+        from web_driver_manager import WebDriverManager
+
+        return WebDriverManager(driver_pool=self.driver_pool).get_page_content(url)
+
+    @staticmethod
+    def _emit(record: Performance, on_record: Optional[Callable[[Performance], None]]):
+        if on_record:
+            on_record(record)
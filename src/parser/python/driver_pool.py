@@ -0,0 +1,298 @@
+import atexit
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from queue import Empty, Queue
+from typing import Dict, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+from chrome_config import ChromeConfig
+from metrics import Metrics
+from resilience import DriverFailure, DriverWatchdog
+
+
+class PooledDriver:
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.monotonic()
+        self.baseline_rss_mb: Optional[float] = None
+        self.crashed = False
+
+
+class DriverPool:
+    _shared: Optional["DriverPool"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, size: Optional[int] = None, max_pages: Optional[int] = None,
+                 max_rss_growth_mb: Optional[int] = None, lease_timeout: float = 120,
+                 lease_deadline: Optional[float] = None, page_load_timeout: Optional[float] = None):
+        self.size = size if size is not None else int(os.environ.get('PARSER_POOL_SIZE', '2'))
+        self.max_pages = max_pages if max_pages is not None else int(os.environ.get('PARSER_POOL_MAX_PAGES', '50'))
+        self.max_rss_growth_mb = (max_rss_growth_mb if max_rss_growth_mb is not None
+                                  else int(os.environ.get('PARSER_POOL_MAX_RSS_GROWTH_MB', '300')))
+        self.lease_timeout = lease_timeout
+        self.lease_deadline = (lease_deadline if lease_deadline is not None
+                               else float(os.environ.get('PARSER_LEASE_DEADLINE', '240')))
+        self.page_load_timeout = (page_load_timeout if page_load_timeout is not None
+                                  else float(os.environ.get('PARSER_PAGE_LOAD_TIMEOUT', '30')))
+        self.render_profile = ChromeConfig.render_profile()
+        self.chrome_options = ChromeConfig.get_chrome_options(self.render_profile)
+        self.chromedriver_path = ChromeConfig.get_chromedriver_path()
+
+        self._idle: "Queue[PooledDriver]" = Queue()
+        self._leased: Dict[int, PooledDriver] = {}
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+        self.metrics = Metrics.shared()
+        self.watchdog = DriverWatchdog.shared()
+        self.stats: Dict[str, int] = {"spawned": 0, "leases": 0, "recycled": 0, "unhealthy": 0, "crashed": 0}
+
+    @classmethod
+    def shared(cls) -> "DriverPool":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+                atexit.register(cls._shared.close)
+            return cls._shared
+
+    def warm_up(self, count: Optional[int] = None):
+        for _ in range(min(self.size if count is None else count, self.size)):
+            if not self._reserve_slot():
+                break
+            pooled = self._spawn_reserved()
+            if pooled and not self._put_idle(pooled):
+                self._destroy(pooled)
+                break
+
+    def resize(self, size: int):
+        with self._lock:
+            self.size = size
+
+    @contextmanager
+    def lease(self, deadline: Optional[float] = None):
+        pooled = self._acquire()
+        try:
+            with self.watchdog.watch(lambda: self._kill(pooled), deadline or self.lease_deadline):
+                yield pooled.driver
+        except Exception as e:
+            if DriverFailure.is_fatal(e):
+                pooled.crashed = True
+            raise
+        finally:
+            self._release(pooled)
+
+    def page_loaded(self, driver):
+        with self._lock:
+            pooled = self._leased.get(id(driver))
+            if pooled is not None:
+                pooled.pages += 1
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except Empty:
+                break
+            self._destroy(pooled)
+
+    def _acquire(self) -> PooledDriver:
+        if self._closed:
+            raise RuntimeError("Driver pool is closed")
+
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except Empty:
+                if self._reserve_slot():
+                    pooled = self._spawn_reserved()
+                    if pooled is None:
+                        raise RuntimeError("Failed to start a browser for the driver pool")
+                elif self._closed:
+                    raise RuntimeError("Driver pool is closed")
+                else:
+                    pooled = self._idle.get(timeout=self.lease_timeout)
+
+            if self._is_healthy(pooled):
+                with self._lock:
+                    self.stats["leases"] += 1
+                    self._leased[id(pooled.driver)] = pooled
+                return pooled
+
+            self._count("unhealthy")
+            self._destroy(pooled)
+
+    def _release(self, pooled: PooledDriver):
+        with self._lock:
+            self._leased.pop(id(pooled.driver), None)
+
+        if pooled.crashed:
+            self._count("crashed")
+            self.metrics.inc("errors", component="driver_pool")
+            self._destroy(pooled)
+            if not self._closed:
+                threading.Thread(target=self.warm_up, args=(1,), daemon=True).start()
+            return
+
+        if self._closed or self._should_recycle(pooled) or not self._reset(pooled):
+            self._count("recycled")
+            self._destroy(pooled)
+            if not self._closed:
+                threading.Thread(target=self.warm_up, args=(1,), daemon=True).start()
+            return
+
+        if not self._put_idle(pooled):
+            self._destroy(pooled)
+
+    def _put_idle(self, pooled: PooledDriver) -> bool:
+        with self._lock:
+            if self._closed:
+                return False
+            self._idle.put(pooled)
+            return True
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _reserve_slot(self) -> bool:
+        with self._lock:
+            if self._closed or self._created >= self.size:
+                return False
+            self._created += 1
+            return True
+
+    def _spawn_reserved(self) -> Optional[PooledDriver]:
+        try:
+            with self.metrics.timer("phase_seconds", phase="driver_startup"):
+                pooled = PooledDriver(self._create_driver())
+        except Exception as e:
+            with self._lock:
+                self._created -= 1
+            self.metrics.inc("errors", component="driver_pool")
+            print(f"Error starting pooled driver: {e}")
+            return None
+
+        pooled.baseline_rss_mb = self._driver_rss_mb(pooled.driver)
+        self._count("spawned")
+        return pooled
+
+    def _create_driver(self):
+        if self.chromedriver_path:
+            service = Service(self.chromedriver_path)
+            driver = webdriver.Chrome(service=service, options=self.chrome_options)
+        else:
+            driver = webdriver.Chrome(options=self.chrome_options)
+
+        driver.set_page_load_timeout(self.page_load_timeout)
+        ChromeConfig.apply_render_profile(driver, self.render_profile)
+        return driver
+
+    def _destroy(self, pooled: PooledDriver):
+        with self._lock:
+            self._created -= 1
+        try:
+            pooled.driver.quit()
+        except Exception:
+            pass
+
+    def _kill(self, pooled: PooledDriver):
+        pooled.crashed = True
+        try:
+            root_pid = pooled.driver.service.process.pid
+        except Exception:
+            return
+
+        for pid in reversed(list(self._process_tree(root_pid) or [root_pid])):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+    def _should_recycle(self, pooled: PooledDriver) -> bool:
+        if pooled.pages >= self.max_pages:
+            return True
+
+        rss = self._driver_rss_mb(pooled.driver)
+        if rss is not None and pooled.baseline_rss_mb is not None:
+            return rss - pooled.baseline_rss_mb > self.max_rss_growth_mb
+
+        return False
+
+    @staticmethod
+    def _is_healthy(pooled: PooledDriver) -> bool:
+        try:
+            return bool(pooled.driver.window_handles) and pooled.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(pooled: PooledDriver) -> bool:
+        driver = pooled.driver
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            origin = driver.execute_script(
+                "try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} return location.origin;")
+            if origin and origin != "null":
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                    "origin": origin,
+                    "storageTypes": "cookies,local_storage,session_storage,indexeddb,websql,service_workers,cache_storage",
+                })
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.get("about:blank")
+            return True
+        except Exception:
+            return False
+
+    @classmethod
+    def _driver_rss_mb(cls, driver) -> Optional[float]:
+        try:
+            root_pid = driver.service.process.pid
+        except Exception:
+            return None
+
+        tree = cls._process_tree(root_pid)
+        if tree is None:
+            return None
+        return sum(tree.values()) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+    @staticmethod
+    def _process_tree(root_pid: int) -> Optional[Dict[int, int]]:
+        try:
+            children: Dict[int, list] = {}
+            rss_pages: Dict[int, int] = {}
+            for entry in os.listdir("/proc"):
+                if not entry.isdigit():
+                    continue
+                try:
+                    with open(f"/proc/{entry}/stat", "r") as f:
+                        fields = f.read().rsplit(")", 1)[1].split()
+                except OSError:
+                    continue
+                pid = int(entry)
+                children.setdefault(int(fields[1]), []).append(pid)
+                rss_pages[pid] = int(fields[21])
+        except OSError:
+            return None
+
+        tree: Dict[int, int] = {}
+        stack = [root_pid]
+        while stack:
+            pid = stack.pop()
+            tree[pid] = rss_pages.get(pid, 0)
+            stack.extend(children.get(pid, []))
+
+        return tree
@@ -0,0 +1,93 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from performance import Performance
+
+
+class EmbeddedStateParser:
+    NEXT_DATA_PATTERN = re.compile(
+        r'<script[^>]*id=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>', re.IGNORECASE | re.DOTALL)
+    WINDOW_STATE_PATTERN = re.compile(
+        r'window\.(__INITIAL_STATE__|__PRELOADED_STATE__|__APOLLO_STATE__|__NUXT__)\s*=\s*')
+
+    TITLE_KEYS = ("title", "name", "caption")
+    URL_KEYS = ("url", "link", "href", "path", "detailUrl", "detail_url", "canonicalUrl")
+    DETAIL_ROUTE_PATTERN = re.compile(r'/w/(?:performance|event|creations)/[^/?#\s]+', re.IGNORECASE)
+    MIN_SIBLINGS = 2
+
+    def __init__(self):
+        self.decoder = json.JSONDecoder()
+
+    def parse_performances(self, content: str, base_url: str = None) -> List[Performance]:
+        if not content:
+            return []
+
+        performances = []
+        seen = set()
+
+        for state in self._extract_states(content):
+            for title, url in self._walk(state):
+                performance = Performance.create(title, url, base_url, base_url)
+                if performance.key in seen:
+                    continue
+                seen.add(performance.key)
+                performances.append(performance)
+
+        return performances
+
+    def _extract_states(self, content: str) -> List[Any]:
+        states = []
+
+        for match in self.NEXT_DATA_PATTERN.finditer(content):
+            try:
+                states.append(json.loads(match.group(1)))
+            except ValueError:
+                continue
+
+        for match in self.WINDOW_STATE_PATTERN.finditer(content):
+            try:
+                state, _ = self.decoder.raw_decode(content, match.end())
+                states.append(state)
+            except ValueError:
+                continue
+
+        return states
+
+    def _walk(self, state: Any):
+        stack = [state]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                children = list(node.values())
+            elif isinstance(node, list):
+                children = node
+            else:
+                continue
+            yield from self._sibling_records(children)
+            stack.extend(reversed(children))
+
+    def _sibling_records(self, siblings: List[Any]):
+        records_by_shape: Dict[frozenset, List[tuple]] = {}
+        for sibling in siblings:
+            if isinstance(sibling, dict):
+                item = self._as_performance(sibling)
+                if item:
+                    records_by_shape.setdefault(frozenset(sibling), []).append(item)
+
+        for records in records_by_shape.values():
+            if len(records) >= self.MIN_SIBLINGS:
+                yield from records
+
+    def _as_performance(self, node: Dict) -> Optional[tuple]:
+        title = next((node[key] for key in self.TITLE_KEYS if isinstance(node.get(key), str) and node[key].strip()),
+                     None)
+        if not title:
+            return None
+
+        for key in self.URL_KEYS:
+            url = node.get(key)
+            if isinstance(url, str) and self.DETAIL_ROUTE_PATTERN.search(url):
+                return title.strip(), url
+
+        return None
@@ -2,19 +2,21 @@ from typing import Dict
 
 from selenium.webdriver.common.by import By
 
+from performance import Performance
+
 
 class EventParser:
 
-    def extract_event_data_from_block(self, block) -> Dict[str, str]:
-        event_data = {
-            "title": "",
-            "detail_url": ""
-        }
+    def extract_event_data_from_block(self, block) -> Performance:
+        title = ""
 
         try:
             title_elem = block.find_element(By.CSS_SELECTOR, "div.IlTNG")
-            event_data["title"] = title_elem.text.strip()
+            title = title_elem.text.strip()
         except:
             pass
 
-        return event_data
+        return Performance(title)
+
+    def extract_event_data_from_snapshot(self, snapshot: Dict) -> Performance:
+        return Performance((snapshot.get("title") or "").strip())
@@ -1,7 +1,7 @@
-import json
-from typing import List, Dict, Optional
+from typing import Iterable, List, Optional, Tuple
 
-from url_utils import UrlUtils
+from output_sink import OutputSink
+from performance import Performance
 
 
 class FileManager:
@@ -14,24 +14,28 @@ class FileManager:
             return None
 
     @staticmethod
-    def save_to_json(data: List[Dict[str, str]], filename: str = "performances.json"):
+    def save_to_json(data: List[Performance], filename: str = "performances.json"):
         try:
-            for performance in data:
-                url = performance.get('detail_url')
-                if url:
-                    cleaned = UrlUtils.clean_url(url)
-                    performance['detail_url'] = UrlUtils.add_https_suffix(cleaned)
-
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            with OutputSink.open(filename) as sink:
+                sink.write_many(data)
         except Exception:
             pass
 
     @staticmethod
-    def print_performances(performances: List[Dict[str, str]]):
-        detail_url_count = sum(1 for perf in performances if perf.get('detail_url'))
+    def save_stream_to_json(data: Iterable[Performance], filename: str = "performances.json") -> Tuple[int, int]:
+        with OutputSink.open(filename) as sink:
+            sink.write_many(data)
 
+        return sink.count, sink.detail_url_count
+
+    @staticmethod
+    def print_performances(performances: List[Performance]):
+        detail_url_count = sum(1 for perf in performances if perf.detail_url)
+        FileManager.print_counts(len(performances), detail_url_count)
+
+    @staticmethod
+    def print_counts(total: int, detail_url_count: int):
         if detail_url_count > 0:
-            print(f"Found {len(performances)} performances, {detail_url_count} with detail URLs")
+            print(f"Found {total} performances, {detail_url_count} with detail URLs")
         else:
-            print(f"Found {len(performances)} performances, no detail URLs found")
+            print(f"Found {total} performances, no detail URLs found")
@@ -0,0 +1,199 @@
+import array
+import atexit
+import importlib
+import json
+import os
+import select
+import signal
+import socket
+import sys
+import threading
+import traceback
+from typing import Callable, Dict, List, Optional
+
+PRELOAD_MODULES = (
+    "afisha_parser",
+    "html_parser",
+    "bs4",
+    "static_fetcher",
+    "web_driver_manager",
+    "batch_crawler",
+    "batch_file_parser",
+    "detail_enricher",
+    "change_tracker",
+    "crawl_queue",
+)
+
+
+class ForkServer:
+
+    def __init__(self, socket_path: str, entry_point: Callable[[List[str]], None],
+                 preload_modules: Optional[List[str]] = None):
+        self.socket_path = socket_path
+        self.entry_point = entry_point
+        self.preload_modules = preload_modules or list(PRELOAD_MODULES)
+        self.request_timeout = float(os.environ.get('PARSER_FORK_REQUEST_TIMEOUT', '5'))
+        self.listener: Optional[socket.socket] = None
+
+    def preload(self) -> List[str]:
+        loaded = []
+        for name in self.preload_modules:
+            try:
+                importlib.import_module(name)
+                loaded.append(name)
+            except Exception as e:
+                print(f"Error preloading {name}: {e}")
+        return loaded
+
+    def serve_forever(self):
+        loaded = self.preload()
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.socket_path)
+        self.listener.listen(64)
+        print(f"Fork server listening on {self.socket_path} with {len(loaded)} modules preloaded", flush=True)
+
+        try:
+            while True:
+                connection, _ = self.listener.accept()
+                try:
+                    self._spawn(connection)
+                except Exception as e:
+                    print(f"Error in ForkServer: {e}", flush=True)
+                    connection.close()
+        finally:
+            self.close()
+
+    def close(self):
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    @staticmethod
+    def forward(socket_path: str, argv: List[str]) -> Optional[int]:
+        payload = json.dumps({"argv": argv, "cwd": os.getcwd()}, ensure_ascii=False).encode("utf-8") + b"\n"
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            client.connect(socket_path)
+        except OSError:
+            client.close()
+            return None
+
+        with client:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            sent = client.sendmsg([payload], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", (0, 1, 2)))])
+            client.sendall(payload[sent:])
+
+            response = b""
+            while True:
+                chunk = client.recv(4096)
+                if not chunk:
+                    break
+                response += chunk
+
+        try:
+            return int(json.loads(response)["code"])
+        except (ValueError, KeyError, TypeError):
+            return 1
+
+    def _spawn(self, connection: socket.socket):
+        connection.settimeout(self.request_timeout)
+        request, fds = self._read_request(connection)
+        connection.settimeout(None)
+
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            self._run_child(connection, request, fds)
+
+        for fd in fds:
+            os.close(fd)
+        threading.Thread(target=self._reap, args=(pid, connection), name=f"fork-reaper-{pid}", daemon=True).start()
+
+    @staticmethod
+    def _read_request(connection: socket.socket):
+        message, ancillary, _, _ = connection.recvmsg(1 << 16, socket.CMSG_SPACE(3 * array.array("i").itemsize))
+        fds = array.array("i")
+        for level, kind, data in ancillary:
+            if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                fds.frombytes(data[:len(data) - len(data) % fds.itemsize])
+
+        while not message.endswith(b"\n"):
+            chunk = connection.recv(1 << 16)
+            if not chunk:
+                break
+            message += chunk
+
+        if len(fds) != 3:
+            for fd in fds:
+                os.close(fd)
+            raise ValueError(f"expected stdin, stdout and stderr descriptors, got {len(fds)}")
+        return json.loads(message), list(fds)
+
+    def _run_child(self, connection: socket.socket, request: Dict, fds: List[int]):
+        code = 0
+        try:
+            self.listener.close()
+            connection.close()
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(128 + signum))
+            for target, fd in enumerate(fds):
+                os.dup2(fd, target)
+                os.close(fd)
+            os.chdir(request.get("cwd") or ".")
+            self.entry_point(request["argv"])
+        except SystemExit as e:
+            if isinstance(e.code, int) or e.code is None:
+                code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            try:
+                atexit._run_exitfuncs()
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(code)
+
+    @staticmethod
+    def _reap(pid: int, connection: socket.socket):
+        code = 1
+        watched = [connection]
+        timeout = 0.05
+        try:
+            watched.append(os.pidfd_open(pid))
+            timeout = None
+        except (AttributeError, OSError):
+            pass
+
+        try:
+            while True:
+                finished, status = os.waitpid(pid, os.WNOHANG)
+                if finished:
+                    code = os.waitstatus_to_exitcode(status)
+                    break
+
+                readable, _, _ = select.select(watched, [], [], timeout)
+                if connection in readable and not connection.recv(1):
+                    os.kill(pid, signal.SIGTERM)
+                    _, status = os.waitpid(pid, 0)
+                    code = os.waitstatus_to_exitcode(status)
+                    break
+
+            connection.sendall(json.dumps({"code": code}).encode("utf-8"))
+        except OSError:
+            pass
+        finally:
+            for fd in watched[1:]:
+                os.close(fd)
+            connection.close()
@@ -1,29 +1,176 @@
-from typing import List, Dict
+import os
+import time
+from typing import Iterator, List, Optional
 
-from bs4 import BeautifulSoup
+from lxml import etree, html
 
+from metrics import Metrics
+from performance import Performance
+
+
+class LxmlHtmlParser:
+    BLOCK_XPATH = etree.XPath(
+        "//div[contains(concat(' ', normalize-space(@class), ' '), ' _3XrzE ')"
+        " and contains(concat(' ', normalize-space(@class), ' '), ' _5fgzK ')]")
+
+    HEADING_RANKS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4}
+    CLASS_SUBSTRING_RANKS = (("title", 5), ("name", 6), ("heading", 7))
+    DATA_URL_ATTRIBUTES = ('data-href', 'data-url', 'data-link', 'data-event-url')
+    SKIPPED_TEXT_TAGS = frozenset(("script", "style", "template"))
+
+    STREAM_CHUNK_SIZE = 1 << 16
 
-class HtmlParser:
     def __init__(self):
-        pass
+        self.html_parser = html.HTMLParser(encoding="utf-8", remove_comments=True, remove_pis=True)
+
+    def parse_performances(self, content: str, base_url: str = None) -> List[Performance]:
+        if not content:
+            return []
+
+        try:
+            root = html.document_fromstring(content.encode("utf-8"), parser=self.html_parser)
+        except (etree.ParserError, ValueError):
+            return []
+
+        performances = []
+        for block in self.BLOCK_XPATH(root):
+            try:
+                performance = self.parse_block(block, base_url)
+            except ValueError:
+                continue
+            if performance.title:
+                performances.append(performance)
+
+        return performances
+
+    def iter_performances_from_file(self, filepath: str, base_url: str = None) -> Iterator[Performance]:
+        parser = etree.HTMLPullParser(events=("end",), tag="div", encoding="utf-8", remove_comments=True,
+                                      remove_pis=True)
+        with open(filepath, "rb") as f:
+            while True:
+                chunk = f.read(self.STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+                yield from self._finished_blocks(parser, base_url)
+
+        try:
+            parser.close()
+        except etree.XMLSyntaxError:
+            pass
+        yield from self._finished_blocks(parser, base_url)
+
+    def _finished_blocks(self, parser, base_url: str = None) -> Iterator[Performance]:
+        for _, element in parser.read_events():
+            if not self._is_block(element) or any(self._is_block(parent) for parent in element.iterancestors("div")):
+                continue
+
+            for block in element.iter("div"):
+                if self._is_block(block):
+                    try:
+                        performance = self.parse_block(block, base_url)
+                    except ValueError:
+                        continue
+                    if performance.title:
+                        yield performance
+
+            element.clear(keep_tail=False)
+            parent = element.getparent()
+            while parent is not None and element.getprevious() is not None:
+                del parent[0]
+
+    @staticmethod
+    def _is_block(element) -> bool:
+        classes = element.get("class")
+        if not classes:
+            return False
+        tokens = classes.split()
+        return "_3XrzE" in tokens and "_5fgzK" in tokens
+
+    def parse_block(self, block, base_url: str = None) -> Performance:
+        best_rank = None
+        title_element = None
+        detail_url = None
+
+        for element in block.iterdescendants():
+            tag = element.tag
+            if not isinstance(tag, str):
+                continue
+
+            if detail_url is None and tag == "a":
+                href = element.get("href")
+                if href and ('performance' in href or 'event' in href):
+                    detail_url = href
 
-    def parse_performances(self, content: str, base_url: str = None) -> List[Dict[str, str]]:
+            if best_rank != 0:
+                rank = self._title_rank(element, tag)
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best_rank = rank
+                    title_element = element
+
+            if best_rank == 0 and detail_url is not None:
+                break
+
+        title = self._text(title_element if title_element is not None else block)
+
+        if detail_url is None:
+            detail_url = next((block.get(attr) for attr in self.DATA_URL_ATTRIBUTES if block.get(attr)), None)
+
+        return Performance.create(title, detail_url, base_url, base_url)
+
+    def _title_rank(self, element, tag: str) -> Optional[int]:
+        classes = element.get("class")
+
+        if tag == "div" and classes and "IlTNG" in classes.split():
+            return 0
+
+        rank = self.HEADING_RANKS.get(tag)
+        if rank is not None:
+            return rank
+
+        if classes:
+            for substring, substring_rank in self.CLASS_SUBSTRING_RANKS:
+                if substring in classes:
+                    return substring_rank
+
+        return None
+
+    def _text(self, element) -> str:
+        parts = []
+        for node in element.iter():
+            if not isinstance(node.tag, str):
+                continue
+            if node.tag not in self.SKIPPED_TEXT_TAGS and node.text:
+                parts.append(node.text.strip())
+            if node is not element and node.tail:
+                parts.append(node.tail.strip())
+        return "".join(parts)
+
+
+class Bs4HtmlParser:
+
+    def parse_performances(self, content: str, base_url: str = None) -> List[Performance]:
         if not content:
             return []
 
+        from bs4 import BeautifulSoup
+
         soup = BeautifulSoup(content, "html.parser")
         performances = []
 
         performance_blocks = self._find_performance_blocks(soup)
 
         for block in performance_blocks:
-            performance_data = self._parse_performance_info(block, base_url)
-            if performance_data and performance_data.get("title"):
-                performances.append(performance_data)
+            try:
+                performance = self._parse_performance_info(block, base_url)
+            except ValueError:
+                continue
+            if performance.title:
+                performances.append(performance)
 
         return performances
 
-    def _find_performance_blocks(self, soup: BeautifulSoup) -> List:
+    def _find_performance_blocks(self, soup) -> List:
         selectors_to_try = [
             "div._3XrzE._5fgzK",
         ]
@@ -41,24 +188,19 @@ class HtmlParser:
 
         return performance_blocks
 
-    def _parse_performance_info(self, performance_div, base_url: str = None) -> Dict[str, str]:
-        performance_data = {
-            "title": "",
-            "detail_url": "",
-        }
+    def _parse_performance_info(self, performance_div, base_url: str = None) -> Performance:
+        title = ""
+        detail_url = None
 
         try:
-            block_text = performance_div.get_text(strip=True)
-
-            self._extract_title(performance_div, performance_data, block_text)
-            self._extract_detail_url(performance_div, performance_data)
-
+            title = self._extract_title(performance_div, performance_div.get_text(strip=True))
+            detail_url = self._extract_detail_url(performance_div)
         except Exception:
             pass
 
-        return performance_data
+        return Performance.create(title, detail_url, base_url, base_url)
 
-    def _extract_title(self, performance_div, performance_data: Dict, block_text: str):
+    def _extract_title(self, performance_div, block_text: str) -> str:
         title_selectors = [
             "div.IlTNG",
             "h1", "h2", "h3", "h4",
@@ -70,24 +212,57 @@ class HtmlParser:
         for selector in title_selectors:
             title_elem = performance_div.select_one(selector)
             if title_elem:
-                performance_data["title"] = title_elem.get_text(strip=True)
-                return
+                return title_elem.get_text(strip=True)
 
-        if not performance_data["title"] and block_text:
-            lines = block_text.split('\n')
-            if lines:
-                performance_data["title"] = lines[0].strip()
+        return block_text.split('\n')[0].strip() if block_text else ""
 
-    def _extract_detail_url(self, performance_div, performance_data: Dict):
+    def _extract_detail_url(self, performance_div) -> Optional[str]:
         links = performance_div.find_all("a")
         for link in links:
             href = link.get('href')
             if href and ('performance' in href or 'event' in href):
-                performance_data['detail_url'] = href
-                return
+                return href
 
         for attr in ['data-href', 'data-url', 'data-link', 'data-event-url']:
             attr_value = performance_div.get(attr)
             if attr_value:
-                performance_data['detail_url'] = attr_value
-                return
+                return attr_value
+
+        return None
+
+
+class HtmlParser:
+    ENGINES = {
+        "lxml": LxmlHtmlParser,
+        "bs4": Bs4HtmlParser,
+    }
+
+    def __init__(self, engine: Optional[str] = None):
+        engine = engine or os.environ.get('PARSER_HTML_ENGINE', 'lxml')
+        self.engine_name = engine if engine in self.ENGINES else "lxml"
+        self.engine = self.ENGINES[self.engine_name]()
+        self.metrics = Metrics.shared()
+
+    def parse_performances(self, content: str, base_url: str = None) -> List[Performance]:
+        with self.metrics.timer("parse_seconds", engine=self.engine_name, mode="document"):
+            performances = self.engine.parse_performances(content, base_url)
+
+        self.metrics.inc("selector_lookups", selector="block", result="hit" if performances else "miss")
+        return performances
+
+    def iter_performances_from_file(self, filepath: str, base_url: str = None) -> Iterator[Performance]:
+        started = time.perf_counter()
+        found = False
+
+        if isinstance(self.engine, LxmlHtmlParser):
+            performances = self.engine.iter_performances_from_file(filepath, base_url)
+        else:
+            with open(filepath, 'r', encoding='utf-8') as file:
+                performances = self.engine.parse_performances(file.read(), base_url)
+
+        for performance in performances:
+            found = True
+            yield performance
+
+        self.metrics.observe("parse_seconds", time.perf_counter() - started, engine=self.engine_name, mode="stream")
+        self.metrics.inc("selector_lookups", selector="block", result="hit" if found else "miss")
@@ -1,50 +1,170 @@
 import re
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
 
 from selenium.webdriver.common.by import By
 
+from metrics import Metrics
+from resilience import DriverFailure, RetryPolicy
 from url_utils import UrlUtils
 
 
 class LinkFinder:
+    DATA_ATTRIBUTES = [
+        'data-href', 'data-url', 'data-link', 'data-event-url',
+        'data-performance-url', 'data-target', 'data-to'
+    ]
+
+    RAW_ATTRIBUTE_PATTERNS = [
+        (('href', 'data-href'), 'performance'),
+        (('href', 'data-href'), 'event'),
+        (('href', 'data-href'), 'creations'),
+        (('data-href',), 'performance'),
+        (('data-url',), 'performance'),
+    ]
+
+    SNAPSHOT_FUNCTIONS = """
+        var keywords = /performance|event|creations/i;
+
+        function hrefs(root) {
+            var result = [];
+            var anchors = root.querySelectorAll('a');
+            for (var i = 0; i < anchors.length; i++) {
+                if (anchors[i].href) {
+                    result.push(anchors[i].href);
+                }
+            }
+            return result;
+        }
+
+        function snapshotBlock(block, dataAttributes, parentLevels) {
+            var titleElement = block.querySelector('div.IlTNG');
+
+            var data = {};
+            dataAttributes.forEach(function (name) {
+                var value = block.getAttribute(name);
+                if (value) {
+                    data[name] = value;
+                }
+            });
+
+            var rawAttributes = [];
+            block.querySelectorAll('[href], [data-href], [data-url]').forEach(function (element) {
+                ['href', 'data-href', 'data-url'].forEach(function (name) {
+                    var value = element.getAttribute(name);
+                    if (value) {
+                        rawAttributes.push([name, value]);
+                    }
+                });
+            });
+
+            var parentLinks = [];
+            var current = block;
+            for (var level = 0; level < parentLevels && current.parentElement; level++) {
+                current = current.parentElement;
+                parentLinks.push(hrefs(current).filter(function (href) {
+                    return keywords.test(href);
+                }));
+            }
+
+            return {
+                title: titleElement ? titleElement.innerText.trim() : '',
+                links: hrefs(block),
+                data: data,
+                rawAttributes: rawAttributes,
+                parentLinks: parentLinks
+            };
+        }
+    """
+
+    SNAPSHOT_SCRIPT = SNAPSHOT_FUNCTIONS + """
+        var dataAttributes = arguments[1];
+        var parentLevels = arguments[2];
+
+        return Array.prototype.map.call(document.querySelectorAll(arguments[0]), function (block) {
+            return snapshotBlock(block, dataAttributes, parentLevels);
+        });
+    """
 
     def __init__(self):
         self.url_utils = UrlUtils()
+        self.metrics = Metrics.shared()
+        self.retry_policy = RetryPolicy()
+
+    def snapshot_blocks(self, driver, selector: str = "div._3XrzE._5fgzK") -> List[Dict]:
+        try:
+            return self.retry_policy.run(
+                lambda: driver.execute_script(self.SNAPSHOT_SCRIPT, selector, self.DATA_ATTRIBUTES, 3),
+                "snapshot") or []
+        except Exception as e:
+            if DriverFailure.is_fatal(e):
+                raise
+            self.metrics.inc("errors", component="link_finder")
+            print(f"Error in snapshot_blocks: {e}")
+            return []
+
+    def find_detail_url_in_snapshot(self, snapshot: Dict, base_url: str) -> Optional[str]:
+        url = self._first_valid(snapshot.get('links', []), base_url)
+        if url:
+            return self._won("links", url)
+
+        data = snapshot.get('data', {})
+        url = self._first_valid((data.get(attr) for attr in self.DATA_ATTRIBUTES), base_url)
+        if url:
+            return self._won("data_attributes", url)
+
+        raw_attributes = snapshot.get('rawAttributes', [])
+        for names, keyword in self.RAW_ATTRIBUTE_PATTERNS:
+            url = self._first_valid(
+                (value for name, value in raw_attributes if name in names and keyword in value.lower()), base_url)
+            if url:
+                return self._won("raw_attributes", url)
+
+        for links in snapshot.get('parentLinks', []):
+            url = self._first_valid(links, base_url)
+            if url:
+                return self._won("parent_links", url)
+
+        return self._won("none", None)
+
+    def _won(self, strategy: str, url: Optional[str]) -> Optional[str]:
+        self.metrics.inc("link_strategy", strategy=strategy)
+        return url
+
+    def _first_valid(self, candidates: Iterable[Optional[str]], base_url: str) -> Optional[str]:
+        return self.url_utils.first_performance_url(candidates, base_url)
 
     def find_detail_url_comprehensive(self, driver, block, base_url: str) -> Optional[str]:
 
         url = self._find_direct_links(block, base_url)
         if url:
-            return url
+            return self._won("direct_links", url)
 
         url = self._find_js_links(driver, block, base_url)
         if url:
-            return url
+            return self._won("js_links", url)
 
         url = self._find_data_attributes(block, base_url)
         if url:
-            return url
+            return self._won("data_attributes", url)
 
         url = self._find_in_html_source(driver, block, base_url)
         if url:
-            return url
+            return self._won("html_source", url)
 
         url = self._find_in_parent_elements(block, base_url)
         if url:
-            return url
+            return self._won("parent_links", url)
 
-        return None
+        return self._won("none", None)
 
     def _find_direct_links(self, block, base_url: str) -> Optional[str]:
         try:
             links = block.find_elements(By.CSS_SELECTOR, "a")
-            for link in links:
-                href = link.get_attribute('href')
-                if href:
-                    clean_href = self.url_utils.clean_url(href)
-                    if self.url_utils.is_valid_performance_url(clean_href):
-                        return self.url_utils.normalize_url(clean_href, base_url)
+            return self._first_valid((link.get_attribute('href') for link in links), base_url)
         except Exception as e:
+            if DriverFailure.is_fatal(e):
+                raise
+            self.metrics.inc("errors", component="link_finder")
             print(f"Error in _find_direct_links: {e}")
         return None
 
@@ -62,30 +182,22 @@ class LinkFinder:
                 return links;
             """, block)
 
-            for href in links:
-                if href:
-                    clean_href = self.url_utils.clean_url(href)
-                    if self.url_utils.is_valid_performance_url(clean_href):
-                        return self.url_utils.normalize_url(clean_href, base_url)
+            return self._first_valid(links, base_url)
 
         except Exception as e:
+            if DriverFailure.is_fatal(e):
+                raise
+            self.metrics.inc("errors", component="link_finder")
             print(f"Error in _find_js_links: {e}")
         return None
 
     def _find_data_attributes(self, block, base_url: str) -> Optional[str]:
         try:
-            data_attrs = [
-                'data-href', 'data-url', 'data-link', 'data-event-url',
-                'data-performance-url', 'data-target', 'data-to'
-            ]
-
-            for attr in data_attrs:
-                attr_value = block.get_attribute(attr)
-                if attr_value:
-                    clean_value = self.url_utils.clean_url(attr_value)
-                    if self.url_utils.is_valid_performance_url(clean_value):
-                        return self.url_utils.normalize_url(clean_value, base_url)
+            return self._first_valid((block.get_attribute(attr) for attr in self.DATA_ATTRIBUTES), base_url)
         except Exception as e:
+            if DriverFailure.is_fatal(e):
+                raise
+            self.metrics.inc("errors", component="link_finder")
             print(f"Error in _find_data_attributes: {e}")
         return None
 
@@ -102,12 +214,13 @@ class LinkFinder:
                 ]
 
                 for pattern in url_patterns:
-                    matches = re.findall(pattern, html_content, re.IGNORECASE)
-                    for match in matches:
-                        clean_match = self.url_utils.clean_url(match)
-                        if self.url_utils.is_valid_performance_url(clean_match):
-                            return self.url_utils.normalize_url(clean_match, base_url)
+                    url = self._first_valid(re.findall(pattern, html_content, re.IGNORECASE), base_url)
+                    if url:
+                        return url
         except Exception as e:
+            if DriverFailure.is_fatal(e):
+                raise
+            self.metrics.inc("errors", component="link_finder")
             print(f"Error in _find_in_html_source: {e}")
         return None
 
@@ -118,15 +231,17 @@ class LinkFinder:
                 try:
                     parent = current_element.find_element(By.XPATH, "..")
                     links = parent.find_elements(By.CSS_SELECTOR, "a")
-                    for link in links:
-                        href = link.get_attribute('href')
-                        if href:
-                            clean_href = self.url_utils.clean_url(href)
-                            if self.url_utils.is_valid_performance_url(clean_href):
-                                return self.url_utils.normalize_url(clean_href, base_url)
+                    url = self._first_valid((link.get_attribute('href') for link in links), base_url)
+                    if url:
+                        return url
                     current_element = parent
-                except:
+                except Exception as e:
+                    if DriverFailure.is_fatal(e):
+                        raise
                     break
         except Exception as e:
+            if DriverFailure.is_fatal(e):
+                raise
+            self.metrics.inc("errors", component="link_finder")
             print(f"Error in _find_in_parent_elements: {e}")
         return None
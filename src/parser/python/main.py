@@ -1,30 +1,430 @@
+import argparse
+import json
+import os
 import sys
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
 
-from afisha_parser import AfishaParser
-from url_utils import UrlUtils
+if TYPE_CHECKING:
+    from output_sink import OutputSink
+    from performance import Performance
 
 
-def main():
-    parser = AfishaParser()
+def build_arg_parser() -> argparse.ArgumentParser:
+    from output_sink import OutputSink
 
-    if len(sys.argv) > 1:
-        source = sys.argv[1].strip()
+    arg_parser = argparse.ArgumentParser(description="Afisha performances parser")
+    arg_parser.add_argument("sources", nargs="*", help="listing URLs or a path to a saved HTML page")
+    arg_parser.add_argument("--urls-file", help="file with one listing URL per line, crawled as a batch")
+    arg_parser.add_argument("--files", nargs="+",
+                            help="saved listing pages, directories or glob patterns parsed in parallel processes")
+    arg_parser.add_argument("--workers", type=int,
+                            help="number of browser workers for batch crawls, or processes for --files")
+    arg_parser.add_argument("--chunk-size", type=int, help="files sent to a worker process at a time with --files")
+    arg_parser.add_argument("--per-host", type=int, default=2, help="concurrent pages per host in batch crawls")
+    arg_parser.add_argument("--delay", type=float, default=1.0, help="seconds between page starts on one host")
+    arg_parser.add_argument("--report", help="write the per-URL batch report to this JSON file")
+    arg_parser.add_argument("--async", dest="use_async", action="store_true",
+                            help="crawl the batch on the asyncio engine")
+    arg_parser.add_argument("--task-timeout", type=float, help="seconds allowed per URL with --async")
+    arg_parser.add_argument("--queue",
+                            help="SQLite crawl queue shared by parser processes; rerun with the same path to resume")
+    arg_parser.add_argument("--queue-status", action="store_true", help="print the --queue job counts and exit")
+    arg_parser.add_argument("--output", default="performances.json",
+                            help="path of the result file, or - to stream NDJSON messages to stdout")
+    arg_parser.add_argument("--format", choices=OutputSink.FORMATS,
+                            help="result format; inferred from --output (.ndjson/.jsonl or -) by default")
+    arg_parser.add_argument("--stream", action="store_true",
+                            help="parse a saved page block by block without loading it into memory")
+    arg_parser.add_argument("--diff", action="store_true",
+                            help="also write added/changed/removed performances since the last crawl")
+    arg_parser.add_argument("--diff-only", action="store_true", help="write only the changes to --output")
+    arg_parser.add_argument("--diff-output", default="performances.diff.json", help="path of the --diff result")
+    arg_parser.add_argument("--enrich", action="store_true",
+                            help="fetch every detail page and add dates, venue, prices and images")
+    arg_parser.add_argument("--enrich-workers", type=int, help="concurrent detail page fetches with --enrich")
+    arg_parser.add_argument("--no-cache", action="store_true", help="bypass the on-disk page cache")
+    arg_parser.add_argument("--metrics-out",
+                            help="write run metrics to this file (JSON for .json, OpenMetrics text otherwise)")
+    arg_parser.add_argument("--profile",
+                            help="profile the run into this file (pyinstrument HTML for .html, cProfile stats otherwise)")
+    arg_parser.add_argument("--serve", action="store_true", help="run as a long-lived parser server")
+    arg_parser.add_argument("--host", default="127.0.0.1", help="server host")
+    arg_parser.add_argument("--port", type=int, default=8765, help="server port")
+    arg_parser.add_argument("--socket", help="serve on a unix socket instead of TCP")
+    arg_parser.add_argument("--fork-server", action="store_true",
+                            help="preload the parser on --socket and fork a fresh process for every forwarded run")
+    return arg_parser
 
-        if UrlUtils.is_valid_url(source):
-            performances = parser.parse_performances_from_url(source)
-        else:
-            performances = parser.parse_performances_from_file(source)
+
+def serve(args: argparse.Namespace):
+    from parser_server import ParserServer
+
+    server = ParserServer(host=args.host, port=args.port, socket_path=args.socket)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def fork_server(args: argparse.Namespace):
+    from fork_server import ForkServer
+
+    if not args.socket:
+        print("Error: --fork-server requires --socket.")
+        sys.exit(1)
+
+    server = ForkServer(args.socket, main)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def forward_to_fork_server(argv: List[str]) -> Optional[int]:
+    socket_path = os.environ.get('PARSER_FORK_SERVER')
+    if not socket_path or not os.path.exists(socket_path) or {"--serve", "--fork-server"} & set(argv):
+        return None
+
+    from fork_server import ForkServer
+
+    return ForkServer.forward(socket_path, argv)
+
+
+def read_urls_file(path: str) -> List[str]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+
+def open_output(args: argparse.Namespace) -> Optional["OutputSink"]:
+    from output_sink import OutputSink
+
+    sink = None if args.diff_only else OutputSink.open(args.output, args.format)
+    if args.output == "-":
+        sys.stdout = sys.stderr
+    return sink
+
+
+def close_output(sink: Optional["OutputSink"], tier: Optional[str] = None):
+    if not sink:
+        return
+
+    sink.message({"type": "result", "count": sink.count, "tier": tier})
+    if sink.count:
+        sink.close()
     else:
+        sink.abort()
+
+
+def create_enricher(args: argparse.Namespace):
+    if not args.enrich:
+        return None
+
+    from detail_enricher import DetailEnricher
+
+    return DetailEnricher(workers=args.enrich_workers, use_cache=not args.no_cache)
+
+
+def write_changes(args: argparse.Namespace, results_by_source: Dict[str, List["Performance"]]):
+    from change_tracker import ChangeTracker
+
+    tracker = ChangeTracker()
+    changes = {"added": [], "changed": [], "removed": [], "sources": []}
+
+    for source, performances in results_by_source.items():
+        if not performances:
+            continue
+        diff = tracker.diff(source, performances)
+        for kind in ("added", "changed", "removed"):
+            changes[kind].extend(diff[kind])
+        changes["sources"].append({
+            "source": source,
+            "added": len(diff["added"]),
+            "changed": len(diff["changed"]),
+            "removed": len(diff["removed"]),
+            "unchanged": diff["unchanged"],
+        })
+        print(f"Changes for {source}: +{len(diff['added'])} ~{len(diff['changed'])} "
+              f"-{len(diff['removed'])} ={diff['unchanged']}")
+
+    if args.diff_only and args.output == "-":
+        json.dump(changes, sys.__stdout__, ensure_ascii=False, indent=2)
+        sys.__stdout__.write("\n")
+        sys.__stdout__.flush()
+        return
+
+    with open(args.output if args.diff_only else args.diff_output, "w", encoding="utf-8") as f:
+        json.dump(changes, f, ensure_ascii=False, indent=2)
+
+
+def crawl_async(args: argparse.Namespace, urls: List[str]) -> Dict:
+    import asyncio
+
+    from async_engine import AsyncAfishaParser
+
+    engine = AsyncAfishaParser(concurrency=args.workers, task_timeout=args.task_timeout, per_host=args.per_host,
+                               politeness_delay=args.delay, use_cache=not args.no_cache)
+    try:
+        return asyncio.run(engine.crawl(urls))
+    finally:
+        engine.close()
+
+
+def crawl_batch(args: argparse.Namespace, urls: List[str]):
+    from afisha_parser import AfishaParser
+    from batch_crawler import BatchCrawler
+
+    sink = open_output(args)
+
+    if args.use_async:
+        result = crawl_async(args, urls)
+    else:
+        crawler = BatchCrawler(workers=args.workers, per_host=args.per_host, politeness_delay=args.delay,
+                               use_cache=not args.no_cache)
+        result = crawler.crawl(urls)
+
+    enricher = create_enricher(args)
+    if enricher:
+        result["performances"] = enricher.enrich(result["performances"])
+
+    if args.diff or args.diff_only:
+        write_changes(args, result["by_source"])
+
+    if sink:
+        sink.write_many(result["performances"])
+        close_output(sink)
+
+    parser = AfishaParser(use_cache=False)
+    parser.print_performances(result["performances"])
+    print(f"Crawled {len(result['sources'])} URLs in {result['seconds']}s")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"sources": result["sources"], "seconds": result["seconds"]}, f, ensure_ascii=False, indent=2)
+
+
+def crawl_queued(args: argparse.Namespace, urls: List[str]):
+    from afisha_parser import AfishaParser
+    from batch_crawler import BatchCrawler
+    from crawl_queue import CrawlQueue, QueueWorker
+
+    queue = CrawlQueue(args.queue)
+    try:
+        if args.queue_status:
+            print(json.dumps(queue.counts(), ensure_ascii=False))
+            return
+
+        added = queue.enqueue_listings(urls)
+        reclaimed = queue.reclaim_orphans()
+        print(f"Queue {args.queue}: {added} URLs added, {reclaimed} orphaned jobs reclaimed")
+        sink = open_output(args)
+        counts = QueueWorker(queue, workers=args.workers, per_host=args.per_host, politeness_delay=args.delay,
+                             use_cache=not args.no_cache).run()
+
+        by_source = queue.results_by_source()
+        performances = BatchCrawler._merge(list(by_source.values()))
+        enricher = create_enricher(args)
+        if enricher:
+            performances = enricher.enrich(performances)
+
+        if args.diff or args.diff_only:
+            write_changes(args, by_source)
+
+        if sink:
+            sink.write_many(performances)
+            close_output(sink)
+
+        AfishaParser(use_cache=False).print_performances(performances)
+        print(f"Queue: {counts}")
+
+        if args.report:
+            with open(args.report, "w", encoding="utf-8") as f:
+                json.dump({"sources": queue.reports(), "counts": counts}, f, ensure_ascii=False, indent=2)
+    finally:
+        queue.close()
+
+
+def parse_files(args: argparse.Namespace):
+    from batch_file_parser import BatchFileParser
+
+    paths = BatchFileParser.expand(args.files)
+    if not paths:
+        print("Error: No files matched.")
+        sys.exit(1)
+
+    sink = open_output(args)
+    parser = BatchFileParser(workers=args.workers, chunk_size=args.chunk_size)
+    print(f"Parsing {len(paths)} files with {min(parser.workers, len(paths))} processes")
+
+    def report_file(report: Dict):
+        if report["error"]:
+            print(f"{report['file']}: error {report['error']}")
+        if sink:
+            sink.message({"type": "progress", "stage": "file_parsed", **report})
+
+    try:
+        result = parser.parse(paths, on_record=sink.write if sink else None, on_file=report_file,
+                              keep_by_source=args.diff or args.diff_only)
+    except Exception as e:
+        if sink:
+            sink.message({"type": "error", "message": str(e)})
+            sink.abort()
+        print(f"Error during parsing: {e}")
+        sys.exit(1)
+
+    if args.diff or args.diff_only:
+        write_changes(args, result["by_source"])
+    close_output(sink, "file")
+
+    print(f"Parsed {len(result['files'])} files in {result['seconds']}s ({result['files_per_second']} files/s), "
+          f"{len(result['performances'])} unique performances")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"files": result["files"], "seconds": result["seconds"],
+                       "files_per_second": result["files_per_second"]}, f, ensure_ascii=False, indent=2)
+
+
+def stream_file(args: argparse.Namespace, filepath: str):
+    from afisha_parser import AfishaParser
+    from output_sink import OutputSink
+
+    parser = AfishaParser(use_cache=False)
+    sink = OutputSink.open(args.output, args.format)
+    if args.output == "-":
+        sys.stdout = sys.stderr
+
+    try:
+        sink.write_many(parser.iter_performances_from_file(filepath))
+    except Exception as e:
+        sink.message({"type": "error", "message": str(e)})
+        sink.abort()
+        print(f"Error during parsing: {e}")
+        sys.exit(1)
+
+    close_output(sink)
+    parser.file_manager.print_counts(sink.count, sink.detail_url_count)
+
+
+def write_metrics(path: str):
+    from metrics import Metrics
+
+    metrics = Metrics.shared()
+    with open(path, "w", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            json.dump(metrics.snapshot(), f, ensure_ascii=False, indent=2)
+        else:
+            f.write(metrics.render_openmetrics())
+
+
+def profiled(path: str, function: Callable, *args):
+    if path.endswith(".html"):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("pyinstrument is not installed, falling back to cProfile")
+            path = path[:-len(".html")] + ".prof"
+        else:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                return function(*args)
+            finally:
+                profiler.stop()
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(profiler.output_html())
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, *args)
+    finally:
+        profiler.dump_stats(path)
+
+
+def main(argv: Optional[List[str]] = None):
+    if argv is None:
+        code = forward_to_fork_server(sys.argv[1:])
+        if code is not None:
+            sys.exit(code)
+
+    args = build_arg_parser().parse_args(argv)
+
+    try:
+        if args.profile:
+            profiled(args.profile, run, args)
+        else:
+            run(args)
+    finally:
+        if args.metrics_out:
+            write_metrics(args.metrics_out)
+
+
+def run(args: argparse.Namespace):
+    from afisha_parser import AfishaParser
+    from url_utils import UrlUtils
+
+    if args.fork_server:
+        fork_server(args)
+        return
+
+    if args.serve:
+        serve(args)
+        return
+
+    if args.files:
+        parse_files(args)
+        return
+
+    urls = read_urls_file(args.urls_file) if args.urls_file else []
+    if args.queue:
+        crawl_queued(args, urls + args.sources)
+        return
+
+    if args.urls_file or len(args.sources) > 1:
+        crawl_batch(args, urls + args.sources)
+        return
+
+    if args.stream and args.sources and not UrlUtils.is_valid_url(args.sources[0]):
+        stream_file(args, args.sources[0].strip())
+        return
+
+    if not args.sources:
         print("Error: No URL or file path provided.")
         sys.exit(1)
 
+    sink = open_output(args)
+    on_progress = (lambda progress: sink.message({"type": "progress", **progress})) if sink else None
+    parser = AfishaParser(on_progress=on_progress, use_cache=not args.no_cache)
+    source = args.sources[0].strip()
+    enricher = create_enricher(args)
+    on_record = sink.write if sink and not enricher else None
+
+    if UrlUtils.is_valid_url(source):
+        performances = parser.parse_performances_from_url(source, on_record=on_record)
+        if parser.page_cache:
+            print(f"Page cache: {parser.page_cache.stats()}")
+    else:
+        performances = parser.parse_performances_from_file(source)
+        if on_record:
+            sink.write_many(performances)
+
+    if enricher:
+        performances = enricher.enrich(performances, on_record=sink.write if sink else None)
+
     try:
         if performances:
-            parser.save_to_json(performances)
+            if args.diff or args.diff_only:
+                write_changes(args, {source: performances})
+            close_output(sink, parser.last_tier)
             parser.print_performances(performances)
         else:
+            close_output(sink, parser.last_tier)
             print("No performances with detail URLs found")
     except Exception as e:
+        if sink:
+            sink.message({"type": "error", "message": str(e)})
+            sink.abort()
         print(f"Error during parsing: {e}")
         sys.exit(1)
 
@@ -0,0 +1,160 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((repr(float(bound)), total))
+        result.append(("+Inf", self.count))
+        return result
+
+
+class Metrics:
+    DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    DESCRIPTIONS = {
+        "phase_seconds": ("histogram", "Duration of parser phases"),
+        "wait_seconds": ("histogram", "Duration of PageWaiter waits by phase"),
+        "wait_timeouts": ("counter", "PageWaiter waits that hit their deadline"),
+        "block_extraction_seconds": ("histogram", "Time to resolve one listing block"),
+        "parse_seconds": ("histogram", "HtmlParser parse time by engine"),
+        "link_strategy": ("counter", "LinkFinder strategy that resolved a detail URL"),
+        "selector_lookups": ("counter", "Selector lookups by result"),
+        "fallbacks": ("counter", "Fallbacks to a slower tier by reason"),
+        "tiers": ("counter", "Tier that produced the result of a listing"),
+        "errors": ("counter", "Errors caught and logged by component"),
+        "network_requests": ("counter", "Requests issued by rendered pages"),
+        "network_bytes": ("counter", "Encoded bytes loaded by rendered pages"),
+        "requests_blocked": ("counter", "Requests blocked by the render profile by resource type"),
+        "enrichment": ("counter", "Detail pages enriched by source"),
+        "enrichment_retries": ("counter", "Detail page fetches retried after a transient failure"),
+        "driver_failures": ("counter", "Browser operation failures by class and operation"),
+        "driver_retries": ("counter", "Browser operations retried after a transient failure"),
+        "session_restarts": ("counter", "Work restarted on a fresh browser after a session crash"),
+        "circuit_trips": ("counter", "Hosts whose circuit breaker opened"),
+        "queue_jobs": ("counter", "Crawl queue jobs finished by kind and status"),
+        "watchdog_kills": ("counter", "Browsers killed by the watchdog for exceeding their lease deadline"),
+        "scroll_harvests": ("counter", "Incremental scroll harvests by the reason they stopped"),
+        "scroll_steps": ("counter", "Viewport scroll steps taken while harvesting listing blocks"),
+    }
+
+    _shared: Optional["Metrics"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, namespace: str = "afisha_parser", buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = buckets
+        self._counters: Dict[str, Dict[LabelSet, float]] = {}
+        self._histograms: Dict[str, Dict[LabelSet, Histogram]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "Metrics":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        key = self._label_set(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels):
+        key = self._label_set(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [{
+                    "labels": dict(key),
+                    "count": histogram.count,
+                    "sum": round(histogram.sum, 6),
+                    "buckets": dict(histogram.cumulative()),
+                } for key, histogram in series.items()]
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    def render_openmetrics(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                family = f"{self.namespace}_{name}"
+                self._describe(lines, family, name, "counter")
+                for key, value in series.items():
+                    lines.append(f"{family}_total{self._format_labels(key)} {value}")
+
+            for name, series in sorted(self._histograms.items()):
+                family = f"{self.namespace}_{name}"
+                self._describe(lines, family, name, "histogram")
+                for key, histogram in series.items():
+                    for bound, count in histogram.cumulative():
+                        lines.append(f"{family}_bucket{self._format_labels(key + (('le', bound),))} {count}")
+                    lines.append(f"{family}_count{self._format_labels(key)} {histogram.count}")
+                    lines.append(f"{family}_sum{self._format_labels(key)} {histogram.sum}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def _describe(self, lines: List[str], family: str, name: str, default_type: str):
+        metric_type, help_text = self.DESCRIPTIONS.get(name, (default_type, name.replace("_", " ")))
+        lines.append(f"# TYPE {family} {metric_type}")
+        lines.append(f"# HELP {family} {help_text}")
+
+    @staticmethod
+    def _label_set(labels: Dict) -> LabelSet:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    @staticmethod
+    def _format_labels(key: LabelSet) -> str:
+        if not key:
+            return ""
+        escaped = (value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in key)
+        return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + "}"
@@ -0,0 +1,67 @@
+import json
+import time
+from collections import Counter
+from typing import Dict, Set
+
+
+class NetworkMonitor:
+
+    def __init__(self, max_inflight: int = 2):
+        self.max_inflight = max_inflight
+        self.inflight: Set[str] = set()
+        self.last_activity = time.monotonic()
+        self.available = True
+        self.requests = 0
+        self.bytes_loaded = 0
+        self.blocked = Counter()
+
+    def reset(self, driver):
+        self.poll(driver)
+        self.inflight.clear()
+        self.last_activity = time.monotonic()
+        self.requests = 0
+        self.bytes_loaded = 0
+        self.blocked.clear()
+
+    def page_stats(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "bytes_loaded": self.bytes_loaded,
+            "requests_blocked": sum(self.blocked.values()),
+            "blocked_by_type": dict(self.blocked),
+        }
+
+    def poll(self, driver) -> int:
+        try:
+            entries = driver.get_log("performance")
+        except Exception:
+            self.available = False
+            return 0
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            self._handle(message.get("method"), message.get("params", {}))
+
+        return len(entries)
+
+    def is_idle(self, idle_seconds: float) -> bool:
+        return (len(self.inflight) <= self.max_inflight
+                and time.monotonic() - self.last_activity >= idle_seconds)
+
+    def _handle(self, method: str, params: dict):
+        request_id = params.get("requestId")
+
+        if method == "Network.requestWillBeSent":
+            self.inflight.add(request_id)
+            self.requests += 1
+            self.last_activity = time.monotonic()
+        elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+            self.inflight.discard(request_id)
+            self.last_activity = time.monotonic()
+            if method == "Network.loadingFinished":
+                self.bytes_loaded += int(params.get("encodedDataLength") or 0)
+            elif params.get("blockedReason") or "BLOCKED_BY_CLIENT" in params.get("errorText", ""):
+                self.blocked[params.get("type") or "Other"] += 1
@@ -0,0 +1,152 @@
+import json
+import os
+import stat
+import sys
+import textwrap
+import threading
+from typing import Dict, Iterable, Optional, TextIO, Union
+
+from performance import Performance
+from title_normalizer import TitleNormalizer
+from url_utils import UrlUtils
+
+
+class OutputSink:
+    FORMATS = ("json", "ndjson")
+
+    def __init__(self, stream: TextIO, format: str = "ndjson", envelope: bool = False, owns_stream: bool = False):
+        if format not in self.FORMATS:
+            raise ValueError(f"Unknown output format: {format}")
+
+        self.stream = stream
+        self.format = format
+        self.envelope = envelope
+        self.owns_stream = owns_stream
+        self.count = 0
+        self.detail_url_count = 0
+        self._lock = threading.Lock()
+        self._finished = False
+
+    @classmethod
+    def open(cls, target: str, format: Optional[str] = None) -> "OutputSink":
+        if target == "-":
+            return cls(sys.stdout, format or "ndjson", envelope=True)
+
+        format = format or cls.infer_format(target)
+        if cls._is_pipe(target):
+            return cls(open(target, "w", encoding="utf-8"), format, owns_stream=True)
+        return AtomicFileSink(target, format)
+
+    @staticmethod
+    def infer_format(target: str) -> str:
+        return "ndjson" if target == "-" or target.endswith((".ndjson", ".jsonl")) else "json"
+
+    @staticmethod
+    def normalized_record(record: Union[Performance, Dict[str, str]]) -> Dict[str, str]:
+        if isinstance(record, Performance):
+            record = record.to_dict()
+            if record['title']:
+                record.update(TitleNormalizer.keys(record['title']))
+            return record
+
+        record = {**record, **TitleNormalizer.keys(record['title'])} if record.get('title') else record
+        url = record.get('detail_url')
+        if not url:
+            return record
+        return {**record, 'detail_url': UrlUtils.add_https_suffix(UrlUtils.clean_url(url))}
+
+    def write(self, record: Union[Performance, Dict[str, str]]):
+        record = self.normalized_record(record)
+
+        with self._lock:
+            if self.format == "json":
+                self.stream.write(",\n" if self.count else "[\n")
+                self.stream.write(textwrap.indent(json.dumps(record, ensure_ascii=False, indent=2), "  "))
+            else:
+                payload = {"type": "performance", "performance": record} if self.envelope else record
+                self.stream.write(json.dumps(payload, ensure_ascii=False) + "\n")
+                self.stream.flush()
+
+            self.count += 1
+            if record.get('detail_url'):
+                self.detail_url_count += 1
+
+    def write_many(self, records: Iterable[Union[Performance, Dict[str, str]]]):
+        for record in records:
+            self.write(record)
+
+    def message(self, message: Dict):
+        if not self.envelope:
+            return
+
+        with self._lock:
+            self.stream.write(json.dumps(message, ensure_ascii=False) + "\n")
+            self.stream.flush()
+
+    def close(self):
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+
+            if self.format == "json":
+                self.stream.write("\n]" if self.count else "[]")
+            self.stream.flush()
+            self._commit()
+
+    def abort(self):
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+            self._discard()
+
+    def _commit(self):
+        if self.owns_stream:
+            self.stream.close()
+
+    def _discard(self):
+        self.stream.flush()
+        if self.owns_stream:
+            self.stream.close()
+
+    @staticmethod
+    def _is_pipe(target: str) -> bool:
+        try:
+            mode = os.stat(target).st_mode
+        except OSError:
+            return False
+        return stat.S_ISFIFO(mode) or stat.S_ISCHR(mode)
+
+    def __enter__(self) -> "OutputSink":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class AtomicFileSink(OutputSink):
+
+    def __init__(self, filename: str, format: str = "json"):
+        self.filename = filename
+        self.temp_path = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        super().__init__(open(self.temp_path, "w", encoding="utf-8"), format, owns_stream=True)
+
+    def _commit(self):
+        try:
+            os.fsync(self.stream.fileno())
+            self.stream.close()
+            os.replace(self.temp_path, self.filename)
+        except Exception:
+            self._discard()
+            raise
+
+    def _discard(self):
+        try:
+            self.stream.close()
+        finally:
+            if os.path.exists(self.temp_path):
+                os.unlink(self.temp_path)
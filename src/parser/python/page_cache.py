@@ -0,0 +1,196 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from url_utils import UrlUtils
+
+
+class PageCache:
+    _shared: Optional["PageCache"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, directory: Optional[str] = None, ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None):
+        self.directory = directory or os.environ.get('PARSER_CACHE_DIR', '.parser_cache')
+        self.ttl = ttl if ttl is not None else float(os.environ.get('PARSER_CACHE_TTL', '3600'))
+        self.max_bytes = max_bytes or int(os.environ.get('PARSER_CACHE_MAX_MB', '256')) * 1024 * 1024
+        self.entries_dir = os.path.join(self.directory, 'entries')
+        self.blobs_dir = os.path.join(self.directory, 'blobs')
+        self.metrics = Counter()
+        self._lock = threading.Lock()
+
+        os.makedirs(self.entries_dir, exist_ok=True)
+        os.makedirs(self.blobs_dir, exist_ok=True)
+
+    @classmethod
+    def shared(cls) -> "PageCache":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @classmethod
+    def shared_stats(cls) -> Dict[str, int]:
+        with cls._shared_lock:
+            return cls._shared.stats() if cls._shared is not None else {}
+
+    @staticmethod
+    def content_hash(content: str) -> str:
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def get(self, url: str) -> Optional[Dict]:
+        try:
+            with open(self._entry_path(url), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return time.time() - entry.get('validated_at', 0) < self.ttl
+
+    def lookup_fresh(self, url: str) -> Optional[List[Dict[str, str]]]:
+        entry = self.get(url)
+        if entry and self.is_fresh(entry):
+            self.metrics['hits'] += 1
+            self.touch(url, entry, revalidated=False)
+            return self.results(entry)
+
+        self.metrics['misses'] += 1
+        return None
+
+    def revalidated(self, url: str, entry: Dict) -> List[Dict[str, str]]:
+        self.metrics['revalidated'] += 1
+        self.touch(url, entry, revalidated=True)
+        return self.results(entry)
+
+    def unchanged_results(self, url: str, entry: Optional[Dict], content: str) -> Optional[List[Dict[str, str]]]:
+        if entry and entry.get('content_hash') == self.content_hash(content):
+            self.metrics['unchanged'] += 1
+            self.touch(url, entry, revalidated=True)
+            return self.results(entry)
+        return None
+
+    def put(self, url: str, content: Optional[str], results: List[Dict[str, str]],
+            etag: Optional[str] = None, last_modified: Optional[str] = None,
+            fingerprint: Optional[str] = None) -> Dict:
+        content_hash = self.content_hash(content) if content else None
+        now = time.time()
+        entry = {
+            'url': url,
+            'key': UrlUtils.cache_key(url),
+            'content_hash': content_hash,
+            'fingerprint': fingerprint,
+            'etag': etag,
+            'last_modified': last_modified,
+            'stored_at': now,
+            'validated_at': now,
+            'accessed_at': now,
+            'results': [dict(result) for result in results],
+        }
+
+        with self._lock:
+            if content_hash:
+                blob_path = os.path.join(self.blobs_dir, f"{content_hash}.html.gz")
+                if not os.path.exists(blob_path):
+                    self._write_atomic(blob_path, gzip.compress(content.encode('utf-8')))
+            self._write_atomic(self._entry_path(url), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+            self.metrics['stores'] += 1
+            self._evict()
+
+        return entry
+
+    def touch(self, url: str, entry: Dict, revalidated: bool):
+        now = time.time()
+        entry['accessed_at'] = now
+        if revalidated:
+            entry['validated_at'] = now
+
+        with self._lock:
+            try:
+                self._write_atomic(self._entry_path(url), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+            except OSError:
+                pass
+
+    def read_html(self, entry: Dict) -> Optional[str]:
+        if not entry.get('content_hash'):
+            return None
+        try:
+            with gzip.open(os.path.join(self.blobs_dir, f"{entry['content_hash']}.html.gz"), 'rt',
+                           encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def stats(self) -> Dict[str, int]:
+        lookups = self.metrics['hits'] + self.metrics['misses']
+        return {
+            **self.metrics,
+            'hit_ratio': round(self.metrics['hits'] / lookups, 3) if lookups else 0.0,
+        }
+
+    @staticmethod
+    def results(entry: Dict) -> List[Dict[str, str]]:
+        return [dict(result) for result in entry.get('results', [])]
+
+    def _entry_path(self, url: str) -> str:
+        key = hashlib.sha256(UrlUtils.cache_key(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.entries_dir, f"{key}.json")
+
+    def _evict(self):
+        files = []
+        total = 0
+        for directory in (self.entries_dir, self.blobs_dir):
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                total += size
+                if directory == self.entries_dir:
+                    files.append(path)
+
+        if total <= self.max_bytes:
+            return
+
+        entries = []
+        for path in files:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                entry = {}
+            entries.append((entry.get('accessed_at', 0), path, entry.get('content_hash')))
+        entries.sort()
+
+        referenced = Counter(content_hash for _, _, content_hash in entries if content_hash)
+        for _, path, content_hash in entries:
+            if total <= self.max_bytes:
+                break
+            total -= self._remove(path)
+            if content_hash:
+                referenced[content_hash] -= 1
+                if referenced[content_hash] <= 0:
+                    total -= self._remove(os.path.join(self.blobs_dir, f"{content_hash}.html.gz"))
+            self.metrics['evictions'] += 1
+
+    @staticmethod
+    def _remove(path: str) -> int:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            return size
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _write_atomic(path: str, payload: bytes):
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(temp_path, path)
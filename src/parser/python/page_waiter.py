@@ -0,0 +1,151 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+from selenium.common.exceptions import JavascriptException, StaleElementReferenceException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from metrics import Metrics
+from network_monitor import NetworkMonitor
+from resilience import DriverFailure
+from webdriver_utils import WebDriverUtils
+
+
+class PageWaiter:
+    DEFAULT_DEADLINES = {
+        "document_ready": 15.0,
+        "content": 10.0,
+        "network_idle": 10.0,
+        "dom_quiet": 5.0,
+        "block_count": 8.0,
+        "url_change": 5.0,
+    }
+
+    INSTALL_OBSERVER_SCRIPT = """
+        if (!window.__parserMutationObserver) {
+            window.__parserLastMutation = performance.now();
+            window.__parserMutationObserver = new MutationObserver(function () {
+                window.__parserLastMutation = performance.now();
+            });
+            window.__parserMutationObserver.observe(document.documentElement, {
+                childList: true, subtree: true, attributes: true, characterData: true
+            });
+        }
+        return performance.now() - window.__parserLastMutation;
+    """
+
+    def __init__(self, deadlines: Optional[Dict[str, float]] = None, poll_interval: float = 0.1,
+                 cancel_event: Optional[threading.Event] = None):
+        self.deadlines = dict(self.DEFAULT_DEADLINES)
+        if deadlines:
+            self.deadlines.update(deadlines)
+        self.poll_interval = poll_interval
+        self.cancel_event = cancel_event
+        self.network_monitor = NetworkMonitor()
+        self.metrics = Metrics.shared()
+        self.timings: Deque[Dict] = deque(maxlen=int(os.environ.get('PARSER_WAIT_TIMINGS', '1000')))
+        self.content_found: Optional[bool] = None
+
+    def wait_for_document_ready(self, driver) -> bool:
+        return self._wait(driver, "document_ready",
+                          lambda d: d.execute_script("return document.readyState") == "complete")
+
+    def wait_for_content(self, driver) -> bool:
+        return self._measure("content",
+                             lambda: WebDriverUtils.wait_for_content(driver, self.deadlines["content"]))
+
+    def wait_for_network_idle(self, driver, idle_seconds: float = 0.5) -> bool:
+        monitor = self.network_monitor
+
+        def network_idle(d) -> bool:
+            monitor.poll(d)
+            if not monitor.available:
+                return self._resources_settled(d, idle_seconds)
+            return monitor.is_idle(idle_seconds)
+
+        return self._wait(driver, "network_idle", network_idle)
+
+    def wait_for_dom_quiet(self, driver, quiet_seconds: float = 0.5) -> bool:
+        return self._wait(driver, "dom_quiet",
+                          lambda d: d.execute_script(self.INSTALL_OBSERVER_SCRIPT) >= quiet_seconds * 1000)
+
+    def wait_for_stable_block_count(self, driver, selector: str = "div._3XrzE._5fgzK",
+                                    settle_seconds: float = 0.5, allow_empty: bool = False) -> bool:
+        state = {"count": -1, "since": time.monotonic()}
+
+        def count_stable(d) -> bool:
+            count = d.execute_script("return document.querySelectorAll(arguments[0]).length", selector)
+            now = time.monotonic()
+            if count != state["count"]:
+                state["count"] = count
+                state["since"] = now
+                return False
+            return (count > 0 or allow_empty) and now - state["since"] >= settle_seconds
+
+        return self._wait(driver, "block_count", count_stable)
+
+    def wait_for_url_change(self, driver, previous_url: str) -> bool:
+        return self._wait(driver, "url_change", lambda d: d.current_url != previous_url)
+
+    def wait_for_page(self, driver) -> bool:
+        self.wait_for_document_ready(driver)
+        found = self.wait_for_content(driver)
+        self.content_found = found
+        self.wait_for_network_idle(driver)
+        self.wait_for_stable_block_count(driver, allow_empty=not found)
+        return found
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def start_navigation(self, driver):
+        self.content_found = None
+        self.network_monitor.reset(driver)
+
+    def total_wait_seconds(self) -> float:
+        return round(sum(timing["seconds"] for timing in self.timings), 3)
+
+    def _wait(self, driver, phase: str, condition: Callable) -> bool:
+        def until() -> bool:
+            try:
+                WebDriverWait(driver, self.deadlines[phase], poll_frequency=self.poll_interval,
+                              ignored_exceptions=(JavascriptException, StaleElementReferenceException)
+                              ).until(lambda d: self.cancelled or condition(d))
+                return not self.cancelled
+            except Exception as e:
+                if DriverFailure.is_fatal(e):
+                    raise
+                return False
+
+        return self._measure(phase, until)
+
+    def _measure(self, phase: str, wait: Callable[[], bool]) -> bool:
+        if self.cancelled:
+            return False
+
+        started = time.perf_counter()
+        ready = wait()
+        elapsed = time.perf_counter() - started
+        self.timings.append({
+            "phase": phase,
+            "seconds": round(elapsed, 3),
+            "ready": ready,
+        })
+        self.metrics.observe("wait_seconds", elapsed, phase=phase)
+        if not ready:
+            self.metrics.inc("wait_timeouts", phase=phase)
+        return ready
+
+    @staticmethod
+    def _resources_settled(driver, idle_seconds: float) -> bool:
+        return driver.execute_script("""
+            var entries = performance.getEntriesByType('resource');
+            if (!entries.length) {
+                return true;
+            }
+            var lastEnd = Math.max.apply(null, entries.map(function (e) { return e.responseEnd; }));
+            return performance.now() - lastEnd >= arguments[0];
+        """, idle_seconds * 1000)
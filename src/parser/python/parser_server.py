@@ -0,0 +1,181 @@
+import json
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from afisha_parser import AfishaParser
+from change_tracker import ChangeTracker
+from detail_enricher import DetailEnricher
+from driver_pool import DriverPool
+from metrics import Metrics
+from output_sink import OutputSink
+from page_cache import PageCache
+from url_utils import UrlUtils
+
+
+class ParserRequestHandler(BaseHTTPRequestHandler):
+    server_version = "AfishaParser/1.0"
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/metrics":
+            if parse_qs(parts.query).get("format") == ["json"]:
+                self._send_json(200, Metrics.shared().snapshot())
+            else:
+                body = Metrics.shared().render_openmetrics().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/openmetrics-text; version=1.0.0; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        elif parts.path == "/health":
+            self._send_json(200, {
+                "status": "ok",
+                "active_jobs": self.server.parser_server.active_jobs,
+                "pool": self.server.parser_server.driver_pool.stats,
+                "cache": PageCache.shared_stats(),
+            })
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/parse":
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+            job = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": "Invalid JSON body"})
+            return
+
+        if not isinstance(job, dict):
+            self._send_json(400, {"error": "JSON body must be an object"})
+            return
+
+        source = (job.get("url") or job.get("file") or "").strip()
+        if not source:
+            self._send_json(400, {"error": "Either url or file is required"})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        self.server.parser_server.run_job(source, self._send_line, diff=bool(job.get("diff")),
+                                          diff_only=bool(job.get("diff_only")), stream=bool(job.get("stream")),
+                                          enrich=bool(job.get("enrich")))
+
+    def _send_line(self, message: Dict):
+        try:
+            self.wfile.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+class ParserServer:
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, socket_path: Optional[str] = None,
+                 driver_pool: Optional[DriverPool] = None):
+        self.driver_pool = driver_pool or DriverPool.shared()
+        self.change_tracker = ChangeTracker()
+        self.active_jobs = 0
+        self._jobs_lock = threading.Lock()
+
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            self.httpd = ThreadingUnixHTTPServer(socket_path, ParserRequestHandler)
+            self.address = socket_path
+        else:
+            self.httpd = ThreadingHTTPServer((host, port), ParserRequestHandler)
+            self.address = f"http://{host}:{self.httpd.server_address[1]}"
+
+        self.socket_path = socket_path
+        self.httpd.parser_server = self
+
+    def serve_forever(self):
+        self.driver_pool.warm_up()
+        print(f"Parser server listening on {self.address}", flush=True)
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        self.httpd.server_close()
+        self.driver_pool.close()
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def run_job(self, source: str, send, diff: bool = False, diff_only: bool = False, stream: bool = False,
+                enrich: bool = False):
+        with self._jobs_lock:
+            self.active_jobs += 1
+
+        try:
+            send({"type": "progress", "stage": "started", "source": source})
+
+            stream = stream and not diff_only
+            on_record = (lambda record: send({"type": "performance",
+                                              "performance": OutputSink.normalized_record(record)})) if stream else None
+
+            parser = AfishaParser(on_progress=lambda progress: send({"type": "progress", **progress}))
+            if UrlUtils.is_valid_url(source):
+                performances = parser.parse_performances_from_url(source, on_record=None if enrich else on_record)
+            else:
+                performances = parser.parse_performances_from_file(source)
+                if on_record and not enrich:
+                    for performance in performances:
+                        on_record(performance)
+
+            if enrich:
+                send({"type": "progress", "stage": "enriching", "count": len(performances)})
+                performances = DetailEnricher().enrich(performances, on_record=on_record)
+
+            result = {"type": "result", "count": len(performances), "tier": parser.last_tier}
+
+            if (diff or diff_only) and performances:
+                changes = self.change_tracker.diff(source, performances)
+                result["changes"] = {kind: changes[kind] for kind in ("added", "changed", "removed", "unchanged")}
+                if diff_only:
+                    performances = changes["added"] + changes["changed"]
+
+            if not stream:
+                result["performances"] = [OutputSink.normalized_record(performance) for performance in performances]
+            send(result)
+        except Exception as e:
+            Metrics.shared().inc("errors", component="parser_server")
+            send({"type": "error", "message": str(e)})
+        finally:
+            with self._jobs_lock:
+                self.active_jobs -= 1
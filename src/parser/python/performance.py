@@ -0,0 +1,87 @@
+import json
+import sys
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+from url_utils import UrlUtils
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class Performance:
+    RECORD_FIELDS = frozenset(("title", "detail_url", "title_key", "title_sort_key"))
+
+    title: str
+    detail_url: Optional[str] = None
+    source: Optional[str] = None
+    host: Optional[str] = None
+    extra: Tuple[Tuple[str, Any], ...] = ()
+    key: str = field(init=False, repr=False)
+
+    def __post_init__(self):
+        if self.detail_url:
+            try:
+                key = UrlUtils.cache_key(self.detail_url)
+            except ValueError:
+                key = self.detail_url
+            object.__setattr__(self, "key", self.detail_url if key == self.detail_url else key)
+        else:
+            object.__setattr__(self, "key", "title:" + self.title.strip().casefold())
+
+    @classmethod
+    def create(cls, title: str, detail_url: Optional[str] = None, source: Optional[str] = None,
+               base_url: Optional[str] = None) -> "Performance":
+        if detail_url:
+            if base_url:
+                detail_url = UrlUtils.normalize_url(detail_url, base_url)
+            detail_url = UrlUtils.clean_url(detail_url)
+        try:
+            host = urlsplit(detail_url).netloc if detail_url else ""
+        except ValueError:
+            host = ""
+        return cls(title, detail_url or None, sys.intern(source) if source else None,
+                   sys.intern(host) if host else None)
+
+    @classmethod
+    def from_dict(cls, record: Mapping[str, Any], source: Optional[str] = None) -> "Performance":
+        if isinstance(record, Performance):
+            return record
+        performance = cls.create(record.get('title') or "", record.get('detail_url'), source)
+        extra = tuple((name, value) for name, value in record.items() if name not in cls.RECORD_FIELDS)
+        return replace(performance, extra=extra) if extra else performance
+
+    @classmethod
+    def from_dicts(cls, records: Iterable[Mapping[str, Any]], source: Optional[str] = None) -> List["Performance"]:
+        return [cls.from_dict(record, source) for record in records]
+
+    @staticmethod
+    def unique(performances: Iterable["Performance"]) -> List["Performance"]:
+        return list(dict.fromkeys(performances))
+
+    def with_details(self, details: Mapping[str, Any]) -> "Performance":
+        if not details:
+            return self
+        merged = dict(self.extra)
+        merged.update(details)
+        return replace(self, extra=tuple(merged.items()))
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {"title": self.title,
+                  "detail_url": UrlUtils.add_https_suffix(self.detail_url) if self.detail_url else ""}
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=indent)
+
+    def to_ndjson(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(',', ':')) + "\n"
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Performance):
+            return NotImplemented
+        return self.key == other.key
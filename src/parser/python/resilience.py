@@ -0,0 +1,249 @@
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, TypeVar
+from urllib.parse import urlparse
+
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+    InvalidSessionIdException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+from urllib3.exceptions import HTTPError as Urllib3Error
+
+from metrics import Metrics
+
+T = TypeVar("T")
+
+
+class DriverHungError(WebDriverException):
+    pass
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class DriverFailure:
+    STALE_ELEMENT = "stale_element"
+    TIMEOUT = "timeout"
+    SESSION_CRASHED = "session_crashed"
+    NAVIGATION_BLOCKED = "navigation_blocked"
+    OTHER = "other"
+
+    CRASH_MARKERS = (
+        "chrome not reachable", "session deleted", "disconnected", "target crashed", "tab crashed",
+        "invalid session id", "no such window", "unable to receive message from renderer",
+    )
+    BLOCKED_MARKERS = (
+        "net::err_", "err_blocked_by", "err_name_not_resolved", "err_connection_", "err_too_many_redirects",
+        "err_http_response_code_failure",
+    )
+
+    @classmethod
+    def classify(cls, error: BaseException) -> str:
+        if isinstance(error, (StaleElementReferenceException, ElementClickInterceptedException,
+                              ElementNotInteractableException)):
+            return cls.STALE_ELEMENT
+        if isinstance(error, (DriverHungError, InvalidSessionIdException, NoSuchWindowException,
+                              ConnectionError, Urllib3Error)):
+            return cls.SESSION_CRASHED
+        if isinstance(error, TimeoutException):
+            return cls.TIMEOUT
+
+        message = str(error).lower()
+        if any(marker in message for marker in cls.BLOCKED_MARKERS):
+            return cls.NAVIGATION_BLOCKED
+        if any(marker in message for marker in cls.CRASH_MARKERS):
+            return cls.SESSION_CRASHED
+        if "timed out" in message or "timeout" in message:
+            return cls.TIMEOUT
+        return cls.OTHER
+
+    @classmethod
+    def is_fatal(cls, error: BaseException) -> bool:
+        return cls.classify(error) == cls.SESSION_CRASHED
+
+
+class CircuitBreaker:
+    _shared: Optional["CircuitBreaker"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, failure_threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        self.failure_threshold = failure_threshold or int(os.environ.get('PARSER_BREAKER_FAILURES', '5'))
+        self.reset_timeout = reset_timeout or float(os.environ.get('PARSER_BREAKER_RESET_SECONDS', '60'))
+        self.metrics = Metrics.shared()
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict] = {}
+
+    @classmethod
+    def shared(cls) -> "CircuitBreaker":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def allow(self, url: str) -> bool:
+        host = self._host(url)
+        with self._lock:
+            state = self._hosts.get(host)
+            if not state or state["state"] == "closed":
+                return True
+
+            now = time.monotonic()
+            if now - state["opened_at"] < self.reset_timeout:
+                return False
+            state["state"] = "half_open"
+            state["opened_at"] = now
+            return True
+
+    def record_success(self, url: str):
+        with self._lock:
+            self._hosts.pop(self._host(url), None)
+
+    def record_failure(self, url: str):
+        host = self._host(url)
+        with self._lock:
+            state = self._hosts.setdefault(host, {"state": "closed", "failures": 0, "opened_at": 0.0})
+            state["failures"] += 1
+            if state["state"] == "half_open" or state["failures"] >= self.failure_threshold:
+                if state["state"] != "open":
+                    self.metrics.inc("circuit_trips", host=host)
+                    print(f"Circuit opened for {host} after {state['failures']} failures")
+                state["state"] = "open"
+                state["opened_at"] = time.monotonic()
+
+    def state(self, url: str) -> str:
+        with self._lock:
+            state = self._hosts.get(self._host(url))
+            return state["state"] if state else "closed"
+
+    @staticmethod
+    def _host(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+
+class RetryPolicy:
+    RETRYABLE = frozenset((DriverFailure.STALE_ELEMENT, DriverFailure.TIMEOUT))
+    BREAKER_FAILURES = frozenset((DriverFailure.TIMEOUT, DriverFailure.NAVIGATION_BLOCKED))
+
+    def __init__(self, attempts: Optional[int] = None, base_delay: float = 0.5, max_delay: float = 5.0,
+                 breaker: Optional[CircuitBreaker] = None, cancel_event: Optional[threading.Event] = None):
+        self.attempts = attempts or int(os.environ.get('PARSER_DRIVER_ATTEMPTS', '3'))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker.shared()
+        self.cancel_event = cancel_event
+        self.metrics = Metrics.shared()
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def run(self, operation: Callable[[], T], name: str, url: Optional[str] = None) -> T:
+        if url and not self.breaker.allow(url):
+            self.metrics.inc("driver_failures", kind="circuit_open", operation=name)
+            raise CircuitOpenError(f"Circuit open for {urlparse(url).netloc}, skipping {name}")
+
+        for attempt in range(self.attempts):
+            try:
+                result = operation()
+            except Exception as e:
+                kind = DriverFailure.classify(e)
+                self.metrics.inc("driver_failures", kind=kind, operation=name)
+                if url and kind in self.BREAKER_FAILURES:
+                    self.breaker.record_failure(url)
+
+                if kind not in self.RETRYABLE or attempt + 1 >= self.attempts or self._cancelled():
+                    raise
+                if url and not self.breaker.allow(url):
+                    raise CircuitOpenError(f"Circuit open for {urlparse(url).netloc}, skipping {name}") from e
+
+                self.metrics.inc("driver_retries", operation=name, kind=kind)
+                self._sleep(self.delay(attempt))
+                continue
+
+            if url:
+                self.breaker.record_success(url)
+            return result
+
+    def _cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    def _sleep(self, seconds: float):
+        if self.cancel_event is not None:
+            self.cancel_event.wait(seconds)
+        else:
+            time.sleep(seconds)
+
+
+class DriverWatchdog:
+    _shared: Optional["DriverWatchdog"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, poll_interval: float = 1.0):
+        self.poll_interval = poll_interval
+        self.metrics = Metrics.shared()
+        self._lock = threading.Lock()
+        self._watched: Dict[int, Dict] = {}
+        self._expired: Dict[int, float] = {}
+        self._next_token = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def shared(cls) -> "DriverWatchdog":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @contextmanager
+    def watch(self, on_expire: Callable[[], None], seconds: float, label: str = "lease"):
+        with self._lock:
+            self._next_token += 1
+            token = self._next_token
+            self._watched[token] = {"deadline": time.monotonic() + seconds, "on_expire": on_expire, "label": label}
+            self._ensure_thread()
+
+        try:
+            yield
+        except Exception as e:
+            if self._finish(token):
+                raise DriverHungError(f"Browser killed by watchdog after {seconds}s ({label})") from e
+            raise
+        else:
+            if self._finish(token):
+                raise DriverHungError(f"Browser killed by watchdog after {seconds}s ({label})")
+
+    def _finish(self, token: int) -> bool:
+        with self._lock:
+            self._watched.pop(token, None)
+            return self._expired.pop(token, None) is not None
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="driver-watchdog", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_interval)
+            now = time.monotonic()
+            with self._lock:
+                expired = [(token, entry) for token, entry in self._watched.items() if entry["deadline"] <= now]
+                for token, _ in expired:
+                    del self._watched[token]
+                    self._expired[token] = now
+
+            for _, entry in expired:
+                self.metrics.inc("watchdog_kills", label=entry["label"])
+                print(f"Watchdog: killing browser stuck in {entry['label']}")
+                try:
+                    entry["on_expire"]()
+                except Exception as e:
+                    print(f"Error in DriverWatchdog: {e}")
@@ -0,0 +1,189 @@
+import os
+import time
+from typing import Dict, List, Optional
+
+from link_finder import LinkFinder
+from metrics import Metrics
+from resilience import DriverFailure, RetryPolicy
+
+
+class ScrollHarvester:
+    KEY_ATTRIBUTE = "data-parser-key"
+    FRESH_ATTRIBUTE = "data-parser-fresh"
+
+    RESET_SCRIPT = """
+        var keyAttribute = arguments[0];
+        var freshAttribute = arguments[1];
+        window.__parserScrollHarvest = null;
+        document.querySelectorAll('[' + keyAttribute + '], [' + freshAttribute + ']').forEach(function (block) {
+            block.removeAttribute(keyAttribute);
+            block.removeAttribute(freshAttribute);
+        });
+        window.scrollTo(0, 0);
+    """
+
+    SCROLL_FUNCTIONS = """
+        function scrollStep(state, step) {
+            var scroller = document.scrollingElement || document.documentElement;
+            window.scrollTo(0, state.top);
+            window.scrollBy(0, Math.max(1, Math.floor(window.innerHeight * step)));
+            return {
+                moved: scroller.scrollTop !== state.top,
+                atBottom: scroller.scrollTop + window.innerHeight >= scroller.scrollHeight - 2
+            };
+        }
+    """
+
+    KEY_FUNCTIONS = LinkFinder.SNAPSHOT_FUNCTIONS + """
+        function blockKey(block, snapshot, dataAttributes) {
+            for (var i = 0; i < snapshot.links.length; i++) {
+                if (keywords.test(snapshot.links[i])) {
+                    return snapshot.links[i].split('#')[0];
+                }
+            }
+            for (var j = 0; j < dataAttributes.length; j++) {
+                if (snapshot.data[dataAttributes[j]]) {
+                    return snapshot.data[dataAttributes[j]];
+                }
+            }
+            var top = Math.round(block.getBoundingClientRect().top + (window.pageYOffset || 0));
+            return 'text:' + top + ':' + (block.textContent || '').replace(/\\s+/g, ' ').trim().slice(0, 200);
+        }
+    """
+
+    STEP_SCRIPT = KEY_FUNCTIONS + SCROLL_FUNCTIONS + """
+        var selector = arguments[0];
+        var dataAttributes = arguments[1];
+        var parentLevels = arguments[2];
+        var step = arguments[3];
+        var limit = arguments[4];
+        var keyAttribute = arguments[5];
+        var freshAttribute = arguments[6];
+        var scroll = arguments[7];
+
+        var state = window.__parserScrollHarvest;
+        if (!state) {
+            state = window.__parserScrollHarvest = {keys: new Set(), count: 0};
+        }
+
+        document.querySelectorAll('[' + freshAttribute + ']').forEach(function (block) {
+            block.removeAttribute(freshAttribute);
+        });
+
+        var unseen = selector.split(',').map(function (part) {
+            return part.trim() + ':not([' + keyAttribute + '])';
+        }).join(', ');
+
+        var blocks = document.querySelectorAll(unseen);
+        var fresh = [];
+        for (var i = 0; i < blocks.length && state.count < limit; i++) {
+            var snapshot = snapshotBlock(blocks[i], dataAttributes, parentLevels);
+            var key = blockKey(blocks[i], snapshot, dataAttributes);
+            blocks[i].setAttribute(keyAttribute, key);
+            if (state.keys.has(key)) {
+                continue;
+            }
+            blocks[i].setAttribute(freshAttribute, '');
+            state.keys.add(key);
+            state.count++;
+            snapshot.key = key;
+            fresh.push(snapshot);
+        }
+
+        state.top = (document.scrollingElement || document.documentElement).scrollTop;
+        var result = scroll ? scrollStep(state, step) : {};
+        result.blocks = fresh;
+        return result;
+    """
+
+    SCROLL_SCRIPT = SCROLL_FUNCTIONS + """
+        return scrollStep(window.__parserScrollHarvest, arguments[0]);
+    """
+
+    def __init__(self, step: Optional[float] = None, max_blocks: Optional[int] = None, max_steps: Optional[int] = None,
+                 idle_steps: Optional[int] = None, settle_seconds: Optional[float] = None):
+        self.step = step or float(os.environ.get('PARSER_SCROLL_STEP', '0.9'))
+        self.max_blocks = max_blocks or int(os.environ.get('PARSER_SCROLL_MAX_BLOCKS', '5000'))
+        self.max_steps = max_steps or int(os.environ.get('PARSER_SCROLL_MAX_STEPS', '500'))
+        self.idle_steps = idle_steps or int(os.environ.get('PARSER_SCROLL_IDLE_STEPS', '3'))
+        self.settle_seconds = settle_seconds or float(os.environ.get('PARSER_SCROLL_SETTLE_SECONDS', '0.3'))
+        self.retry_policy = RetryPolicy()
+        self.metrics = Metrics.shared()
+        self.last_steps = 0
+        self.clicked_urls: Dict[str, str] = {}
+
+    def harvest(self, driver, page_waiter=None, selector: str = "div._3XrzE._5fgzK",
+                click_harvester=None) -> List[Dict]:
+        snapshots: List[Dict] = []
+        idle = 0
+        stop = "max_steps"
+        self.last_steps = 0
+        self.clicked_urls = {}
+
+        try:
+            driver.execute_script(self.RESET_SCRIPT, self.KEY_ATTRIBUTE, self.FRESH_ATTRIBUTE)
+
+            for step in range(self.max_steps):
+                if page_waiter and page_waiter.cancelled:
+                    stop = "cancelled"
+                    break
+
+                result = self.retry_policy.run(
+                    lambda: driver.execute_script(self.STEP_SCRIPT, selector, LinkFinder.DATA_ATTRIBUTES, 3,
+                                                  self.step, self.max_blocks, self.KEY_ATTRIBUTE,
+                                                  self.FRESH_ATTRIBUTE, click_harvester is None),
+                    "scroll_step") or {}
+                fresh = result.get("blocks") or []
+                snapshots.extend(fresh)
+                self.last_steps = step + 1
+
+                if click_harvester is not None:
+                    if fresh:
+                        self._click_fresh(driver, click_harvester, fresh)
+                    result.update(self.retry_policy.run(
+                        lambda: driver.execute_script(self.SCROLL_SCRIPT, self.step), "scroll_step") or {})
+
+                if len(snapshots) >= self.max_blocks:
+                    stop = "max_blocks"
+                    break
+
+                if fresh:
+                    idle = 0
+                elif result.get("atBottom") or not result.get("moved"):
+                    idle += 1
+                    if idle >= self.idle_steps:
+                        stop = "exhausted"
+                        break
+
+                self._settle(driver, page_waiter, at_bottom=bool(result.get("atBottom")))
+
+            driver.execute_script("window.scrollTo(0, 0);")
+            self._settle(driver, page_waiter, at_bottom=False)
+        except Exception as e:
+            if DriverFailure.is_fatal(e):
+                raise
+            stop = "error"
+            self.metrics.inc("errors", component="scroll_harvester")
+            print(f"Error in ScrollHarvester.harvest: {e}")
+
+        self.metrics.inc("scroll_harvests", stop=stop)
+        self.metrics.inc("scroll_steps", self.last_steps)
+        return snapshots
+
+    def clicked_url(self, snapshot: Dict) -> Optional[str]:
+        return self.clicked_urls.get(snapshot.get('key'))
+
+    def _click_fresh(self, driver, click_harvester, fresh: List[Dict]):
+        urls = click_harvester.harvest(driver, f"[{self.FRESH_ATTRIBUTE}]")
+        for snapshot, url in zip(fresh, urls):
+            if url:
+                self.clicked_urls[snapshot['key']] = url
+
+    def _settle(self, driver, page_waiter, at_bottom: bool):
+        if page_waiter is None:
+            time.sleep(self.settle_seconds)
+            return
+
+        page_waiter.wait_for_dom_quiet(driver, self.settle_seconds)
+        if at_bottom:
+            page_waiter.wait_for_network_idle(driver)
@@ -0,0 +1,94 @@
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from chrome_config import ChromeConfig
+
+
+class FetchResult:
+
+    def __init__(self, status: int, text: Optional[str] = None, etag: Optional[str] = None,
+                 last_modified: Optional[str] = None):
+        self.status = status
+        self.text = text
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+    @property
+    def ok(self) -> bool:
+        return self.status in (200, 304)
+
+    @property
+    def retryable(self) -> bool:
+        return self.status == 0 or self.status == 429 or self.status >= 500
+
+
+class StaticFetcher:
+    _shared_session: Optional[requests.Session] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, timeout: float = 15, session: Optional[requests.Session] = None):
+        self.timeout = timeout
+        self.session = session or StaticFetcher.shared_session()
+
+    @classmethod
+    def shared_session(cls) -> requests.Session:
+        with cls._shared_lock:
+            if cls._shared_session is None:
+                cls._shared_session = cls._create_session()
+            return cls._shared_session
+
+    def fetch(self, url: str) -> Optional[str]:
+        result = self.fetch_conditional(url)
+        return result.text if result else None
+
+    def fetch_conditional(self, url: str, etag: Optional[str] = None,
+                          last_modified: Optional[str] = None) -> Optional[FetchResult]:
+        result = self.request(url, etag, last_modified)
+        return result if result.ok else None
+
+    def request(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> FetchResult:
+        headers: Dict[str, str] = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        try:
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+        except requests.RequestException as e:
+            print(f"Static fetch failed for {url}: {e}")
+            return FetchResult(0)
+
+        if response.status_code == 304:
+            return FetchResult(304, etag=etag, last_modified=last_modified)
+
+        if response.status_code != 200:
+            return FetchResult(response.status_code)
+
+        if 'html' not in response.headers.get('Content-Type', 'text/html'):
+            return FetchResult(415)
+
+        return FetchResult(200, response.text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+    @staticmethod
+    def _create_session() -> requests.Session:
+        session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504],
+                      allowed_methods=["GET", "HEAD"])
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({
+            "User-Agent": ChromeConfig.USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8",
+        })
+        return session
@@ -0,0 +1,7 @@
+import os
+import sys
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, PACKAGE_DIR)
+sys.path.insert(0, os.path.join(PACKAGE_DIR, "benchmarks"))
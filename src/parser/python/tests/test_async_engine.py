@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import async_engine
+from async_engine import AsyncAfishaParser
+from performance import Performance
+
+
+class FakePool:
+    size = 1
+
+    def resize(self, size: int):
+        self.size = size
+
+
+class FakeParser:
+    seconds = 0.05
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, on_progress=None, driver_pool=None, use_cache=True, cancel_event=None):
+        self.cancel_event = cancel_event
+        self.last_tier = None
+
+    def _cancelled(self, url):
+        if self.cancel_event.is_set():
+            self.last_tier = "cancelled"
+        return self.cancel_event.is_set()
+
+    def parse_performances_from_url(self, url, on_record=None):
+        with FakeParser.lock:
+            FakeParser.active += 1
+            FakeParser.peak = max(FakeParser.peak, FakeParser.active)
+        try:
+            if self.cancel_event.wait(self.seconds):
+                self.last_tier = "cancelled"
+                return []
+            self.last_tier = "static_html"
+            return [Performance.create(f"Show {url[-1]}", url + "/w/event/1")]
+        finally:
+            with FakeParser.lock:
+                FakeParser.active -= 1
+
+
+@pytest.fixture(autouse=True)
+def fake_parser(monkeypatch):
+    monkeypatch.setattr(async_engine, "AfishaParser", FakeParser)
+    monkeypatch.setattr(FakeParser, "active", 0)
+    monkeypatch.setattr(FakeParser, "peak", 0)
+    monkeypatch.setattr(FakeParser, "seconds", 0.05)
+
+
+def crawl(engine: AsyncAfishaParser, urls):
+    try:
+        return asyncio.run(engine.crawl(urls))
+    finally:
+        engine.close()
+
+
+def test_crawl_is_bounded_by_concurrency():
+    engine = AsyncAfishaParser(concurrency=2, driver_pool=FakePool(), politeness_delay=0)
+    urls = [f"https://host{i}.test" for i in range(6)]
+
+    result = crawl(engine, urls + urls[:1])
+
+    assert FakeParser.peak == 2
+    assert list(result["by_source"]) == urls
+    assert [report["count"] for report in result["sources"]] == [1] * 6
+    assert len(result["performances"]) == 6
+
+
+def test_timeout_starts_after_the_host_slot(monkeypatch):
+    monkeypatch.setattr(FakeParser, "seconds", 0.1)
+    engine = AsyncAfishaParser(concurrency=5, task_timeout=0.35, driver_pool=FakePool(), per_host=1,
+                               politeness_delay=0)
+
+    result = crawl(engine, [f"https://same.test/{i}" for i in range(5)])
+
+    assert [report["error"] for report in result["sources"]] == [None] * 5
+    assert FakeParser.peak == 1
+
+
+def test_timed_out_task_is_cancelled_and_reported(monkeypatch):
+    monkeypatch.setattr(FakeParser, "seconds", 5)
+    engine = AsyncAfishaParser(concurrency=1, task_timeout=0.1, driver_pool=FakePool(), politeness_delay=0)
+    started = time.perf_counter()
+
+    result = crawl(engine, ["https://slow.test/1"])
+
+    assert result["sources"][0]["error"] == "Timed out after 0.1s"
+    assert time.perf_counter() - started < 2
+
+
+def test_cancel_stops_running_and_queued_tasks(monkeypatch):
+    monkeypatch.setattr(FakeParser, "seconds", 5)
+    engine = AsyncAfishaParser(concurrency=1, driver_pool=FakePool(), politeness_delay=0)
+
+    async def run():
+        task = asyncio.ensure_future(engine.crawl(["https://a.test/1", "https://b.test/2"]))
+        await asyncio.sleep(0.1)
+        engine.cancel()
+        return await task
+
+    started = time.perf_counter()
+    try:
+        result = asyncio.run(run())
+    finally:
+        engine.close()
+
+    assert [report["error"] for report in result["sources"]] == ["Cancelled", "Cancelled"]
+    assert time.perf_counter() - started < 2
@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+from batch_crawler import BatchCrawler, HostThrottle
+from fixture_server import FixtureServer
+
+
+class FakePool:
+    size = 1
+
+    def resize(self, size: int):
+        self.size = size
+
+
+@pytest.fixture
+def server():
+    server = FixtureServer().start()
+    yield server
+    server.stop()
+
+
+def test_host_throttle_bounds_concurrency_per_host():
+    throttle = HostThrottle(max_per_host=2, delay=0)
+    active = {"a.test": 0, "b.test": 0}
+    peak = {"a.test": 0, "b.test": 0}
+    lock = threading.Lock()
+
+    def visit(host: str):
+        with throttle.slot(f"https://{host}/w/event/1"):
+            with lock:
+                active[host] += 1
+                peak[host] = max(peak[host], active[host])
+            time.sleep(0.02)
+            with lock:
+                active[host] -= 1
+
+    threads = [threading.Thread(target=visit, args=(host,)) for host in ("a.test", "b.test") * 4]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == {"a.test": 2, "b.test": 2}
+
+
+def test_host_throttle_spaces_requests_to_one_host():
+    throttle = HostThrottle(max_per_host=4, delay=0.05)
+    starts = []
+
+    for _ in range(3):
+        with throttle.slot("https://A.test/listing"):
+            starts.append(time.monotonic())
+
+    assert all(later - earlier >= 0.045 for earlier, later in zip(starts, starts[1:]))
+
+
+def test_crawl_merges_sources_in_url_order(server):
+    crawler = BatchCrawler(workers=2, politeness_delay=0, driver_pool=FakePool(), use_cache=False)
+    urls = [server.listing_url(9, "generated"), server.listing_url(5, "generated"), server.listing_url(9, "generated")]
+
+    result = crawler.crawl(urls)
+
+    assert list(result["by_source"]) == urls[:2]
+    assert [report["count"] for report in result["sources"]] == [5, 4]
+    assert [report["tier"] for report in result["sources"]] == ["static_html", "static_html"]
+    assert result["performances"] == result["by_source"][urls[0]]
+    assert server.hits["listing"] == 2
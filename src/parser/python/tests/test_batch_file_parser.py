@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from batch_file_parser import BatchFileParser
+from file_manager import FileManager
+from listing_generator import generate_listing
+
+read_local_file = FileManager.read_local_file
+
+
+def crash_on(name: str):
+    def read(path: str):
+        if os.path.basename(path) == name:
+            os._exit(1)
+        return read_local_file(path)
+
+    return staticmethod(read)
+
+
+@pytest.fixture
+def listings(tmp_path):
+    for i in range(6):
+        (tmp_path / f"listing{i}.html").write_text(generate_listing(5 + i, filler=1), encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("not html", encoding="utf-8")
+    return tmp_path
+
+
+def test_expand_walks_directories_and_globs_once(listings):
+    paths = BatchFileParser.expand([str(listings), str(listings / "listing1.*"), str(listings / "missing.html")])
+
+    assert [os.path.basename(path) for path in paths] == [f"listing{i}.html" for i in range(6)] + ["missing.html"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_records_are_deduplicated_across_files(listings, workers):
+    paths = BatchFileParser.expand([str(listings)]) + [str(listings / "missing.html")]
+
+    result = BatchFileParser(workers=workers, chunk_size=2).parse(paths)
+
+    assert len(result["files"]) == 7
+    assert [entry["error"] for entry in result["files"] if entry["error"]] == ["unreadable"]
+    assert len(result["performances"]) == 10
+    assert result["by_source"] == {}
+
+
+def test_crashed_worker_only_fails_its_own_files(listings, monkeypatch):
+    monkeypatch.setattr(FileManager, "read_local_file", crash_on("listing3.html"))
+    paths = BatchFileParser.expand([str(listings)])
+
+    result = BatchFileParser(workers=2, chunk_size=1).parse(paths, keep_by_source=True)
+
+    errors = {os.path.basename(entry["file"]): entry["error"] for entry in result["files"]}
+    assert sorted(errors) == [f"listing{i}.html" for i in range(6)]
+    assert errors["listing3.html"].startswith("worker failed")
+    assert [name for name, error in errors.items() if error] == ["listing3.html"]
+    assert len(result["by_source"][str(listings / "listing5.html")]) == 10
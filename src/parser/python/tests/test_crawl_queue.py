@@ -0,0 +1,100 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from crawl_queue import CrawlQueue
+from performance import Performance
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "queue.sqlite")
+
+
+def open_queue(path: str, owner: str, **kwargs) -> CrawlQueue:
+    return CrawlQueue(path, owner=owner, **kwargs)
+
+
+def test_expired_lease_is_stolen_and_the_old_owner_cannot_finish(queue_path):
+    first = open_queue(queue_path, "a:1", lease_seconds=0.1)
+    second = open_queue(queue_path, "b:2", lease_seconds=60)
+    first.enqueue_listings(["https://a.test/1"])
+
+    job = first.claim()
+    assert second.claim() is None
+
+    time.sleep(0.15)
+    stolen = second.claim()
+    first.complete(job, tier="static_html")
+    assert (stolen["id"], stolen["attempt"]) == (job["id"], 2)
+    assert second.counts()["leased"] == 1
+
+    second.complete(stolen, tier="static_html")
+    assert second.reports() == [{"url": "https://a.test/1", "tier": "static_html", "status": "done", "attempts": 2,
+                                 "error": None, "count": 0}]
+
+
+def test_failed_jobs_are_retried_up_to_max_attempts(queue_path):
+    queue = open_queue(queue_path, "a:1", max_attempts=2)
+    queue.enqueue_listings(["https://a.test/1"])
+
+    queue.fail(queue.claim(), "timeout")
+    assert queue.counts()["pending"] == 1
+    queue.fail(queue.claim(), "timeout")
+
+    assert queue.claim() is None
+    assert queue.counts()["failed"] == 1
+    assert queue.reports()[0]["error"] == "timeout"
+
+
+def test_blocks_of_started_listings_are_claimed_first_and_jobs_enqueued_once(queue_path):
+    queue = open_queue(queue_path, "a:1")
+
+    assert queue.enqueue_blocks("https://a.test/1", [{"index": 0, "title": "Гамлет"}]) == 1
+    assert queue.enqueue_listings(["https://a.test/1", " https://a.test/1 ", "https://a.test/2"]) == 2
+
+    assert [(job["kind"], job["url"]) for job in iter(queue.claim, None)] == [
+        ("block", "https://a.test/1"), ("listing", "https://a.test/1"), ("listing", "https://a.test/2")]
+
+
+def test_checkpoints_are_deduplicated_per_source(queue_path):
+    queue = open_queue(queue_path, "a:1")
+    queue.enqueue_listings(["https://a.test/2", "https://a.test/1"])
+    job = queue.claim()
+
+    for detail_url in ("https://a.test/w/event/1", "https://a.test/w/event/1/", "https://a.test/w/event/2"):
+        queue.checkpoint(job, Performance.create("Шоу", detail_url))
+
+    by_source = queue.results_by_source()
+    assert list(by_source) == ["https://a.test/2", "https://a.test/1"]
+    assert [performance.detail_url for performance in by_source["https://a.test/2"]] == [
+        "https://a.test/w/event/1", "https://a.test/w/event/2"]
+    assert by_source["https://a.test/1"] == []
+
+
+def test_orphaned_leases_of_dead_processes_are_reclaimed(queue_path):
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    orphaned = open_queue(queue_path, f"{socket.gethostname()}:{dead.pid}")
+    orphaned.enqueue_listings(["https://a.test/1"])
+    orphaned.claim()
+
+    queue = open_queue(queue_path, f"{socket.gethostname()}:{os.getpid()}")
+    assert queue.reclaim_orphans() == 1
+    assert queue.claim()["attempt"] == 2
+
+
+def test_queue_status_does_not_enqueue(queue_path, tmp_path):
+    completed = subprocess.run([sys.executable, "main.py", "--queue", queue_path, "--queue-status", "https://a.test/1"],
+                               cwd=PACKAGE_DIR, capture_output=True, text=True, check=True,
+                               env={**os.environ, "PARSER_STATE_DIR": str(tmp_path / "state")})
+
+    assert json.loads(completed.stdout) == {"pending": 0, "leased": 0, "done": 0, "failed": 0, "results": 0}
+    assert CrawlQueue(queue_path).counts()["pending"] == 0
@@ -0,0 +1,78 @@
+import pytest
+
+from detail_enricher import DetailEnricher, DetailExtractor
+from fixture_server import FixtureServer
+from performance import Performance
+
+SCOPED_PAGE = """<html><head><meta property="og:image" content="/og.jpg"></head><body>
+<nav><time datetime="2020-01-01">Новости</time><span>Подписка 99 ₽</span></nav>
+<div itemscope itemtype="https://schema.org/Organization"><span itemprop="price" content="1"></span></div>
+<section itemscope itemtype="https://schema.org/TheaterEvent">
+  <time datetime="2026-11-02T19:00">2 ноября</time><meta itemprop="startDate" content="2026-11-01T19:00">
+  <div itemprop="location" itemscope><span itemprop="name">Малый театр</span>
+    <span itemprop="address">Театральная   пл., 1</span></div>
+  <div itemprop="offers"><meta itemprop="lowPrice" content="1500"><meta itemprop="highPrice" content="4 000">
+    <meta itemprop="priceCurrency" content="EUR"><span>Сервисный сбор 50 ₽</span></div>
+</section>
+<aside>Похожие: от 300 ₽ <time datetime="2027-01-01">январь</time></aside>
+</body></html>"""
+
+
+def test_dom_values_are_scoped_to_the_event():
+    details = DetailExtractor().extract(SCOPED_PAGE, "https://www.afisha.ru/w/performance/1/")
+
+    assert details == {
+        "dates": ["2026-11-01T19:00", "2026-11-02T19:00"],
+        "start_date": "2026-11-01T19:00",
+        "end_date": "2026-11-02T19:00",
+        "venue": "Малый театр",
+        "address": "Театральная пл., 1",
+        "image": "https://www.afisha.ru/og.jpg",
+        "images": ["https://www.afisha.ru/og.jpg"],
+        "price_min": 1500.0,
+        "price_max": 4000.0,
+        "currency": "EUR",
+    }
+
+
+def test_text_prices_fall_back_to_main_content():
+    content = ('<html><body><header>Скидка 10 ₽</header><main><h1>Гамлет</h1><p>Билеты от 800 ₽ до 2 500 руб.</p>'
+               '</main><footer>Доставка 300 ₽</footer></body></html>')
+
+    details = DetailExtractor().extract(content)
+
+    assert (details["price_min"], details["price_max"], details["currency"]) == (800.0, 2500.0, "RUB")
+
+
+def test_json_ld_wins_over_dom():
+    content = ('<html><head><script type="application/ld+json">{"@graph": [{"@type": "TheaterEvent", '
+               '"startDate": "2026-11-05", "offers": [{"price": "700", "priceCurrency": "RUB"}], '
+               '"location": {"name": "МХТ", "address": {"streetAddress": "Камергерский, 3", "addressLocality": "Москва"}}}]}'
+               '</script></head><body><main><time datetime="2030-01-01"></time>9 999 ₽</main></body></html>')
+
+    details = DetailExtractor().extract(content)
+
+    assert details["dates"] == ["2026-11-05"]
+    assert (details["venue"], details["address"]) == ("МХТ", "Камергерский, 3, Москва")
+    assert (details["price_min"], details["price_max"], details["currency"]) == (700.0, 700.0, "RUB")
+
+
+def test_enricher_fetches_each_detail_page_once():
+    server = FixtureServer().start()
+    try:
+        performances = [
+            Performance.create("Спектакль 1", f"{server.base_url}/w/performance/1/"),
+            Performance.create("Спектакль 1", f"{server.base_url}/w/performance/1#tickets"),
+            Performance.create("Без ссылки"),
+        ]
+        emitted = []
+
+        enriched = DetailEnricher(workers=2, use_cache=False, browser_fallback=False).enrich(performances,
+                                                                                                emitted.append)
+    finally:
+        server.stop()
+
+    assert server.hits["detail"] == 1
+    assert len(emitted) == 3
+    assert [dict(performance.extra).get("venue") for performance in enriched] == ["Stage 1", "Stage 1", None]
+    assert dict(enriched[0].extra)["price_max"] == pytest.approx(2000.0)
@@ -0,0 +1,45 @@
+import json
+
+from embedded_state import EmbeddedStateParser
+
+BASE_URL = "https://www.afisha.ru/msk/theatre/"
+
+
+def next_data(state) -> str:
+    return f'<html><script id="__NEXT_DATA__" type="application/json">{json.dumps(state)}</script></html>'
+
+
+def test_next_data_sibling_records_are_parsed_in_order():
+    state = {"props": {"pageProps": {
+        "menu": {"title": "Афиша", "url": "/w/performance/menu"},
+        "items": [
+            {"name": "Гамлет", "url": "/w/performance/1/", "id": 1},
+            {"name": "Ревизор", "url": "https://www.afisha.ru/w/event/2", "id": 2},
+            {"name": "Ревизор", "url": "/w/event/2/#tickets", "id": 3},
+            {"name": "Без ссылки", "url": "/msk/theatre/", "id": 4},
+        ],
+    }}}
+
+    performances = EmbeddedStateParser().parse_performances(next_data(state), BASE_URL)
+
+    assert [(performance.title, performance.detail_url) for performance in performances] == [
+        ("Гамлет", "https://www.afisha.ru/w/performance/1/"),
+        ("Ревизор", "https://www.afisha.ru/w/event/2"),
+    ]
+
+
+def test_window_state_is_decoded_up_to_the_object_end():
+    content = ('<script>window.__INITIAL_STATE__ = {"events": [{"title": "Щелкунчик", "link": "/w/creations/7"},'
+               '{"title": "Жизель", "link": "/w/creations/8"}]}; window.other = {"title": "x"};</script>')
+
+    performances = EmbeddedStateParser().parse_performances(content, BASE_URL)
+
+    assert [performance.detail_url for performance in performances] == [
+        "https://www.afisha.ru/w/creations/7", "https://www.afisha.ru/w/creations/8"]
+
+
+def test_single_links_and_broken_state_are_ignored():
+    content = next_data({"footer": {"title": "О нас", "href": "/w/event/about"}}) + '<script>window.__NUXT__ = {broken</script>'
+
+    assert EmbeddedStateParser().parse_performances(content, BASE_URL) == []
+    assert EmbeddedStateParser().parse_performances("", BASE_URL) == []
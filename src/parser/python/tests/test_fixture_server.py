@@ -0,0 +1,45 @@
+import shutil
+
+import pytest
+
+from afisha_parser import AfishaParser
+from fixture_server import FixtureServer
+
+CHROME = next((shutil.which(name) for name in ("google-chrome", "chromium", "chromium-browser", "chrome")
+               if shutil.which(name)), None)
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = FixtureServer().start()
+    yield server
+    server.stop()
+
+
+def test_static_variant_is_parsed_without_a_browser(server):
+    parser = AfishaParser(use_cache=False)
+
+    performances = parser.parse_performances_from_url(server.listing_url(11, "generated"))
+
+    assert parser.last_tier == "static_html"
+    assert [performance.detail_url for performance in performances] == [
+        server.base_url + path for path in ("/w/event/0", "/w/performance/1/", "/w/performance/2",
+                                            "/w/performance/3/", "/w/event/8", "/w/performance/9/")]
+    assert server.hits["listing"] == 1
+
+
+@pytest.mark.skipif(CHROME is None, reason="needs Chrome")
+@pytest.mark.parametrize("variant", ["infinite", "virtual"])
+def test_scroll_variant_is_harvested_in_a_browser(server, variant):
+    from driver_pool import DriverPool
+
+    pool = DriverPool(size=1)
+    try:
+        parser = AfishaParser(driver_pool=pool, static_first=False, use_cache=False)
+        performances = parser.parse_performances_from_url(server.listing_url(60, variant))
+    finally:
+        pool.close()
+
+    assert parser.last_tier == "browser_clicks"
+    assert sorted(performance.detail_url for performance in performances) == sorted(
+        f"{server.base_url}/w/performance/{i}" for i in range(60))
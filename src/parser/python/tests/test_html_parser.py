@@ -0,0 +1,84 @@
+import pytest
+
+from html_parser import HtmlParser, LxmlHtmlParser
+from listing_generator import generate_listing
+from performance import Performance
+
+BAD_HREF = "http://[abc/w/performance/3"
+
+
+def block(title: str, href: str) -> str:
+    return f'<div class="_3XrzE _5fgzK"><a href="{href}"><div class="IlTNG">{title}</div></a></div>'
+
+
+@pytest.fixture
+def listing(tmp_path):
+    blocks = [block(f"T{i}", f"/w/performance/{i}/") for i in range(1, 6)]
+    blocks.insert(2, block("Bad", BAD_HREF))
+    path = tmp_path / "listing.html"
+    path.write_text("<html><body>" + "".join(blocks) + "</body></html>", encoding="utf-8")
+    return path
+
+
+def records(performances):
+    return [(performance.title, performance.detail_url) for performance in performances]
+
+
+def test_lxml_matches_bs4_on_generated_listing():
+    content = generate_listing(60, filler=2)
+
+    lxml_records = records(HtmlParser("lxml").parse_performances(content, "https://www.afisha.ru/msk/theatre/"))
+
+    assert lxml_records == records(HtmlParser("bs4").parse_performances(content, "https://www.afisha.ru/msk/theatre/"))
+    assert len(lxml_records) == 60
+    assert sum(1 for _, url in lxml_records if url) == 39
+
+
+@pytest.mark.parametrize("engine", ["lxml", "bs4"])
+def test_malformed_href_keeps_every_block(listing, engine):
+    content = listing.read_text(encoding="utf-8")
+
+    performances = HtmlParser(engine).parse_performances(content)
+
+    assert [performance.title for performance in performances] == ["T1", "T2", "Bad", "T3", "T4", "T5"]
+    assert performances[2].detail_url == BAD_HREF
+
+
+def test_malformed_href_keeps_streaming(listing):
+    performances = list(HtmlParser("lxml").iter_performances_from_file(str(listing)))
+
+    assert len(performances) == 6
+    assert performances[-1].detail_url == "/w/performance/5/"
+
+
+def test_performance_with_malformed_url_falls_back_to_raw_key():
+    performance = Performance.create("Bad", BAD_HREF, "listing.html", "https://www.afisha.ru/")
+
+    assert performance.key == BAD_HREF
+    assert performance.host is None
+    assert performance.to_dict()["detail_url"] == BAD_HREF + "/https"
+
+
+@pytest.mark.parametrize("chunk_size", [7, 4096, 1 << 16])
+def test_streaming_matches_document_parse(tmp_path, monkeypatch, chunk_size):
+    content = generate_listing(120).replace("<main>", "<main><!-- <div class=\"_3XrzE _5fgzK\">x</div> -->", 1)
+    path = tmp_path / "large.html"
+    path.write_text(content, encoding="utf-8")
+    monkeypatch.setattr(LxmlHtmlParser, "STREAM_CHUNK_SIZE", chunk_size)
+
+    streamed = records(HtmlParser("lxml").iter_performances_from_file(str(path)))
+
+    assert streamed == records(HtmlParser("lxml").parse_performances(content))
+    assert len(streamed) == 120
+
+
+def test_streaming_keeps_blocks_nested_in_blocks(tmp_path):
+    path = tmp_path / "nested.html"
+    path.write_text('<html><body><div class="_3XrzE _5fgzK"><div class="IlTNG">Outer</div>'
+                    + block("Inner", "/w/performance/2/") + "</div>" + block("Last", "/w/event/3") + "</body></html>",
+                    encoding="utf-8")
+
+    streamed = records(HtmlParser("lxml").iter_performances_from_file(str(path)))
+
+    assert streamed == records(HtmlParser("lxml").parse_performances(path.read_text(encoding="utf-8")))
+    assert [title for title, _ in streamed] == ["Outer", "Inner", "Last"]
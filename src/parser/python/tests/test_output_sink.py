@@ -0,0 +1,85 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from listing_generator import generate_listing
+from output_sink import OutputSink
+from performance import Performance
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PERFORMANCES = [
+    Performance.create("Гамлет (18+)", "https://www.afisha.ru/w/performance/1/"),
+    Performance.create("Без ссылки"),
+]
+
+
+@pytest.mark.parametrize("name", ["out.ndjson", "out.jsonl"])
+def test_ndjson_file_has_one_normalized_record_per_line(tmp_path, name):
+    path = tmp_path / name
+
+    with OutputSink.open(str(path)) as sink:
+        sink.write_many(PERFORMANCES)
+        sink.message({"type": "result"})
+        assert not path.exists()
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert lines == [
+        {"title": "Гамлет (18+)", "detail_url": "https://www.afisha.ru/w/performance/1/https",
+         "title_key": "гамлет", "title_sort_key": "гамлет"},
+        {"title": "Без ссылки", "detail_url": "", "title_key": "без ссылки", "title_sort_key": "без ссылки"},
+    ]
+    assert (sink.count, sink.detail_url_count) == (2, 1)
+
+
+def test_json_file_is_a_complete_array(tmp_path):
+    path = tmp_path / "out.json"
+
+    with OutputSink.open(str(path)) as sink:
+        sink.write_many(PERFORMANCES)
+
+    assert [record["title"] for record in json.loads(path.read_text(encoding="utf-8"))] == ["Гамлет (18+)", "Без ссылки"]
+
+
+def test_abort_leaves_no_partial_file(tmp_path):
+    path = tmp_path / "out.json"
+
+    with pytest.raises(RuntimeError):
+        with OutputSink.open(str(path)) as sink:
+            sink.write(PERFORMANCES[0])
+            raise RuntimeError("interrupted")
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_envelope_wraps_records_and_messages():
+    stream = io.StringIO()
+    sink = OutputSink(stream, "ndjson", envelope=True)
+
+    sink.write({"title": "Ревизор", "detail_url": "https://www.afisha.ru/https://www.afisha.ru/w/event/2"})
+    sink.message({"type": "result", "count": sink.count})
+
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == [
+        {"type": "performance", "performance": {"title": "Ревизор", "detail_url": "https://www.afisha.ru/w/event/2/https",
+                                                "title_key": "ревизор", "title_sort_key": "ревизор"}},
+        {"type": "result", "count": 1},
+    ]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_stdout_carries_only_protocol_lines(tmp_path, stream):
+    path = tmp_path / "listing.html"
+    path.write_text(generate_listing(5), encoding="utf-8")
+    args = [sys.executable, "main.py", str(path), "--output", "-"] + (["--stream"] if stream else [])
+
+    completed = subprocess.run(args, cwd=PACKAGE_DIR, capture_output=True, text=True, check=True,
+                               env={**os.environ, "PARSER_STATE_DIR": str(tmp_path / "state")})
+
+    messages = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert [message["type"] for message in messages] == ["performance"] * 5 + ["result"]
+    assert messages[-1]["count"] == 5
+    assert "Found 5 performances" in completed.stderr
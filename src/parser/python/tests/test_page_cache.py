@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+import page_cache
+from afisha_parser import AfishaParser
+from page_cache import PageCache
+
+RESULTS = [{"title": "Гамлет", "detail_url": "https://www.afisha.ru/w/performance/1"}]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(page_cache.time, "time", clock)
+    return clock
+
+
+def entry_bytes(cache: PageCache) -> int:
+    return sum(os.path.getsize(os.path.join(cache.entries_dir, name)) for name in os.listdir(cache.entries_dir))
+
+
+def test_fresh_entries_expire_after_ttl_until_revalidated(tmp_path, clock):
+    cache = PageCache(str(tmp_path), ttl=60)
+    cache.put("https://www.afisha.ru/msk/theatre/", "<html>1</html>", RESULTS, etag='"v1"')
+
+    assert cache.lookup_fresh("https://www.afisha.ru/msk/theatre/#top") == RESULTS
+    clock.now += 61
+    assert cache.lookup_fresh("https://www.afisha.ru/msk/theatre") is None
+
+    entry = cache.get("https://www.afisha.ru/msk/theatre/")
+    assert entry["etag"] == '"v1"'
+    assert cache.read_html(entry) == "<html>1</html>"
+    assert cache.unchanged_results("https://www.afisha.ru/msk/theatre/", entry, "<html>1</html>") == RESULTS
+    assert cache.lookup_fresh("https://www.afisha.ru/msk/theatre/") == RESULTS
+    assert cache.stats() == {"stores": 1, "hits": 2, "misses": 1, "unchanged": 1, "hit_ratio": 0.667}
+
+
+def test_least_recently_accessed_entries_are_evicted(tmp_path, clock):
+    probe = PageCache(str(tmp_path / "probe"))
+    probe.put("https://a.test/w/event/0", None, RESULTS)
+    cache = PageCache(str(tmp_path / "cache"), ttl=3600, max_bytes=int(entry_bytes(probe) * 2.5))
+
+    for name in ("a", "b"):
+        cache.put(f"https://a.test/w/event/{name}", None, RESULTS)
+        clock.now += 1
+    assert cache.lookup_fresh("https://a.test/w/event/a") == RESULTS
+    clock.now += 1
+    cache.put("https://a.test/w/event/c", None, RESULTS)
+
+    assert cache.get("https://a.test/w/event/b") is None
+    assert cache.get("https://a.test/w/event/a") is not None
+    assert cache.get("https://a.test/w/event/c") is not None
+    assert cache.metrics["evictions"] == 1
+
+
+def test_shared_blobs_are_kept_while_referenced(tmp_path, clock):
+    cache = PageCache(str(tmp_path), max_bytes=10 ** 9)
+    first = cache.put("https://a.test/1", "<html>same</html>", RESULTS)
+    clock.now += 1
+    cache.put("https://a.test/2", "<html>same</html>", RESULTS)
+
+    assert len(os.listdir(cache.blobs_dir)) == 1
+    cache.max_bytes = entry_bytes(cache) + os.path.getsize(os.path.join(cache.blobs_dir, os.listdir(cache.blobs_dir)[0]))
+    clock.now += 1
+    cache.put("https://a.test/3", None, RESULTS)
+
+    assert cache.get("https://a.test/1") is None
+    assert cache.read_html(cache.get("https://a.test/2")) == "<html>same</html>"
+    assert first["content_hash"] == cache.get("https://a.test/2")["content_hash"]
+    assert cache.metrics["evictions"] == 1
+
+
+def test_disabled_cache_and_health_create_no_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("PARSER_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(PageCache, "_shared", None)
+
+    assert AfishaParser(use_cache=False).page_cache is None
+    assert PageCache.shared_stats() == {}
+    assert not (tmp_path / "cache").exists()
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from performance import Performance
+
+
+def test_equality_and_hash_follow_the_normalized_key():
+    first = Performance.create("Гамлет", "https://WWW.afisha.ru/w/performance/1/?b=2&a=1#tickets", "a.html")
+    second = Performance.create("Hamlet", "https://www.afisha.ru/w/performance/1?a=1&b=2", "b.html")
+
+    assert first == second
+    assert hash(first) == hash(second)
+    assert Performance.unique([first, second]) == [first]
+    assert Performance.unique([first, second])[0].title == "Гамлет"
+
+
+def test_records_without_url_are_keyed_by_title():
+    assert Performance.create(" Гамлет ") == Performance.create("гамлет")
+    assert Performance.create("Гамлет") != Performance.create("Гамлет", "https://www.afisha.ru/w/performance/1")
+    assert Performance.create("Гамлет").__eq__({"title": "Гамлет"}) is NotImplemented
+
+
+def test_create_normalizes_and_interns_shared_fields():
+    performances = [Performance.create(f"Show {i}", f"/w/event/{i}/https", "https://www.afisha.ru/msk/" + "theatre/",
+                                       "https://www.afisha.ru/msk/theatre/") for i in range(2)]
+
+    assert performances[0].detail_url == "https://www.afisha.ru/w/event/0"
+    assert performances[0].source is performances[1].source
+    assert performances[0].host is performances[1].host == "www.afisha.ru"
+    with pytest.raises(AttributeError):
+        performances[0].__dict__
+
+
+def test_dict_round_trip_keeps_extra_fields():
+    record = {"title": "Ревизор", "detail_url": "https://www.afisha.ru/w/event/2", "title_key": "ревизор",
+              "venue": "Малый театр"}
+
+    performance = Performance.from_dict(record, "listing.html")
+
+    assert performance.extra == (("venue", "Малый театр"),)
+    assert performance.to_dict() == {"title": "Ревизор", "detail_url": "https://www.afisha.ru/w/event/2/https",
+                                     "venue": "Малый театр"}
+    assert json.loads(performance.to_ndjson()) == performance.to_dict()
+    assert Performance.from_dict(performance) is performance
+
+
+def test_with_details_merges_without_mutating():
+    performance = Performance.from_dict({"title": "Ревизор", "venue": "Старая сцена", "price_min": 500})
+
+    enriched = performance.with_details({"venue": "Малый театр", "currency": "RUB"})
+
+    assert dict(enriched.extra) == {"venue": "Малый театр", "price_min": 500, "currency": "RUB"}
+    assert dict(performance.extra)["venue"] == "Старая сцена"
+    assert performance.with_details({}) is performance
+    assert enriched == performance
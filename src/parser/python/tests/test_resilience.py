@@ -0,0 +1,110 @@
+import time
+from contextlib import contextmanager
+
+import pytest
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+from performance import Performance
+from resilience import CircuitBreaker, CircuitOpenError, DriverFailure, DriverHungError, RetryPolicy
+from web_driver_manager import WebDriverManager
+
+URL = "https://www.afisha.ru/msk/theatre/"
+
+
+@pytest.mark.parametrize("error, kind", [
+    (StaleElementReferenceException("stale"), DriverFailure.STALE_ELEMENT),
+    (TimeoutException("slow"), DriverFailure.TIMEOUT),
+    (InvalidSessionIdException("gone"), DriverFailure.SESSION_CRASHED),
+    (DriverHungError("killed"), DriverFailure.SESSION_CRASHED),
+    (WebDriverException("unknown error: net::ERR_NAME_NOT_RESOLVED"), DriverFailure.NAVIGATION_BLOCKED),
+    (WebDriverException("chrome not reachable"), DriverFailure.SESSION_CRASHED),
+    (WebDriverException("script timeout"), DriverFailure.TIMEOUT),
+    (ValueError("bad selector"), DriverFailure.OTHER),
+])
+def test_failures_are_classified(error, kind):
+    assert DriverFailure.classify(error) == kind
+    assert DriverFailure.is_fatal(error) == (kind == DriverFailure.SESSION_CRASHED)
+
+
+def failing(errors, result="ok"):
+    calls = []
+
+    def operation():
+        calls.append(len(calls))
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return operation, calls
+
+
+def test_transient_failures_are_retried():
+    policy = RetryPolicy(attempts=3, base_delay=0, breaker=CircuitBreaker(failure_threshold=5))
+    operation, calls = failing([StaleElementReferenceException("stale"), TimeoutException("slow")])
+
+    assert policy.run(operation, "click", URL) == "ok"
+    assert len(calls) == 3
+
+
+def test_crashes_are_raised_without_retry():
+    policy = RetryPolicy(attempts=3, base_delay=0, breaker=CircuitBreaker(failure_threshold=5))
+    operation, calls = failing([InvalidSessionIdException("gone")])
+
+    with pytest.raises(InvalidSessionIdException):
+        policy.run(operation, "navigation", URL)
+    assert len(calls) == 1
+
+
+def test_breaker_opens_per_host_and_half_opens_after_reset():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    policy = RetryPolicy(attempts=1, base_delay=0, breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(TimeoutException):
+            policy.run(failing([TimeoutException("slow")])[0], "navigation", URL)
+
+    assert breaker.state(URL) == "open"
+    with pytest.raises(CircuitOpenError):
+        policy.run(lambda: "ok", "navigation", URL)
+    assert policy.run(lambda: "ok", "navigation", "https://other.test/") == "ok"
+
+    time.sleep(0.06)
+    assert policy.run(lambda: "ok", "navigation", URL) == "ok"
+    assert breaker.state(URL) == "closed"
+
+
+class FakePool:
+    render_profile = "lite"
+
+    def __init__(self):
+        self.leases = 0
+
+    @contextmanager
+    def lease(self):
+        self.leases += 1
+        yield object()
+
+
+def test_session_retry_emits_each_record_once(monkeypatch):
+    manager = WebDriverManager(driver_pool=FakePool())
+    records = [Performance.create(f"Show {i}", f"https://www.afisha.ru/w/event/{i}") for i in range(3)]
+
+    def collect(driver, url, cached_entry, on_record):
+        crashed = manager.driver_pool.leases == 1
+        for record in records[:2] if crashed else records:
+            on_record(record)
+        if crashed:
+            raise InvalidSessionIdException("session deleted")
+        return records
+
+    monkeypatch.setattr(manager, "_collect_events", collect)
+    emitted = []
+
+    assert manager.get_events_with_details(URL, on_record=emitted.append) == records
+    assert emitted == records
+    assert manager.driver_pool.leases == 2
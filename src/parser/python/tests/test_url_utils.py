@@ -0,0 +1,93 @@
+import re
+import time
+
+import pytest
+
+from url_utils import UrlUtils
+
+BASE_URL = "https://www.afisha.ru/msk/theatre/"
+SIZE = 25000
+GROWTH = 4
+TIME_SLACK = 0.01
+
+REPRESENTATIVE_URLS = [
+    "https://www.afisha.ru/https://www.afisha.ru/w/performance/42/https",
+    "http://www.afisha.ru/http://www.afisha.ru/w/event/9",
+    "https://www.afisha.ru/w/creations/performance/2487/f9f12827-da00-4200-80aa-b755ed5e3e51/https",
+    "https://www.afisha.ru/w/creations/42/https/",
+    "https://www.afisha.ru/https",
+    "https://www.afisha.ru/",
+    "/w/performance/42/",
+    "/w/performance/7/https",
+    "/w/event/1/http/",
+    "/w/event/42?utm_source=listing&utm_medium=card",
+    "/w/event/1?date=2026-11-01#tickets",
+    " https://www.afisha.ru/w/event/5 ",
+    "javascript:void(0)",
+    "#",
+    "",
+]
+
+
+def legacy_clean_url(url: str) -> str:
+    url = re.sub(r'https?://.*?(https?://)', r'\1', url)
+    url = re.sub(r'(https?://[^/]+).*?\1', r'\1', url)
+    url = re.sub(r'/?https?/?$', '', url)
+    return url.strip()
+
+
+def pathological_inputs(size: int):
+    return {
+        "no_slash_host": "https://" + "a" * size,
+        "repeated_host": "https://" + "a" * size + "https://" + "a" * (size - 1),
+        "query_of_schemes": "https://www.afisha.ru/w/event/1?" + "&".join(f"r{i}=http:" for i in range(size // 6)),
+        "long_query": "https://www.afisha.ru/w/event/1?" + "&".join(f"utm_{i}=listing" for i in range(size // 14)),
+        "repeated_separators": "https://www.afisha.ru/w/event/1" + "?&" * (size // 2),
+        "repeated_question_marks": "/w/performance/1" + "?" * size + "https",
+        "suffix_noise": "/w/performance/1" + "/http" * (size // 5),
+    }
+
+
+@pytest.mark.parametrize("url", REPRESENTATIVE_URLS)
+def test_clean_url_matches_legacy_regexes(url):
+    assert UrlUtils.clean_url(url) == legacy_clean_url(url)
+
+
+def test_first_performance_url_skips_non_detail_links():
+    urls = ["#", "javascript:void(0)", "/w/performance/42/https", "/w/event/1"]
+
+    assert UrlUtils.first_performance_url(urls, BASE_URL) == "https://www.afisha.ru/w/performance/42"
+
+
+def test_normalize_many_matches_single_calls():
+    urls = REPRESENTATIVE_URLS + [None]
+
+    expected = [UrlUtils.normalize_url(UrlUtils.clean_url(url), BASE_URL) if url else "" for url in urls]
+    assert UrlUtils.normalize_many(urls, BASE_URL) == expected
+
+
+@pytest.mark.parametrize("url", ["http://[abc/w/event/1", "https://www.afisha.ru/https://[::1/w/performance/2/https"])
+def test_malformed_netloc_is_returned_unchanged(url):
+    assert UrlUtils.clean_url(" " + url + " ") == url
+    assert UrlUtils.cache_key(url) == url
+    assert UrlUtils.normalize_url(url, BASE_URL) == url
+    assert UrlUtils.normalize_url("/w/event/1", "http://[abc/") == "/w/event/1"
+    assert UrlUtils.normalize_many([url], BASE_URL) == [url]
+
+
+def best_time(url: str) -> float:
+    timings = []
+    for _ in range(3):
+        started = time.perf_counter()
+        UrlUtils.clean_url(url + " ")
+        UrlUtils.cache_key(url + "  ")
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+@pytest.mark.parametrize("name", sorted(pathological_inputs(SIZE)))
+def test_clean_url_is_linear_on_pathological_input(name):
+    small = best_time(pathological_inputs(SIZE)[name])
+    large = best_time(pathological_inputs(SIZE * GROWTH)[name])
+
+    assert large < small * GROWTH * 2 + TIME_SLACK, f"{name}: {small:.4f}s -> {large:.4f}s"
@@ -0,0 +1,31 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict
+
+AGE_RATING_PATTERN = re.compile(r'\(?(?<!\w)(?:0|6|12|16|18)\s*\+(?!\w)\)?')
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]|_')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=8192)
+def _normalize(title: str) -> str:
+    title = unicodedata.normalize('NFKC', title).lower().replace('ё', 'е')
+    title = AGE_RATING_PATTERN.sub(' ', title)
+    title = PUNCTUATION_PATTERN.sub(' ', title)
+    return WHITESPACE_PATTERN.sub(' ', title).strip()
+
+
+class TitleNormalizer:
+
+    @staticmethod
+    def normalize(title: str) -> str:
+        return _normalize(title or "")
+
+    @staticmethod
+    def sort_key(title: str) -> str:
+        return " ".join(sorted(set(_normalize(title or "").split())))
+
+    @staticmethod
+    def keys(title: str) -> Dict[str, str]:
+        return {"title_key": TitleNormalizer.normalize(title), "title_sort_key": TitleNormalizer.sort_key(title)}
@@ -1,5 +1,68 @@
 import re
-from urllib.parse import urljoin
+from functools import lru_cache
+from typing import Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+VALID_URL_PATTERN = re.compile(r'https?://[^\s/$.?#].[^\s]*')
+PERFORMANCE_KEYWORDS = ('performance', 'event', 'creations')
+
+
+@lru_cache(maxsize=8192)
+def _clean_url(url: str) -> str:
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+
+    location = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+    embedded = max(location.rfind("http://"), location.rfind("https://"))
+    if embedded > 0:
+        try:
+            parts = urlsplit(location[embedded:])._replace(query=parts.query, fragment=parts.fragment)
+        except ValueError:
+            return url
+
+    path = _strip_https_suffix(parts.path)
+    if embedded <= 0 and path == parts.path:
+        return url
+
+    return urlunsplit(parts._replace(path=path)).strip()
+
+
+def _strip_https_suffix(url: str) -> str:
+    stripped = url[:-1] if url.endswith('/') else url
+
+    if stripped.endswith('https'):
+        stripped = stripped[:-5]
+    elif stripped.endswith('http'):
+        stripped = stripped[:-4]
+    else:
+        return url
+
+    return stripped[:-1] if stripped.endswith('/') else stripped
+
+
+@lru_cache(maxsize=8192)
+def _normalize_url(url: str, base_url: Optional[str]) -> str:
+    if url.startswith('http'):
+        return url
+    try:
+        return urljoin(base_url, url)
+    except ValueError:
+        return url
+
+
+@lru_cache(maxsize=4096)
+def _cache_key(url: str) -> str:
+    clean = _clean_url(url)
+    try:
+        parts = urlsplit(clean)
+    except ValueError:
+        return clean
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
 
 
 class UrlUtils:
@@ -9,21 +72,15 @@ class UrlUtils:
         if not url:
             return ""
 
-        url = re.sub(r'https?://.*?(https?://)', r'\1', url)
-
-        url = re.sub(r'(https?://[^/]+).*?\1', r'\1', url)
-
-        url = re.sub(r'/?https?/?$', '', url)
-
-        return url.strip()
+        return _clean_url(url)
 
     @staticmethod
     def is_valid_performance_url(url: str) -> bool:
         if not url:
             return False
 
-        keywords = ['performance', 'event', 'creations']
-        if not any(keyword in url.lower() for keyword in keywords):
+        lowered = url.lower()
+        if not any(keyword in lowered for keyword in PERFORMANCE_KEYWORDS):
             return False
 
         if url.startswith('#') or url.startswith('javascript:'):
@@ -36,12 +93,27 @@ class UrlUtils:
         if not url:
             return ""
 
-        if url.startswith('/'):
-            return urljoin(base_url, url)
-        elif url.startswith('http'):
-            return url
-        else:
-            return urljoin(base_url, url)
+        return _normalize_url(url, base_url)
+
+    @staticmethod
+    def normalize_many(urls: Iterable[Optional[str]], base_url: str) -> List[str]:
+        return [_normalize_url(_clean_url(url), base_url) if url else "" for url in urls]
+
+    @staticmethod
+    def first_performance_url(urls: Iterable[Optional[str]], base_url: str) -> Optional[str]:
+        for url in urls:
+            if url:
+                clean = _clean_url(url)
+                if UrlUtils.is_valid_performance_url(clean):
+                    return _normalize_url(clean, base_url)
+        return None
+
+    @staticmethod
+    def cache_key(url: str) -> str:
+        if not url:
+            return ""
+
+        return _cache_key(url)
 
     @staticmethod
     def add_https_suffix(url: str) -> str:
@@ -57,5 +129,12 @@ class UrlUtils:
         if not url:
             return False
 
-        url_pattern = r'^https?://[^\s/$.?#].[^\s]*$'
-        return re.match(url_pattern, url) is not None
+        return VALID_URL_PATTERN.fullmatch(url) is not None
+
+    @staticmethod
+    def cache_info() -> dict:
+        return {
+            "clean_url": _clean_url.cache_info()._asdict(),
+            "normalize_url": _normalize_url.cache_info()._asdict(),
+            "cache_key": _cache_key.cache_info()._asdict(),
+        }
@@ -1,140 +1,248 @@
+import hashlib
+import json
+import os
+import threading
 import time
-from typing import Optional, List, Dict
+from typing import Callable, Optional, List, Dict
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
 
 from chrome_config import ChromeConfig
+from click_harvester import ClickHarvester
+from driver_pool import DriverPool
 from event_parser import EventParser
 from link_finder import LinkFinder
+from metrics import Metrics
+from page_waiter import PageWaiter
+from performance import Performance
+from resilience import CircuitOpenError, DriverFailure, RetryPolicy
+from scroll_harvester import ScrollHarvester
 from url_utils import UrlUtils
 from webdriver_utils import WebDriverUtils
 
 
 class WebDriverManager:
 
-    def __init__(self):
-        self.chrome_options = ChromeConfig.get_chrome_options()
-        self.chromedriver_path = ChromeConfig.get_chromedriver_path()
+    def __init__(self, harvest_mode: bool = True, driver_pool: Optional[DriverPool] = None,
+                 on_progress: Optional[Callable[[Dict], None]] = None, cancel_event: Optional[threading.Event] = None):
+        self.harvest_mode = harvest_mode
+        self.on_progress = on_progress
+        self.driver_pool = driver_pool or DriverPool.shared()
         self.url_utils = UrlUtils()
         self.link_finder = LinkFinder()
         self.event_parser = EventParser()
         self.webdriver_utils = WebDriverUtils()
+        self.click_harvester = ClickHarvester()
+        self.scroll_harvester = ScrollHarvester()
+        self.scroll_harvest = os.environ.get('PARSER_SCROLL_HARVEST', '1') != '0'
+        self.cancel_event = cancel_event
+        self.page_waiter = PageWaiter(cancel_event=cancel_event)
+        self.retry_policy = RetryPolicy(cancel_event=cancel_event)
+        self.session_attempts = int(os.environ.get('PARSER_SESSION_ATTEMPTS', '2'))
+        self.metrics = Metrics.shared()
+        self.last_page_source: Optional[str] = None
+        self.last_fingerprint: Optional[str] = None
+        self.last_unchanged = False
+        self.last_unresolved: List[Dict] = []
 
     def get_page_content(self, url: str) -> Optional[str]:
-        driver = None
-        try:
-            driver = self._create_driver()
-            driver.get(url)
-            time.sleep(5)
+        return self._with_session("get_page_content", url, lambda driver: self._page_source(driver, url), None)
+
+    def _page_source(self, driver, url: str) -> str:
+        self._load_page(driver, url)
+
+        html_content = driver.page_source
+        return html_content
+
+    def get_events_with_details(self, url: str, cached_entry: Optional[Dict] = None,
+                                on_record: Optional[Callable[[Performance], None]] = None) -> List[Performance]:
+        self.last_page_source = None
+        self.last_fingerprint = None
+        self.last_unchanged = False
+        self.last_unresolved = []
+        record = self._emit_once(on_record) if on_record else None
+        return self._with_session("get_events_with_details", url,
+                                  lambda driver: self._collect_events(driver, url, cached_entry, record), [])
+
+    @staticmethod
+    def _emit_once(on_record: Callable[[Performance], None]) -> Callable[[Performance], None]:
+        emitted = set()
+
+        def record(performance: Performance):
+            if performance.key in emitted:
+                return
+            emitted.add(performance.key)
+            on_record(performance)
+
+        return record
+
+    def resolve_block(self, url: str, block_index: int) -> Optional[str]:
+        return self._with_session("resolve_block", url,
+                                  lambda driver: self._try_click_for_url(driver, block_index, url), None)
+
+    def _with_session(self, name: str, url: str, work: Callable, default):
+        for attempt in range(self.session_attempts):
+            try:
+                with self.driver_pool.lease() as driver:
+                    return work(driver)
+
+            except CircuitOpenError as e:
+                print(f"Skipping {name}: {e}")
+                return default
+            except Exception as e:
+                if DriverFailure.is_fatal(e) and attempt + 1 < self.session_attempts and not self.page_waiter.cancelled:
+                    self.metrics.inc("session_restarts", operation=name)
+                    print(f"Browser session lost in {name}, retrying with a fresh one: {e}")
+                    continue
+
+                self.metrics.inc("errors", component="web_driver_manager")
+                print(f"Error in {name}: {e}")
+                return default
+
+        return default
+
+    def _collect_events(self, driver, url: str, cached_entry: Optional[Dict] = None,
+                        on_record: Optional[Callable[[Performance], None]] = None) -> List[Performance]:
+        self._load_page(driver, url, scroll=not self.scroll_harvest)
+
+        with self.metrics.timer("phase_seconds", phase="snapshot"):
+            if self.scroll_harvest:
+                snapshots = self.scroll_harvester.harvest(
+                    driver, self.page_waiter, click_harvester=self.click_harvester if self.harvest_mode else None)
+            else:
+                snapshots = self.link_finder.snapshot_blocks(driver)
 
-            self.webdriver_utils.wait_for_content(driver)
-            time.sleep(8)
-            self.webdriver_utils.scroll_page(driver)
+        self._report_progress("page_loaded", url=url, blocks=len(snapshots))
+        self.metrics.inc("selector_lookups", selector="block", result="hit" if snapshots else "miss")
 
-            html_content = driver.page_source
-            return html_content
+        if not snapshots:
+            return []
 
-        except Exception:
-            return None
-        finally:
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
-
-    def get_events_with_details(self, url: str) -> List[Dict[str, str]]:
-        driver = None
-        try:
-            driver = self._create_driver()
-            driver.get(url)
-            time.sleep(5)
+        self.last_fingerprint = hashlib.sha256(
+            json.dumps(snapshots, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+        if cached_entry and cached_entry.get('fingerprint') == self.last_fingerprint:
+            self.last_unchanged = True
+            return []
 
-            self.webdriver_utils.wait_for_content(driver)
-            time.sleep(8)
-            self.webdriver_utils.scroll_page(driver)
+        self.last_page_source = driver.page_source
 
-            event_blocks = driver.find_elements(By.CSS_SELECTOR, "div._3XrzE._5fgzK")
+        events_data = [self.event_parser.extract_event_data_from_snapshot(snapshot) for snapshot in snapshots]
+        for snapshot in snapshots:
+            self.metrics.inc("selector_lookups", selector="title", result="hit" if snapshot.get('title') else "miss")
 
-            if not event_blocks:
-                return []
+        detail_urls = []
+        if self.harvest_mode and self.scroll_harvest:
+            detail_urls = [self.scroll_harvester.clicked_url(snapshot) for snapshot in snapshots]
+        elif self.harvest_mode:
+            with self.metrics.timer("phase_seconds", phase="harvest"):
+                detail_urls = self.click_harvester.harvest(driver)
 
-            events_data = []
-            successful_clicks = 0
+        successful_clicks = 0
+        snapshot_urls = 0
 
-            for i, block in enumerate(event_blocks):
-                event_data = self.event_parser.extract_event_data_from_block(block)
+        for i, (event_data, snapshot) in enumerate(zip(events_data, snapshots)):
+            if self.page_waiter.cancelled:
+                break
 
+            started = time.perf_counter()
+            if self.harvest_mode:
+                detail_url = detail_urls[i] if i < len(detail_urls) else None
+            else:
                 detail_url = self._try_click_for_url(driver, i, url)
 
+            if detail_url:
+                successful_clicks += 1
+                self.metrics.inc("link_strategy", strategy="click")
+            else:
+                detail_url = self.link_finder.find_detail_url_in_snapshot(snapshot, url)
                 if detail_url:
-                    detail_url = self.url_utils.add_https_suffix(detail_url)
-                    event_data['detail_url'] = detail_url
-                    successful_clicks += 1
+                    snapshot_urls += 1
 
-                events_data.append(event_data)
-
-            if successful_clicks > 0:
-                print(f"Successfully found {successful_clicks} detail URLs via clicks")
-                return events_data
+            if detail_url:
+                events_data[i] = Performance.create(event_data.title, detail_url, url)
+                if on_record:
+                    on_record(events_data[i])
             else:
-                return []
+                self.last_unresolved.append({"index": i, "title": event_data.title})
 
-        except Exception as e:
-            print(f"Error in get_events_with_details: {e}")
-            return []
-        finally:
-            if driver:
-                try:
-                    driver.quit()
-                except:
-                    pass
-
-    def _create_driver(self):
-        if self.chromedriver_path:
-            service = Service(self.chromedriver_path)
-            return webdriver.Chrome(service=service, options=self.chrome_options)
+            self.metrics.observe("block_extraction_seconds", time.perf_counter() - started)
+
+        self._report_progress("details_collected", url=url, blocks=len(events_data),
+                              resolved=successful_clicks + snapshot_urls)
+
+        if successful_clicks + snapshot_urls > 0:
+            print(f"Successfully found {successful_clicks} detail URLs via clicks "
+                  f"and {snapshot_urls} via block links")
+            return events_data
         else:
-            return webdriver.Chrome(options=self.chrome_options)
+            return []
+
+    def _report_progress(self, stage: str, **details):
+        if self.on_progress:
+            self.on_progress({"stage": stage, **details})
+
+    def _load_page(self, driver, url: str, scroll: bool = True):
+        self.page_waiter.start_navigation(driver)
+        with self.metrics.timer("phase_seconds", phase="navigation"):
+            self.retry_policy.run(lambda: driver.get(url), "navigation", url)
+        self.driver_pool.page_loaded(driver)
+        with self.metrics.timer("phase_seconds", phase="wait"):
+            self.page_waiter.wait_for_page(driver)
+        if scroll:
+            with self.metrics.timer("phase_seconds", phase="scroll"):
+                self.webdriver_utils.scroll_page(driver, self.page_waiter)
+        self._report_network(driver, url)
+
+    def _report_network(self, driver, url: str):
+        monitor = self.page_waiter.network_monitor
+        monitor.poll(driver)
+        if not monitor.available:
+            return
+
+        stats = monitor.page_stats()
+        self.metrics.inc("network_requests", stats["requests"])
+        self.metrics.inc("network_bytes", stats["bytes_loaded"])
+        for resource_type, count in stats["blocked_by_type"].items():
+            self.metrics.inc("requests_blocked", count, type=resource_type)
+        self._report_progress("network", url=url, profile=self.driver_pool.render_profile, **stats)
 
     def _try_click_for_url(self, driver, block_index: int, original_url: str) -> Optional[str]:
         try:
             driver.execute_script("window.open('');")
             new_tab = driver.window_handles[-1]
             driver.switch_to.window(new_tab)
+            ChromeConfig.apply_render_profile(driver, self.driver_pool.render_profile)
 
-            driver.get(original_url)
-            time.sleep(3)
-
-            blocks = driver.find_elements(By.CSS_SELECTOR, "div._3XrzE._5fgzK")
-
-            if block_index < len(blocks):
-                block = blocks[block_index]
-                current_url = driver.current_url
-
-                try:
-                    driver.execute_script("arguments[0].scrollIntoView(true);", block)
-                    time.sleep(1)
-                    ActionChains(driver).move_to_element(block).click().perform()
-                    time.sleep(5)
-
-                    new_url = driver.current_url
-                    if new_url != current_url:
-                        return self.url_utils.clean_url(new_url)
+            self.page_waiter.start_navigation(driver)
+            self.retry_policy.run(lambda: driver.get(original_url), "navigation", original_url)
+            self.driver_pool.page_loaded(driver)
+            self.page_waiter.wait_for_document_ready(driver)
+            self.page_waiter.wait_for_content(driver)
 
-                except Exception:
-                    pass
+            return self.retry_policy.run(lambda: self._click_block(driver, block_index), "click")
 
-            return None
-
-        except Exception:
+        except Exception as e:
+            if DriverFailure.is_fatal(e):
+                raise
             return None
         finally:
             try:
                 driver.close()
                 driver.switch_to.window(driver.window_handles[0])
-            except:
+            except Exception:
                 pass
+
+    def _click_block(self, driver, block_index: int) -> Optional[str]:
+        blocks = driver.find_elements(By.CSS_SELECTOR, "div._3XrzE._5fgzK")
+        if block_index >= len(blocks):
+            return None
+
+        block = blocks[block_index]
+        current_url = driver.current_url
+        driver.execute_script("arguments[0].scrollIntoView(true);", block)
+        ActionChains(driver).move_to_element(block).click().perform()
+
+        if self.page_waiter.wait_for_url_change(driver, current_url):
+            return self.url_utils.clean_url(driver.current_url)
+        return None
@@ -4,31 +4,39 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from resilience import DriverFailure
+
 
 class WebDriverUtils:
+    CONTENT_SELECTORS = [
+        "div._3XrzE._5fgzK",
+        "._3ErvA",
+        "div[class*='performance']",
+    ]
 
     @staticmethod
-    def wait_for_content(driver):
-        selectors_to_try = [
-            "div._3XrzE._5fgzK",
-            "._3ErvA",
-            "div[class*='performance']",
-        ]
-
-        for selector in selectors_to_try:
-            try:
-                wait = WebDriverWait(driver, 10)
-                if selector.startswith(".") or selector.startswith("#"):
-                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                else:
-                    wait.until(EC.presence_of_element_located((By.CLASS_NAME, selector)))
-                break
-            except:
-                continue
+    def wait_for_content(driver, timeout: float = 10) -> bool:
+        selector = ", ".join(WebDriverUtils.CONTENT_SELECTORS)
+        try:
+            WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+            return True
+        except Exception as e:
+            if DriverFailure.is_fatal(e):
+                raise
+            return False
 
     @staticmethod
-    def scroll_page(driver):
+    def scroll_page(driver, page_waiter=None):
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(2)
+        if page_waiter:
+            if page_waiter.content_found is not False:
+                page_waiter.wait_for_stable_block_count(driver)
+            page_waiter.wait_for_network_idle(driver)
+        else:
+            time.sleep(2)
+
         driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(2)
+        if page_waiter:
+            page_waiter.wait_for_dom_quiet(driver)
+        else:
+            time.sleep(2)
@@ -1,9 +1,10 @@
 import { Injectable, Logger } from '@nestjs/common'
-import * as path from 'path'
-import * as fs from 'fs'
-import { ParsedPerformance } from '../types/parsed-performance.interface'
+import { Prisma } from '@prisma/client'
 import { PythonExecutorService } from './python-executor.service'
 import { PrismaService } from '../../prisma/prisma.service'
+import { PARSER_MATCH_BATCH_SIZE, PARSER_MATCH_THRESHOLD } from '../constants'
+import { ParsedPerformance } from '../types'
+import { ShowMatcher } from '../utils'
 
 @Injectable()
 export class ParserService {
@@ -18,71 +19,24 @@ export class ParserService {
     try {
       this.logger.log(`Starting info parsing with URL: ${url || 'default'}`)
 
-      await this.pythonExecutorService.executePythonParser(url)
+      const matcherLoading = this.loadShowMatcher()
+      matcherLoading.catch(() => undefined)
 
-      const outputPath = path.join(process.cwd(), 'performances.json')
+      const performances = await this.pythonExecutorService.executePythonParser(url)
+      const matcher = await matcherLoading
 
-      if (!fs.existsSync(outputPath)) {
-        this.logger.log('No output file found, displaying Python output only')
-        return {
-          message: 'Parsing completed. Check console for Python output.',
-          count: 0,
-          updated: 0,
-        }
-      }
-
-      const fileContent = fs.readFileSync(outputPath, 'utf-8')
-      const performances: ParsedPerformance[] = JSON.parse(fileContent)
+      const detailUrls = this.matchPerformances(performances, matcher)
+      const updatedCount = await this.updateDetailUrls(detailUrls)
 
       this.logger.log(`=== PARSED PERFORMANCES INFO ===`)
       this.logger.log(`Total performances found: ${performances.length}`)
       this.logger.log(`================================`)
 
-      let updatedCount = 0
-
-      for (const [index, perf] of performances.entries()) {
-        this.logger.log(`\n--- Performance ${index + 1} ---`)
-        this.logger.log(`Title: ${perf.title}`)
-        this.logger.log(`Detail URL: ${perf.detail_url || 'N/A'}`)
-
-        if (perf.title && perf.detail_url) {
-          try {
-            const matchingShow = await this.prisma.show.findFirst({
-              where: {
-                name: {
-                  equals: perf.title,
-                  mode: 'insensitive',
-                },
-              },
-            })
-
-            if (matchingShow) {
-              await this.prisma.show.update({
-                where: { id: matchingShow.id },
-                data: { detailed_url: perf.detail_url },
-              })
-
-              updatedCount++
-              this.logger.log(`✓ Updated detailed_url for show: "${perf.title}"`)
-            } else {
-              this.logger.log(`✗ No matching show found for: "${perf.title}"`)
-            }
-          } catch (error) {
-            this.logger.error(`Error updating show "${perf.title}":`, error.message)
-          }
-        } else {
-          this.logger.log(`⚠ Missing title or detail_url for performance ${index + 1}`)
-        }
-
-        this.logger.log(`------------------------`)
-      }
-
       this.logger.log(`\n=== PARSING COMPLETED ===`)
       this.logger.log(`Total performances processed: ${performances.length}`)
+      this.logger.log(`Shows matched: ${detailUrls.size}`)
       this.logger.log(`Shows updated with detailed_url: ${updatedCount}`)
 
-      fs.unlinkSync(outputPath)
-
       return {
         message: `Parsing completed. Found ${performances.length} performances, updated ${updatedCount} shows. Check console for details.`,
         count: performances.length,
@@ -97,4 +51,72 @@ export class ParserService {
       }
     }
   }
+
+  private async loadShowMatcher(): Promise<ShowMatcher> {
+    const shows = await this.prisma.show.findMany({
+      where: { name: { not: null } },
+      select: { id: true, name: true },
+    })
+
+    const matcher = new ShowMatcher(shows, PARSER_MATCH_THRESHOLD)
+    this.logger.log(`Loaded ${shows.length} shows into the title index (${matcher.size} distinct titles)`)
+    return matcher
+  }
+
+  private matchPerformances(performances: ParsedPerformance[], matcher: ShowMatcher): Map<string, string> {
+    const detailUrls = new Map<string, string>()
+    const methods: Record<string, number> = { exact: 0, tokens: 0, fuzzy: 0, unmatched: 0, skipped: 0 }
+
+    for (const perf of performances) {
+      if (!perf.title || !perf.detail_url) {
+        methods.skipped++
+        this.logger.log(`⚠ Missing title or detail_url for performance "${perf.title ?? ''}"`)
+        continue
+      }
+
+      const match = matcher.match(perf.title, perf.title_key, perf.title_sort_key)
+      if (!match) {
+        methods.unmatched++
+        this.logger.log(`✗ No matching show found for: "${perf.title}"`)
+        continue
+      }
+
+      methods[match.method]++
+      if (match.method === 'fuzzy') {
+        this.logger.log(`≈ Fuzzy match for "${perf.title}" (score ${match.score.toFixed(2)})`)
+      }
+
+      for (const showId of match.showIds) {
+        if (!detailUrls.has(showId)) {
+          detailUrls.set(showId, perf.detail_url)
+        }
+      }
+    }
+
+    this.logger.log(
+      `Title matching: ${methods.exact} exact, ${methods.tokens} by tokens, ${methods.fuzzy} fuzzy, ` +
+        `${methods.unmatched} unmatched, ${methods.skipped} skipped`,
+    )
+    return detailUrls
+  }
+
+  private async updateDetailUrls(detailUrls: Map<string, string>): Promise<number> {
+    const rows = Array.from(detailUrls)
+    let updated = 0
+
+    for (let start = 0; start < rows.length; start += PARSER_MATCH_BATCH_SIZE) {
+      const values = rows
+        .slice(start, start + PARSER_MATCH_BATCH_SIZE)
+        .map(([id, detailUrl]) => Prisma.sql`(${id}::uuid, ${detailUrl})`)
+
+      updated += await this.prisma.$executeRaw`
+        UPDATE "shows" AS s
+        SET "detailed_url" = v.detailed_url, "updatedAt" = NOW()
+        FROM (VALUES ${Prisma.join(values)}) AS v(id, detailed_url)
+        WHERE s.id = v.id AND s.detailed_url IS DISTINCT FROM v.detailed_url
+      `
+    }
+
+    return updated
+  }
 }
@@ -1,38 +1,175 @@
-import { Injectable, Logger } from '@nestjs/common'
-import { exec } from 'child_process'
-import { promisify } from 'util'
-import * as path from 'path'
-
-const execAsync = promisify(exec)
+import { Injectable, Logger, OnModuleDestroy, OnModuleInit } from '@nestjs/common'
+import { ChildProcess, spawn } from 'child_process'
+import * as fs from 'fs'
+import axios from 'axios'
+import { Readable } from 'stream'
+import {
+  PARSER_DAEMON_AUTOSTART,
+  PARSER_DAEMON_SOCKET,
+  PARSER_DAEMON_URL,
+  PARSER_ENRICH,
+  PARSER_SCRIPT_PATH,
+  PARSER_TIMEOUT_MS,
+} from '../constants'
+import { ParsedPerformance, ParserMessage } from '../types'
 
 @Injectable()
-export class PythonExecutorService {
+export class PythonExecutorService implements OnModuleInit, OnModuleDestroy {
   private readonly logger = new Logger(PythonExecutorService.name)
+  private daemon?: ChildProcess
+
+  onModuleInit() {
+    if (PARSER_DAEMON_AUTOSTART) {
+      this.startDaemon()
+    }
+  }
+
+  onModuleDestroy() {
+    this.daemon?.kill()
+  }
+
+  async executePythonParser(
+    url?: string,
+    onPerformance?: (performance: ParsedPerformance) => void,
+  ): Promise<ParsedPerformance[]> {
+    if (url && (PARSER_DAEMON_URL || PARSER_DAEMON_SOCKET)) {
+      try {
+        return await this.requestDaemon(url, onPerformance)
+      } catch (error) {
+        if (!['ECONNREFUSED', 'ENOENT'].includes(error.code)) {
+          throw error
+        }
+        this.logger.warn(`Parser daemon unavailable (${error.code}), falling back to exec`)
+      }
+    }
+
+    return this.executeOnce(url, onPerformance)
+  }
+
+  private async requestDaemon(
+    url: string,
+    onPerformance?: (performance: ParsedPerformance) => void,
+  ): Promise<ParsedPerformance[]> {
+    this.logger.log(`Sending parse job to daemon: ${url}`)
 
-  async executePythonParser(url?: string): Promise<void> {
-    const mainScriptPath = path.join(process.cwd(), 'src', 'parser', 'python', 'main.py')
+    const response = await axios.post<Readable>(
+      PARSER_DAEMON_URL ? `${PARSER_DAEMON_URL}/parse` : 'http://localhost/parse',
+      { url, stream: true, enrich: PARSER_ENRICH },
+      {
+        socketPath: PARSER_DAEMON_URL ? undefined : PARSER_DAEMON_SOCKET,
+        responseType: 'stream',
+        timeout: PARSER_TIMEOUT_MS,
+      },
+    )
 
-    if (!require('fs').existsSync(mainScriptPath)) {
-      throw new Error(`Main parser file not found at: ${mainScriptPath}`)
+    const performances = await this.readMessages(response.data, onPerformance)
+    if (!performances) {
+      throw new Error('Parser daemon closed the stream without a result')
     }
 
-    const pythonCommand = url
-      ? `python3 "${mainScriptPath}" "${url}"`
-      : `python3 "${mainScriptPath}"`
+    return performances
+  }
 
-    this.logger.log(`Executing Python command: ${pythonCommand}`)
+  private async executeOnce(
+    url?: string,
+    onPerformance?: (performance: ParsedPerformance) => void,
+  ): Promise<ParsedPerformance[]> {
+    if (!fs.existsSync(PARSER_SCRIPT_PATH)) {
+      throw new Error(`Main parser file not found at: ${PARSER_SCRIPT_PATH}`)
+    }
 
-    const { stderr, stdout } = await execAsync(pythonCommand, {
+    const args = url ? [PARSER_SCRIPT_PATH, url, '--output', '-'] : [PARSER_SCRIPT_PATH, '--output', '-']
+    if (PARSER_ENRICH) {
+      args.push('--enrich')
+    }
+
+    this.logger.log(`Executing Python command: python3 ${args.join(' ')}`)
+
+    const child = spawn('python3', args, {
       cwd: process.cwd(),
-      timeout: 300000,
+      stdio: ['ignore', 'pipe', 'pipe'],
+      timeout: PARSER_TIMEOUT_MS,
+    })
+
+    child.stderr?.on('data', (data) => this.logger.log(`Python: ${data}`))
+
+    const exited = new Promise<number | null>((resolve, reject) => {
+      child.on('error', reject)
+      child.on('close', resolve)
     })
 
-    if (stdout) {
-      this.logger.log(`Python stdout: ${stdout}`)
+    const performances = await this.readMessages(child.stdout!, onPerformance)
+    const code = await exited
+
+    if (code !== 0 && !performances) {
+      throw new Error(`Python parser exited with code ${code}`)
+    }
+
+    return performances ?? []
+  }
+
+  private async readMessages(
+    stream: Readable,
+    onPerformance?: (performance: ParsedPerformance) => void,
+  ): Promise<ParsedPerformance[] | undefined> {
+    const streamed: ParsedPerformance[] = []
+    let buffer = ''
+
+    const handleLine = (line: string): ParsedPerformance[] | undefined => {
+      if (!line.trim()) {
+        return undefined
+      }
+
+      const message: ParserMessage = JSON.parse(line)
+
+      switch (message.type) {
+        case 'progress':
+          this.logger.log(`Parser progress: ${JSON.stringify(message)}`)
+          return undefined
+        case 'performance':
+          streamed.push(message.performance)
+          onPerformance?.(message.performance)
+          return undefined
+        case 'error':
+          throw new Error(`Parser error: ${message.message}`)
+        case 'result':
+          if (message.performances) {
+            message.performances.forEach((performance) => onPerformance?.(performance))
+            return message.performances
+          }
+          return streamed
+      }
     }
 
-    if (stderr) {
-      this.logger.error(`Python stderr: ${stderr}`)
+    for await (const chunk of stream) {
+      buffer += chunk.toString()
+      const lines = buffer.split('\n')
+      buffer = lines.pop() ?? ''
+
+      for (const line of lines) {
+        const performances = handleLine(line)
+        if (performances) {
+          return performances
+        }
+      }
     }
+
+    return handleLine(buffer)
+  }
+
+  private startDaemon() {
+    this.logger.log(`Starting parser daemon on ${PARSER_DAEMON_SOCKET}`)
+
+    this.daemon = spawn('python3', [PARSER_SCRIPT_PATH, '--serve', '--socket', PARSER_DAEMON_SOCKET], {
+      cwd: process.cwd(),
+      stdio: ['ignore', 'pipe', 'pipe'],
+    })
+
+    this.daemon.stdout?.on('data', (data) => this.logger.log(`Parser daemon: ${data}`))
+    this.daemon.stderr?.on('data', (data) => this.logger.error(`Parser daemon: ${data}`))
+    this.daemon.on('exit', (code) => {
+      this.logger.warn(`Parser daemon exited with code ${code}`)
+      this.daemon = undefined
+    })
   }
 }
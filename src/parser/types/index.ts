@@ -1 +1,2 @@
 export * from './parsed-performance.interface'
+export * from './parser-message.interface'
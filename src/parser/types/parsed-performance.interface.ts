@@ -1,4 +1,16 @@
 export interface ParsedPerformance {
   title: string
   detail_url?: string
+  title_key?: string
+  title_sort_key?: string
+  start_date?: string
+  end_date?: string
+  dates?: string[]
+  venue?: string
+  address?: string
+  price_min?: number
+  price_max?: number
+  currency?: string
+  image?: string
+  images?: string[]
 }
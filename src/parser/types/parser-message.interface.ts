@@ -0,0 +1,30 @@
+import { ParsedPerformance } from './parsed-performance.interface'
+
+export interface ParserProgressMessage {
+  type: 'progress'
+  stage: string
+  [key: string]: unknown
+}
+
+export interface ParserPerformanceMessage {
+  type: 'performance'
+  performance: ParsedPerformance
+}
+
+export interface ParserResultMessage {
+  type: 'result'
+  count: number
+  tier?: string | null
+  performances?: ParsedPerformance[]
+}
+
+export interface ParserErrorMessage {
+  type: 'error'
+  message: string
+}
+
+export type ParserMessage =
+  | ParserProgressMessage
+  | ParserPerformanceMessage
+  | ParserResultMessage
+  | ParserErrorMessage
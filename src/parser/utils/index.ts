@@ -0,0 +1,2 @@
+export * from './show-matcher'
+export * from './title.utils'
@@ -0,0 +1,117 @@
+import { ShowMatcher } from './show-matcher'
+import { normalizeTitle, titleSortKey } from './title.utils'
+
+const PYTHON_TITLE_KEYS: [string, string, string][] = [
+  ['Ёлка «Щелкунчик» (12+)', 'елка щелкунчик', 'елка щелкунчик'],
+  ['"Мастер и Маргарита" 16+', 'мастер и маргарита', 'и маргарита мастер'],
+  ['Мастер и Маргарита!!! 6 +', 'мастер и маргарита', 'и маргарита мастер'],
+  ['Вишнёвый сад', 'вишневый сад', 'вишневый сад'],
+  ['Сад вишневый', 'сад вишневый', 'вишневый сад'],
+  ['Гамлет (18+)', 'гамлет', 'гамлет'],
+  ['Ревизор 0+', 'ревизор', 'ревизор'],
+  ['Top-12+ шоу', 'top шоу', 'top шоу'],
+  ['Щелкунчик и мышиный король', 'щелкунчик и мышиный король', 'и король мышиный щелкунчик'],
+]
+
+describe('title utils', () => {
+  it.each(PYTHON_TITLE_KEYS)(
+    'normalizes %s to the same keys as TitleNormalizer',
+    (title, titleKey, titleSortKeyValue) => {
+      expect(normalizeTitle(title)).toBe(titleKey)
+      expect(titleSortKey(normalizeTitle(title))).toBe(titleSortKeyValue)
+    },
+  )
+
+  it('returns an empty key for an empty title', () => {
+    expect(normalizeTitle('')).toBe('')
+    expect(normalizeTitle(' «» 12+ ')).toBe('')
+  })
+})
+
+describe('ShowMatcher', () => {
+  const shows = [
+    { id: 'garden', name: 'Вишнёвый сад' },
+    { id: 'master', name: 'Мастер и Маргарита' },
+    { id: 'master-copy', name: '«Мастер и Маргарита» (16+)' },
+    { id: 'nutcracker', name: 'Щелкунчик и мышиный король' },
+    { id: 'unnamed', name: null },
+  ]
+
+  it('indexes each normalized title once and skips shows without a name', () => {
+    expect(new ShowMatcher(shows, 0.8).size).toBe(3)
+  })
+
+  it('matches exactly across ё/е, quotes and age ratings', () => {
+    const matcher = new ShowMatcher(shows, 0.8)
+
+    expect(matcher.match('"Вишневый сад" 12+')).toEqual({
+      showIds: ['garden'],
+      method: 'exact',
+      score: 1,
+    })
+    expect(matcher.match('Мастер и Маргарита 18+')).toEqual({
+      showIds: ['master', 'master-copy'],
+      method: 'exact',
+      score: 1,
+    })
+  })
+
+  it('uses title_key and title_sort_key computed by the Python parser', () => {
+    const matcher = new ShowMatcher(shows, 0.8)
+
+    expect(matcher.match('ignored', 'мастер и маргарита', 'и маргарита мастер')?.showIds).toEqual([
+      'master',
+      'master-copy',
+    ])
+    expect(matcher.match('ignored', 'сад вишневый', 'вишневый сад')?.method).toBe('tokens')
+  })
+
+  it('matches titles with the same words in a different order', () => {
+    const matcher = new ShowMatcher(shows, 0.8)
+
+    expect(matcher.match('Сад вишнёвый')).toEqual({
+      showIds: ['garden'],
+      method: 'tokens',
+      score: 1,
+    })
+    expect(matcher.match('Мышиный король и Щелкунчик')?.showIds).toEqual(['nutcracker'])
+  })
+
+  it('accepts a fuzzy match at or above the threshold', () => {
+    const match = new ShowMatcher(shows, 0.8).match('Мастер и Маргарит')
+
+    expect(match?.method).toBe('fuzzy')
+    expect(match?.showIds).toEqual(['master', 'master-copy'])
+    expect(match?.score).toBeGreaterThanOrEqual(0.8)
+    expect(match?.score).toBeLessThan(1)
+  })
+
+  it('rejects a fuzzy match below the threshold', () => {
+    const matcher = new ShowMatcher(shows, 0.8)
+
+    expect(matcher.match('Маргарита')).toBeNull()
+    expect(new ShowMatcher(shows, 0.3).match('Маргарита')?.showIds).toEqual([
+      'master',
+      'master-copy',
+    ])
+  })
+
+  it('rejects a fuzzy match tied between two shows', () => {
+    const matcher = new ShowMatcher(
+      [
+        { id: 'hamlet-a', name: 'Гамлет А' },
+        { id: 'hamlet-b', name: 'Гамлет Б' },
+      ],
+      0.5,
+    )
+
+    expect(matcher.match('Гамлет')).toBeNull()
+    expect(new ShowMatcher([{ id: 'hamlet-a', name: 'Гамлет А' }], 0.5).match('Гамлет')).toEqual(
+      expect.objectContaining({ showIds: ['hamlet-a'], method: 'fuzzy' }),
+    )
+  })
+
+  it('returns null for titles that normalize to nothing', () => {
+    expect(new ShowMatcher(shows, 0.8).match('(12+)')).toBeNull()
+  })
+})
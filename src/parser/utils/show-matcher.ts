@@ -0,0 +1,118 @@
+import { normalizeTitle, titleSortKey, titleTrigrams } from './title.utils'
+
+export interface ShowCandidate {
+  id: string
+  name: string | null
+}
+
+export interface ShowMatch {
+  showIds: string[]
+  method: 'exact' | 'tokens' | 'fuzzy'
+  score: number
+}
+
+export class ShowMatcher {
+  private readonly exact = new Map<string, string[]>()
+  private readonly sorted = new Map<string, string[]>()
+  private readonly keys: string[] = []
+  private readonly trigramCounts: number[] = []
+  private readonly trigramIndex = new Map<string, number[]>()
+
+  constructor(
+    shows: ShowCandidate[],
+    private readonly threshold: number,
+  ) {
+    for (const show of shows) {
+      const key = normalizeTitle(show.name ?? '')
+      if (!key) {
+        continue
+      }
+
+      const ids = this.exact.get(key)
+      if (ids) {
+        ids.push(show.id)
+        continue
+      }
+
+      this.exact.set(key, [show.id])
+      this.index(key)
+
+      const sortKey = titleSortKey(key)
+      const sortedIds = this.sorted.get(sortKey) ?? []
+      sortedIds.push(show.id)
+      this.sorted.set(sortKey, sortedIds)
+    }
+  }
+
+  get size(): number {
+    return this.keys.length
+  }
+
+  match(title: string, key?: string, sortKey?: string): ShowMatch | null {
+    const titleKey = key ?? normalizeTitle(title)
+    if (!titleKey) {
+      return null
+    }
+
+    const exactIds = this.exact.get(titleKey)
+    if (exactIds) {
+      return { showIds: exactIds, method: 'exact', score: 1 }
+    }
+
+    const sortedIds = this.sorted.get(sortKey ?? titleSortKey(titleKey))
+    if (sortedIds) {
+      return { showIds: sortedIds, method: 'tokens', score: 1 }
+    }
+
+    return this.fuzzy(titleKey)
+  }
+
+  private index(key: string) {
+    const position = this.keys.length
+    const trigrams = titleTrigrams(key)
+
+    this.keys.push(key)
+    this.trigramCounts.push(trigrams.size)
+
+    for (const trigram of trigrams) {
+      const postings = this.trigramIndex.get(trigram)
+      if (postings) {
+        postings.push(position)
+      } else {
+        this.trigramIndex.set(trigram, [position])
+      }
+    }
+  }
+
+  private fuzzy(titleKey: string): ShowMatch | null {
+    const trigrams = titleTrigrams(titleKey)
+    const shared = new Map<number, number>()
+
+    for (const trigram of trigrams) {
+      for (const position of this.trigramIndex.get(trigram) ?? []) {
+        shared.set(position, (shared.get(position) ?? 0) + 1)
+      }
+    }
+
+    let best = -1
+    let bestScore = 0
+    let tied = false
+
+    for (const [position, count] of shared) {
+      const score = (2 * count) / (trigrams.size + this.trigramCounts[position])
+      if (score > bestScore) {
+        best = position
+        bestScore = score
+        tied = false
+      } else if (score === bestScore) {
+        tied = true
+      }
+    }
+
+    if (best < 0 || tied || bestScore < this.threshold) {
+      return null
+    }
+
+    return { showIds: this.exact.get(this.keys[best]) ?? [], method: 'fuzzy', score: bestScore }
+  }
+}
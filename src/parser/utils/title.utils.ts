@@ -0,0 +1,35 @@
+const AGE_RATING_PATTERN = /\(?(?<![\p{L}\p{M}\p{N}_])(?:0|6|12|16|18)\s*\+(?![\p{L}\p{M}\p{N}_])\)?/gu
+const PUNCTUATION_PATTERN = /[^\p{L}\p{M}\p{N}\s]|_/gu
+const WHITESPACE_PATTERN = /\s+/g
+
+export function normalizeTitle(title: string): string {
+  if (!title) {
+    return ''
+  }
+
+  return title
+    .normalize('NFKC')
+    .toLowerCase()
+    .replace(/ё/g, 'е')
+    .replace(AGE_RATING_PATTERN, ' ')
+    .replace(PUNCTUATION_PATTERN, ' ')
+    .replace(WHITESPACE_PATTERN, ' ')
+    .trim()
+}
+
+export function titleSortKey(normalizedTitle: string): string {
+  return Array.from(new Set(normalizedTitle.split(' ').filter(Boolean)))
+    .sort()
+    .join(' ')
+}
+
+export function titleTrigrams(normalizedTitle: string): Set<string> {
+  const chars = Array.from(`  ${normalizedTitle} `)
+  const trigrams = new Set<string>()
+
+  for (let i = 0; i + 3 <= chars.length; i++) {
+    trigrams.add(chars.slice(i, i + 3).join(''))
+  }
+
+  return trigrams
+}